@@ -0,0 +1,59 @@
+"""
+Server Entry Point - `python -m backend`
+
+The server starts here rather than from app.py because multiprocessing
+re-imports the main module in every process it spawns (the thumbnail
+workers), except when that module is a package's __main__. Workers then
+only import what they use instead of the whole patched server.
+"""
+import logging
+import os
+
+from .app import app, socketio, resume_restored_rooms
+from .config import ASYNC_MODE
+from .logs import log_event
+
+logger = logging.getLogger(__name__)
+
+
+def main():
+    """Restore saved rooms and serve until interrupted."""
+    # Only the server process restores and snapshots rooms
+    resume_restored_rooms()
+    
+    # Get port from environment (Render provides this)
+    port = int(os.environ.get('PORT', 5000))
+    
+    # Check if running on Render (production)
+    is_production = os.environ.get('RENDER') is not None
+    
+    run_options = {}
+    if ASYNC_MODE == 'threading':
+        # Werkzeug is only used when no green-thread server is configured
+        run_options['allow_unsafe_werkzeug'] = True
+    
+    if is_production:
+        log_event(logger, logging.INFO, 'server_starting', mode='production', port=port, async_mode=ASYNC_MODE)
+        # Production settings for Render
+        socketio.run(
+            app, 
+            host='0.0.0.0', 
+            port=port, 
+            debug=False,
+            **run_options
+        )
+    else:
+        log_event(logger, logging.INFO, 'server_starting', mode='development', port=port, async_mode=ASYNC_MODE)
+        # Development settings for local testing
+        socketio.run(
+            app,
+            host='0.0.0.0',
+            port=port,
+            debug=True,
+            use_reloader=False,  # Disable reloader to avoid threading issues
+            log_output=True
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -1,20 +1,53 @@
 """
 Main Flask Server with Socket.IO
 """
-from flask import Flask, send_from_directory, request
+from .config import ASYNC_MODE
+
+# Green-thread servers must patch the standard library before anything else
+# is imported so that locks, sleeps and sockets in every module cooperate.
+if ASYNC_MODE == 'eventlet':
+    import eventlet
+    eventlet.monkey_patch()
+elif ASYNC_MODE == 'gevent':
+    from gevent import monkey
+    monkey.patch_all()
+
+from flask import Flask, Response, jsonify, send_from_directory, request
 from flask_socketio import SocketIO, emit, join_room, leave_room
 from flask_cors import CORS
+import functools
+import logging
 import threading
 import time
 import os
 
-from .rooms import create_room, get_room, join_room as join_room_logic, leave_room as leave_room_logic, get_player_room, rooms
-from .game_logic import get_game_state, delete_game_state
-from .scoring import calculate_guesser_points, calculate_drawer_points, get_leaderboard, get_winner, reset_round_scores
-from .words import validate_guess, get_word_hint
-from .config import MIN_PLAYERS, TURN_DURATION
+from .rooms import create_room, get_room, join_room as join_room_logic, leave_room as leave_room_logic, get_player_room, get_spectator_room, remote_owner, close_room as close_room_logic, quick_play as quick_play_logic, rooms, player_rooms, spectator_rooms
+from .game_logic import get_game_state, delete_game_state, game_states
+from .scoring import calculate_guesser_points, calculate_drawer_points, get_winner, reset_round_scores
+from .words import get_word_hint
+from .wordpacks import get_word_pack, list_word_packs
+from .config import MESSAGE_QUEUE, MIN_PLAYERS, TURN_DURATION, TURN_TRANSITION_TIME, DRAW_FLUSH_HZ, SPECTATOR_FLUSH_HZ, REACTION_MERGE_WINDOW, REACTION_EMOJIS, GC_INTERVAL, THUMBNAIL_POLL_INTERVAL
 from .session import game_sessions
+from .sweeper import Sweeper
+from .strokes import stroke_buffer, iter_segments
+from .spectators import spectator_feed, spectator_channel
+from .thumbnails import thumbnail_renderer
+from .profiles import profile_store
+from .snapshot import room_snapshotter
+from .replay import replay_recorder, ReplayReader, replay_path, list_replays, TURN_START, CLEAR, GUESS, TURN_END
+from .scheduler import scheduler
+from .ratelimit import rate_limiter, reaction_merger
+from .wire import set_wire_format, uses_binary, forget_connection, decode_strokes
 from .game_state_handler import register_game_state_handlers
+from .config import SOCKETIO_LOG_PACKETS
+from .logs import configure_logging, log_event, log_sampled
+from .metrics import (
+    registry, register_gauge, instrument_handler, track_gc_pauses,
+    EVENTS_EMITTED, DRAW_FANOUT_SECONDS, PAYLOAD_BYTES, TURN_TRANSITIONS
+)
+
+configure_logging()
+logger = logging.getLogger(__name__)
 
 app = Flask(__name__, static_folder='../frontend', template_folder='../frontend')
 app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'dev-secret-key-change-in-production')
@@ -28,13 +61,22 @@ CORS(app, resources={
     }
 })
 
+class InstrumentedSocketIO(SocketIO):
+    """SocketIO that counts emitted events; flask_socketio.emit() routes through here too."""
+
+    def emit(self, event, *args, **kwargs):
+        EVENTS_EMITTED.inc(event)
+        return super().emit(event, *args, **kwargs)
+
+
 # Enhanced SocketIO configuration
-socketio = SocketIO(
+socketio = InstrumentedSocketIO(
     app,
     cors_allowed_origins="*",
-    async_mode='threading',
-    logger=True,
-    engineio_logger=True,
+    async_mode=ASYNC_MODE,
+    message_queue=MESSAGE_QUEUE,  # fan-out of emits across worker processes
+    logger=SOCKETIO_LOG_PACKETS,
+    engineio_logger=SOCKETIO_LOG_PACKETS,
     ping_timeout=5000,
     ping_interval=25000,
     manage_session=False,
@@ -44,11 +86,46 @@ socketio = SocketIO(
     allow_upgrades=True
 )
 
+
+
+def on_event(event):
+    """`socketio.on` with metrics instrumentation around the handler."""
+    def decorator(handler):
+        return socketio.on(event)(instrument_handler(event, handler))
+    return decorator
+
+
+def room_locked(handler):
+    """Run a handler while holding the lock of the room named in its payload
+    (or passed as a room code in its first argument, for timer callbacks).
+
+    Each room behaves like an actor: its handlers and timers run one at a
+    time, while handlers for different rooms still run in parallel.
+    """
+    @functools.wraps(handler)
+    def wrapper(data, *args, **kwargs):
+        room_code = data.get('room_code') if isinstance(data, dict) else data
+        room = rooms.get(room_code.upper()) if isinstance(room_code, str) else None
+        if room is None:
+            return handler(data, *args, **kwargs)
+        with room.lock:
+            return handler(data, *args, **kwargs)
+    return wrapper
+
+
+# Live gauges computed when /metrics is scraped
+register_gauge('drawing_game_active_rooms', 'Rooms currently in memory', lambda: len(rooms))
+register_gauge('drawing_game_active_players', 'Players currently in a room', lambda: len(player_rooms))
+register_gauge('drawing_game_active_spectators', 'Connections watching a room', lambda: len(spectator_rooms))
+register_gauge('drawing_game_active_games', 'Game states currently in memory', lambda: len(game_states))
+register_gauge('drawing_game_timer_tasks', 'Callbacks pending on the shared scheduler', scheduler.pending_count)
+track_gc_pauses()
+
 # Register handlers defined in modular files (safe registration to avoid import-time decorators)
 try:
     register_game_state_handlers(socketio, get_room, get_game_state, game_sessions)
 except Exception as e:
-    print(f"⚠️ Failed to register game state handlers: {e}")
+    log_event(logger, logging.WARNING, 'handler_registration_failed', error=e)
 
 
 # ===== SERVE STATIC FILES =====
@@ -56,6 +133,25 @@ except Exception as e:
 def index():
     return send_from_directory('../frontend', 'index.html')
 
+@app.route('/metrics')
+def metrics():
+    return Response(registry.render(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/replays')
+def replays():
+    return jsonify(list_replays())
+
+@app.route('/word_packs')
+def word_packs():
+    return jsonify(list_word_packs())
+
+@app.route('/profiles/<username>')
+def profile(username):
+    stats = profile_store.get(username)
+    if stats is None:
+        return jsonify({'error': 'Profile not found'}), 404
+    return jsonify(stats)
+
 @app.route('/<path:path>')
 def serve_static(path):
     return send_from_directory('../frontend', path)
@@ -63,29 +159,32 @@ def serve_static(path):
 
 # ===== SOCKET.IO EVENTS =====
 
-@socketio.on('connect')
-def handle_connect():
+@on_event('connect')
+def handle_connect(auth=None):
     """Handle client connection."""
     sid = request.sid
-    print(f"🔌 Client connected: {sid}")
+    log_sampled(logger, logging.INFO, 'client_connected', sid=sid)
     
     # Check if this is a reconnection
-    for room_code, room in rooms.items():
-        for player_sid, player in room.players.items():
-            if player_sid == sid:
-                print(f"🔄 Reconnection detected for player: {player.username}")
-                join_room(room_code)
-                emit('reconnected', {
-                    'room_code': room_code,
-                    'room': room.to_dict()
-                })
-                return
+    room = get_player_room(sid)
+    if room:
+        player = room.get_player(sid)
+        log_event(logger, logging.INFO, 'client_reconnected', room=room.room_code, user=player.username)
+        join_room(room.room_code)
+        game_state = game_states.get(room.room_code)
+        emit('reconnected', {
+            'room_code': room.room_code,
+            'state': room.sync.full(room, game_state),
+            'canvas': game_state.canvas.get_payload(uses_binary(sid)) if game_state else None
+        })
+        return
     
     # New connection
     emit('connected', {'sid': sid})
 
 
-@socketio.on('get_game_state')
+@on_event('get_game_state')
+@room_locked
 def handle_get_game_state(data):
     """Handle request for current game state."""
     room_code = data.get('room_code')
@@ -132,83 +231,53 @@ def handle_get_game_state(data):
         'category': game_state.word_category,
         'current_round': game_state.current_round,
         'is_drawer': game_state.drawer_sid == sid,
-        'game_active': game_state.game_active
+        'game_active': game_state.game_active,
+        'canvas': game_state.canvas.get_payload(uses_binary(sid)),
+        'leaderboard': room.leaderboard.to_list(),
+        'state': room.sync.full(room, game_state)
     })
 
-@socketio.on('disconnect')
+@on_event('disconnect')
 def handle_disconnect():
     """Handle client disconnection."""
     sid = request.sid
-    print(f"Client disconnected: {sid}")
+    log_sampled(logger, logging.INFO, 'client_disconnected', sid=sid)
+    forget_connection(sid)
+    rate_limiter.forget(sid)
+    game_sessions.remove_session(sid)
+    _replay_streams.pop(sid, None)
+    
+    # A sid can be both watching one room and seated in another
+    watched = get_spectator_room(sid)
+    if watched:
+        with watched.lock:
+            watched.remove_spectator(sid)
     
     room = get_player_room(sid)
     if room:
-        room_code = room.room_code
-        player = room.get_player(sid)
-        
-        if not player:
-            print(f"❌ No player found for SID: {sid}")
-            return
-            
-        username = player.username
-        print(f"👤 Player '{username}' disconnected from room: {room_code}")
-        
-        if room.game_started:
-            # Handle disconnection during game
-                game_state = get_game_state(room_code)
-
-                # Remove player from game_state (players_order) and detect if drawer left
-                removed_drawer = False
-                if game_state:
-                    try:
-                        removed_drawer = game_state.remove_player(sid)
-                    except Exception:
-                        removed_drawer = False
-
-                # Remove from room players
-                leave_room_logic(room_code, sid)
-                leave_room(room_code)
-
-                # If room still has players, notify them
-                if room.get_player_count() > 0:
-                    emit('player_left', {
-                        'username': username,
-                        'players': room.get_players_list()
-                    }, room=room_code)
-
-                    # If the drawer left or not enough players, end the current turn
-                    if (removed_drawer and game_state and game_state.game_active) or room.get_player_count() < 2:
-                        handle_turn_end(room_code)
-                else:
-                    # No players left - cleanup game state
-                    if game_state:
-                        delete_game_state(room_code)
-        else:
-            # Keep room and player data for reconnection in lobby
-            print(f"⏳ Player disconnected in lobby, keeping room alive: {room_code}")
-            # Notify other players
-            emit('player_disconnected', {
-                'username': username,
-                'sid': sid
-            }, room=room_code)
+        with room.lock:
+            handle_player_disconnect(room, sid)
 
 
-@socketio.on('create_room')
+@on_event('create_room')
 def handle_create_room(data):
     """Create a new room."""
     username = data.get('username', 'Player')
+    word_pack = data.get('word_pack')
     sid = request.sid
     
-    print(f"🎨 Creating room - User: {username}, SID: {sid}")
+    # Only accept packs that exist and contain words; otherwise use the built-in bank
+    pack = get_word_pack(word_pack)
+    if word_pack and (pack is None or not pack.categories):
+        emit('error', {'message': f'Word pack "{word_pack}" not found, using default words'})
+        word_pack = None
     
     # Create the room
-    room = create_room(sid, username)
+    room = create_room(sid, username, word_pack=word_pack or None)
     
     # Join the Socket.IO room
     join_room(room.room_code)
     
-    print(f"✅ Room created - Code: {room.room_code}, Players: {room.get_player_count()}")
-    
     # Send response to creator
     emit('room_created', {
         'room_code': room.room_code,
@@ -216,38 +285,127 @@ def handle_create_room(data):
     })
 
 
-@socketio.on('join_room')
+@on_event('join_room')
+@room_locked
 def handle_join_room(data):
     """Join an existing room."""
     room_code = data.get('room_code', '').upper()
     username = data.get('username', 'Player')
     sid = request.sid
     
-    print(f"🔍 Join attempt - Room: {room_code}, User: {username}")
-    
     room, message = join_room_logic(room_code, sid, username)
     
     if not room:
-        print(f"❌ Join failed: {message}")
-        emit('join_error', {'message': message})
+        # Tell the client when another worker owns the room so it can reconnect there
+        emit('join_error', {'message': message, 'worker': remote_owner(room_code)})
         return
     
     join_room(room_code)
     
-    print(f"✅ Player joined - Room: {room_code}, Total players: {room.get_player_count()}")
-    
     emit('room_joined', {
         'room_code': room_code,
-        'room': room.to_dict()
+        'room': room.to_dict(),
+        'state': room.sync.full(room)
     })
     
     emit('player_joined', {
         'username': username,
-        'players': room.get_players_list()
+        'state': room.sync.delta(room)
     }, room=room_code)
 
 
-@socketio.on('start_game')
+@on_event('reattach')
+@room_locked
+def handle_reattach(data):
+    """Reclaim a seat held for a dropped player, e.g. after a server restart."""
+    room_code = data.get('room_code', '').upper()
+    username = data.get('username')
+    sid = request.sid
+    
+    room = get_room(room_code) if room_code else None
+    old_sid = room.reattach_player(username, sid) if room and username else None
+    if old_sid is None:
+        emit('reattach_failed', {'room_code': room_code})
+        return
+    
+    game_state = game_states.get(room.room_code)
+    if game_state:
+        game_state.rebind_player(old_sid, sid)
+    game_sessions.move_session(old_sid, sid)
+    join_room(room.room_code)
+    log_event(logger, logging.INFO, 'player_reattached', room=room.room_code, user=username)
+    
+    emit('reconnected', {
+        'room_code': room.room_code,
+        'state': room.sync.full(room, game_state),
+        'canvas': game_state.canvas.get_payload(uses_binary(sid)) if game_state else None
+    })
+    emit('player_joined', {
+        'username': username,
+        'state': room.sync.delta(room, game_state)
+    }, room=room.room_code, include_self=False)
+
+
+@on_event('quick_play')
+def handle_quick_play(data):
+    """Join the fullest open public lobby, creating one if none has a seat."""
+    username = data.get('username', 'Player')
+    sid = request.sid
+    
+    room, created = quick_play_logic(sid, username)
+    join_room(room.room_code)
+    
+    with room.lock:
+        emit('quick_play_matched', {
+            'room_code': room.room_code,
+            'room': room.to_dict(),
+            'created': created
+        })
+        
+        if not created:
+            emit('player_joined', {
+                'username': username,
+                'state': room.sync.delta(room)
+            }, room=room.room_code)
+
+
+@on_event('spectate_room')
+@room_locked
+def handle_spectate_room(data):
+    """Watch a room read-only, whether or not its game has started."""
+    room_code = data.get('room_code', '').upper()
+    sid = request.sid
+    
+    room = get_room(room_code) if room_code else None
+    if not room:
+        worker = remote_owner(room_code)
+        message = 'Room is hosted on another server' if worker is not None else 'Room not found'
+        emit('join_error', {'message': message, 'worker': worker})
+        return
+    
+    success, message = room.add_spectator(sid)
+    if not success:
+        emit('join_error', {'message': message, 'worker': None})
+        return
+    
+    # Spectators get their own channel so player broadcasts skip them
+    join_room(spectator_channel(room.room_code))
+    
+    game_state = game_states.get(room.room_code)
+    drawer = room.get_player(game_state.drawer_sid) if game_state else None
+    emit('spectating', {
+        'room_code': room.room_code,
+        'state': room.sync.full(room, game_state),
+        'drawer_sid': game_state.drawer_sid if game_state else None,
+        'drawer_username': drawer.username if drawer else None,
+        'word_length': len(game_state.current_word) if game_state and game_state.current_word else 0,
+        'canvas': game_state.canvas.get_payload(True) if game_state else None,
+        'leaderboard': room.leaderboard.to_list()
+    })
+
+
+@on_event('start_game')
+@room_locked
 def handle_start_game(data):
     """Start the game."""
     room_code = data.get('room_code')
@@ -272,11 +430,12 @@ def handle_start_game(data):
     
     try:
         room.game_started = True
+        room.touch()
         game_state = get_game_state(room_code)
         player_sids = list(room.players.keys())
         
         # Initialize game state
-        game_state.start_game(player_sids)
+        game_state.start_game(player_sids, word_pack=get_word_pack(room.word_pack))
         success = game_state.start_turn()
         
         if not success:
@@ -285,6 +444,12 @@ def handle_start_game(data):
             
         reset_round_scores(room.players)
         
+        replay_recorder.start_game(room_code, {
+            'room_code': room_code,
+            'players': [p.username for p in room.players.values()]
+        })
+        record_turn_start(room, game_state)
+        
         # Get drawer information
         drawer = room.get_player(game_state.drawer_sid)
         drawer_username = drawer.username if drawer else 'Unknown'
@@ -306,13 +471,15 @@ def handle_start_game(data):
                 )
         
         # Notify all players about game start (do not include secret word)
-        emit('game_started', {
-            'game_state': game_state.to_dict(),
+        started = {
+            'state': room.sync.delta(room, game_state),
             'drawer_sid': game_state.drawer_sid,
             'drawer_username': drawer_username,
             'category': game_state.word_category,
             'word_length': len(game_state.current_word) if game_state.current_word else 0
-        }, room=room_code)
+        }
+        emit('game_started', started, room=room_code)
+        emit_to_spectators(room, 'game_started', started)
         
         # Notify drawer about their turn
         emit('your_turn_to_draw', {
@@ -323,53 +490,101 @@ def handle_start_game(data):
         # Start turn timer
         start_turn_timer(room_code)
         
-        print(f"✅ Game started in room {room_code} - First drawer: {drawer_username}")
+        log_event(logger, logging.INFO, 'game_started', room=room_code, players=len(player_sids))
         
-    except Exception as e:
-        print(f"❌ Error starting game: {str(e)}")
+    except Exception:
+        logger.exception("game_start_failed", extra={'fields': {'room': room_code}})
         emit('error', {'message': 'Failed to start game'})
 
 
-@socketio.on('draw')
+@on_event('request_state_sync')
+def handle_request_state_sync(data):
+    """Send the full versioned state to a client that missed a delta."""
+    room = get_player_room(request.sid) or get_spectator_room(request.sid)
+    if not room:
+        return
+    
+    # The room can change under us otherwise, leaving state and seq out of step
+    with room.lock:
+        state = room.sync.full(room, game_states.get(room.room_code))
+    emit('state_sync', state)
+
+
+@on_event('draw')
 def handle_draw(data):
-    """Broadcast drawing data."""
+    """Buffer drawing data; the stroke flusher broadcasts it in batches."""
+    if not check_rate_limit('draw'):
+        return
+    
     room_code = data.get('room_code')
-    game_state = get_game_state(room_code)
+    sid = request.sid
+    game_state = game_states.get(room_code)
     
-    if not game_state.is_drawer(request.sid):
+    if not game_state or not game_state.is_drawer(sid):
         return
     
-    emit('draw', data, room=room_code, include_self=False)
+    frame = data.get('bin')
+    if isinstance(frame, (bytes, bytearray)):
+        PAYLOAD_BYTES.observe(len(frame), 'draw')
+        # Binary frames skip per-segment parsing. While STROKE_SIMPLIFY_TOLERANCE
+        # is on, the flusher decodes and re-encodes them once per tick; at 0
+        # they are forwarded byte for byte
+        if not stroke_buffer.add_binary(room_code, sid, bytes(frame)):
+            log_event(logger, logging.DEBUG, 'draw_frame_rejected', room=room_code, bytes=len(frame))
+            return
+    else:
+        stroke_buffer.add_segments(room_code, sid, iter_segments(data))
+    start_stroke_flusher()
+
 
+@on_event('set_wire_format')
+def handle_set_wire_format(data):
+    """Negotiate the drawing wire format ('json' or 'binary') for this connection."""
+    wire_format = data.get('format', 'json')
+    set_wire_format(request.sid, wire_format)
+    emit('wire_format', {'format': 'binary' if uses_binary(request.sid) else 'json'})
 
-@socketio.on('clear_canvas')
+
+@on_event('clear_canvas')
+@room_locked
 def handle_clear_canvas(data):
     """Clear canvas for all players."""
     room_code = data.get('room_code')
-    game_state = get_game_state(room_code)
+    game_state = game_states.get(room_code)
     
-    if not game_state.is_drawer(request.sid):
+    if not game_state or not game_state.is_drawer(request.sid):
         return
     
+    # Strokes drawn before the clear are no longer worth sending or keeping
+    stroke_buffer.discard(room_code)
+    spectator_feed.discard(room_code)
+    game_state.canvas.clear()
+    replay_recorder.record(room_code, CLEAR)
     emit('clear_canvas', {}, room=room_code, include_self=False)
+    emit_to_spectators(get_room(room_code), 'clear_canvas', {})
 
 
-@socketio.on('guess')
+@on_event('guess')
+@room_locked
 def handle_guess(data):
     """Handle player guess."""
+    if not check_rate_limit('guess'):
+        return
+    
     room_code = data.get('room_code')
     guess = data.get('guess', '')
     sid = request.sid
     
     room = get_room(room_code)
-    game_state = get_game_state(room_code)
+    game_state = game_states.get(room_code)
     
-    if not room or not game_state.game_active:
+    if not room or not game_state or not game_state.game_active:
         return
     
     player = room.get_player(sid)
     if not player:
         return
+    room.touch()
     
     if game_state.is_drawer(sid):
         return
@@ -378,30 +593,49 @@ def handle_guess(data):
         emit('already_guessed', {'message': 'You already guessed correctly!'})
         return
     
-    if validate_guess(guess, game_state.current_word):
+    result = game_state.check_guess(guess)
+    
+    replay_recorder.record(room_code, GUESS, {
+        'username': player.username,
+        'correct': result == 'correct',
+        # Correct guesses are the word itself, which is revealed at turn end
+        'guess': None if result == 'correct' else guess
+    })
+    
+    if result == 'correct':
         game_state.mark_player_guessed(sid)
         
         time_elapsed = game_state.get_time_elapsed()
         guesser_points = calculate_guesser_points(time_elapsed)
         drawer_points = calculate_drawer_points()
         
-        player.score += guesser_points
+        # Reposition only the affected players and send just what moved
+        rank_changes = room.leaderboard.add_points(player, guesser_points)
         player.has_guessed = True
         
         drawer = room.get_player(game_state.drawer_sid)
         if drawer:
-            drawer.score += drawer_points
+            rank_changes.update(room.leaderboard.add_points(drawer, drawer_points))
+            profile_store.record_drawer_points(drawer.username, drawer_points)
+        # Queued for the profile writer thread; never touches the disk here
+        profile_store.record_guess(player.username, time_elapsed)
         
-        emit('correct_guess', {
+        correct = {
             'username': player.username,
+            'sid': sid,
             'points': guesser_points,
             'time_elapsed': time_elapsed,
-            'leaderboard': get_leaderboard(room.players)
-        }, room=room_code)
+            'rank_changes': list(rank_changes.values())
+        }
+        emit('correct_guess', correct, room=room_code)
+        emit_to_spectators(room, 'correct_guess', correct)
         
         non_drawers = [p for p in room.players.keys() if p != game_state.drawer_sid]
         if len(game_state.guessed_players) >= len(non_drawers):
             handle_turn_end(room_code)
+    elif result == 'close':
+        # Only the guesser sees a near miss; broadcasting it would leak the word
+        emit('close_guess', {'guess': guess, 'message': f"'{guess}' is so close!"})
     else:
         emit('chat_message', {
             'username': player.username,
@@ -410,9 +644,12 @@ def handle_guess(data):
         }, room=room_code)
 
 
-@socketio.on('chat_message')
+@on_event('chat_message')
 def handle_chat_message(data):
     """Handle chat messages (non-guess messages)."""
+    if not check_rate_limit('chat_message'):
+        return
+    
     room_code = data.get('room_code')
     message = data.get('message', '')
     sid = request.sid
@@ -424,6 +661,7 @@ def handle_chat_message(data):
     player = room.get_player(sid)
     if not player:
         return
+    room.touch()
     
     emit('chat_message', {
         'username': player.username,
@@ -432,13 +670,17 @@ def handle_chat_message(data):
     }, room=room_code)
 
 
-@socketio.on('reaction')
+@on_event('reaction')
 def handle_reaction(data):
     """Handle emoji reactions."""
     room_code = data.get('room_code')
     emoji = data.get('emoji')
     sid = request.sid
     
+    # Only the emoji bar's reactions, so merged counts stay one key per emoji
+    if emoji not in REACTION_EMOJIS:
+        return
+    
     room = get_room(room_code)
     if not room:
         return
@@ -447,6 +689,13 @@ def handle_reaction(data):
     if not player:
         return
     
+    allowed, _ = rate_limiter.allow(sid, 'reaction')
+    if not allowed:
+        # Merge excess reactions into a single counted event per window
+        if reaction_merger.add(room.room_code, emoji):
+            scheduler.call_later(REACTION_MERGE_WINDOW, flush_merged_reactions, room.room_code)
+        return
+    
     emit('reaction', {
         'username': player.username,
         'emoji': emoji,
@@ -455,123 +704,516 @@ def handle_reaction(data):
     }, room=room_code)
 
 
+_replay_streams = {}  # {sid: token of the playback currently streaming to it}
+
+
+@on_event('watch_replay')
+def handle_watch_replay(data):
+    """Stream a recorded game to the caller at any speed, from any position."""
+    sid = request.sid
+    path = replay_path(data.get('replay_id'))
+    if not path or not os.path.isfile(path):
+        emit('error', {'message': 'Replay not found'})
+        return
+    
+    try:
+        speed = min(16.0, max(0.25, float(data.get('speed', 1))))
+        start_ms = max(0, int(float(data.get('position', 0)) * 1000))
+    except (TypeError, ValueError):
+        emit('error', {'message': 'Invalid replay options'})
+        return
+    
+    # Starting a new playback (e.g. after a seek) cancels the previous one
+    token = object()
+    _replay_streams[sid] = token
+    socketio.start_background_task(stream_replay, sid, token, path, speed, start_ms)
+
+
+@on_event('stop_replay')
+def handle_stop_replay(data):
+    _replay_streams.pop(request.sid, None)
+
+
 # ===== HELPER FUNCTIONS =====
 
-def start_turn_timer(room_code):
-    """Start background timer for turn."""
-    def timer():
-        game_state = get_game_state(room_code)
-        if not game_state:
+def stream_replay(sid, token, path, speed, start_ms):
+    """Send replay events to one client until it finishes or is cancelled."""
+    try:
+        reader = ReplayReader(path)
+    except (OSError, ValueError):
+        socketio.emit('error', {'message': 'Replay could not be read'}, room=sid)
+        return
+    
+    try:
+        socketio.emit('replay_info', {'duration_ms': reader.duration_ms, 'position_ms': start_ms}, room=sid)
+        for offset, kind, payload in reader.play(speed, start_ms, sleep=socketio.sleep):
+            if _replay_streams.get(sid) is not token:
+                return
+            socketio.emit('replay_event', {'t': offset, 'kind': kind, 'data': payload}, room=sid)
+        if _replay_streams.get(sid) is token:
+            _replay_streams.pop(sid, None)
+    finally:
+        reader.close()
+
+
+def record_turn_start(room, game_state):
+    """Add the turn that just started to the room's replay."""
+    drawer = room.get_player(game_state.drawer_sid)
+    replay_recorder.record(room.room_code, TURN_START, {
+        'turn_id': game_state.turn_id,
+        'round': game_state.current_round,
+        'drawer': drawer.username if drawer else None,
+        'word': game_state.current_word,
+        'category': game_state.word_category,
+        'turn_start_time': game_state.turn_start_time,
+        'duration': TURN_DURATION
+    })
+
+
+def handle_player_disconnect(room, sid):
+    """Remove or park a disconnected player (caller holds the room lock)."""
+    room_code = room.room_code
+    player = room.get_player(sid)
+    
+    if not player:
+        log_event(logger, logging.WARNING, 'disconnect_player_missing', room=room_code, sid=sid)
+        return
+        
+    username = player.username
+    log_event(logger, logging.DEBUG, 'player_disconnected', room=room_code, user=username)
+    
+    if room.game_started:
+        # Handle disconnection during game
+        remove_game_player(room, sid, username)
+        leave_room(room_code)
+    else:
+        # Keep room and player data for reconnection in lobby
+        log_event(logger, logging.DEBUG, 'lobby_disconnect_room_kept', room=room_code)
+        # The seat is held until the sweeper's LOBBY_RECONNECT_TTL runs out
+        room.mark_disconnected(sid)
+        # Notify other players
+        emit('player_disconnected', {
+            'username': username,
+            'sid': sid
+        }, room=room_code)
+
+
+def remove_game_player(room, sid, username):
+    """Take a player out of a started game and its room (caller holds the room lock).
+
+    Used both when a player disconnects and when a restored player never
+    reattaches, so the turn rotation never keeps a sid that is gone.
+    """
+    room_code = room.room_code
+    game_state = get_game_state(room_code)
+
+    # Remove player from game_state (players_order) and detect if drawer left
+    removed_drawer = False
+    if game_state:
+        try:
+            removed_drawer = game_state.remove_player(sid)
+        except Exception:
+            removed_drawer = False
+
+    # Remove from room players
+    leave_room_logic(room_code, sid)
+
+    # If room still has players, notify them
+    if room.get_player_count() > 0:
+        socketio.emit('player_left', {
+            'username': username,
+            'state': room.sync.delta(room, game_state)
+        }, room=room_code)
+
+        # If the drawer left or not enough players, end the current turn
+        if (removed_drawer and game_state and game_state.game_active) or room.get_player_count() < 2:
+            handle_turn_end(room_code)
+    else:
+        # No players left - cleanup game state
+        if game_state:
+            replay_recorder.end_game(room_code)
+            delete_game_state(room_code)
+
+
+def check_rate_limit(event):
+    """Apply the caller's token bucket for `event`, telling them when they are throttled."""
+    allowed, notify = rate_limiter.allow(request.sid, event)
+    if notify:
+        emit('rate_limited', {'event': event, 'message': 'Slow down! Some messages were dropped.'})
+    return allowed
+
+
+def emit_to_spectators(room, event, payload):
+    """Send an event to a room's spectator channel, if anyone is watching."""
+    if room and room.spectators:
+        socketio.emit(event, payload, room=spectator_channel(room.room_code))
+
+
+def flush_merged_reactions(room_code):
+    """Send the reactions merged during the last window (runs on the scheduler)."""
+    for emoji, count in reaction_merger.pop(room_code).items():
+        socketio.emit('reaction', {
+            'username': None,
+            'emoji': emoji,
+            'count': count,
+            'x': 50,
+            'y': 50
+        }, room=room_code)
+
+
+_stroke_flusher_started = False
+_stroke_flusher_lock = threading.Lock()
+
+
+def start_stroke_flusher():
+    """Start the single background thread that flushes batched strokes."""
+    global _stroke_flusher_started
+    if _stroke_flusher_started:
+        return
+
+    with _stroke_flusher_lock:
+        if _stroke_flusher_started:
             return
+        _stroke_flusher_started = True
+
+    interval = 1.0 / DRAW_FLUSH_HZ
+
+    def flusher():
+        while True:
+            # This one task serves every room, so nothing may escape the loop
+            try:
+                frames = stroke_buffer.drain()
+            except Exception:
+                logger.exception("stroke_drain_failed")
+                frames = []
+            for room_code, sender_sid, strokes, binary in frames:
+                start = time.perf_counter()
+                try:
+                    flush_strokes(room_code, sender_sid, strokes, binary)
+                except Exception:
+                    logger.exception("stroke_flush_failed", extra={'fields': {'room': room_code}})
+                DRAW_FANOUT_SECONDS.observe(time.perf_counter() - start)
+            socketio.sleep(interval)
+
+    socketio.start_background_task(flusher)
 
-        # compute end time
-        end_time = game_state.turn_end_time
-        if not end_time:
+
+_spectator_flusher_started = False
+_spectator_flusher_lock = threading.Lock()
+
+
+def start_spectator_flusher():
+    """Start the background task that sends thinned drawing to spectators."""
+    global _spectator_flusher_started
+    if _spectator_flusher_started:
+        return
+
+    with _spectator_flusher_lock:
+        if _spectator_flusher_started:
             return
+        _spectator_flusher_started = True
 
-        # Emit updates each second until time runs out or game stops
-        while game_state.game_active and game_state.timer_active:
-            remaining = int(max(0, end_time - time.time()))
+    interval = 1.0 / SPECTATOR_FLUSH_HZ
 
-            # Emit periodic timer update to the room
+    def flusher():
+        while True:
+            # This one task serves every room's spectators, so nothing may escape the loop
             try:
-                socketio.emit('timer_update', {'time_remaining': remaining}, room=room_code)
+                frames = spectator_feed.drain()
             except Exception:
-                pass
+                logger.exception("spectator_drain_failed")
+                frames = []
+            for room_code, frame in frames:
+                try:
+                    PAYLOAD_BYTES.observe(len(frame), 'spectator_draw_bin')
+                    # One payload shared by every viewer of the room
+                    socketio.emit('draw_bin', frame, room=spectator_channel(room_code))
+                except Exception:
+                    logger.exception("spectator_flush_failed", extra={'fields': {'room': room_code}})
+            socketio.sleep(interval)
 
-            # If not enough players left, end the game/turn early
-            room = get_room(room_code)
-            if not room or room.get_player_count() < 2:
-                # Force end of turn
-                handle_turn_end(room_code)
-                return
+    socketio.start_background_task(flusher)
 
-            if remaining <= 0:
-                # Double-check expiration
-                if game_state.is_turn_expired():
-                    handle_turn_end(room_code)
-                return
 
-            time.sleep(1)
+def flush_strokes(room_code, sender_sid, strokes, binary):
+    """Send one batched drawing frame to everyone in the room but the drawer."""
+    game_state = game_states.get(room_code)
+    if game_state:
+        frame = game_state.canvas.record(strokes, binary)
+        replay_recorder.record_strokes(room_code, frame, game_state.canvas)
+
+    room = get_room(room_code)
+    if room and room.spectators:
+        # Spectators are served later by their own flusher
+        spectator_feed.add(room_code, strokes, binary)
+        start_spectator_flusher()
 
-    thread = threading.Thread(target=timer, daemon=True)
-    thread.start()
+    if strokes:
+        # JSON strokes can be rendered by every client
+        socketio.emit('draw_batch', {'strokes': strokes},
+                      room=room_code, skip_sid=sender_sid)
 
+    if not binary or not room:
+        return
+
+    # Snapshot the members; the flusher does not take the room lock
+    members = list(room.players)
+    json_sids = [sid for sid in members if sid != sender_sid and not uses_binary(sid)]
+    binary_sids = [sid for sid in members if sid != sender_sid and uses_binary(sid)]
+
+    if binary_sids:
+        PAYLOAD_BYTES.observe(len(binary), 'draw_bin')
+        socketio.emit('draw_bin', binary, room=room_code,
+                      skip_sid=[sender_sid] + json_sids)
+
+    # Only decode when some receiver did not negotiate the binary format
+    if json_sids:
+        try:
+            decoded = decode_strokes(binary)
+        except ValueError:
+            return
+        socketio.emit('draw_batch', {'strokes': decoded}, room=room_code,
+                      skip_sid=[sender_sid] + binary_sids)
+
+
+def start_turn_timer(room_code):
+    """Schedule periodic timer updates for the current turn."""
+    game_state = game_states.get(room_code)
+    if not game_state or not game_state.turn_end_time:
+        return
+
+    scheduler.call_later(0, turn_timer_tick, room_code, game_state.turn_id)
+
+
+@room_locked
+def turn_timer_tick(room_code, turn_id):
+    """Emit a timer update and schedule the next tick (runs on the scheduler)."""
+    game_state = game_states.get(room_code)
+
+    # Ignore ticks from a turn that has already ended
+    if not game_state or game_state.turn_id != turn_id:
+        return
+    if not (game_state.game_active and game_state.timer_active):
+        return
+
+    remaining = int(max(0, game_state.turn_end_time - time.time()))
+    room = get_room(room_code)
+
+    try:
+        socketio.emit('timer_update', {'time_remaining': remaining}, room=room_code)
+        emit_to_spectators(room, 'timer_update', {'time_remaining': remaining})
+    except Exception:
+        pass
+
+    # If not enough players left, end the game/turn early
+    if not room or room.get_player_count() < 2:
+        handle_turn_end(room_code)
+        return
+
+    if remaining <= 0:
+        if game_state.is_turn_expired():
+            handle_turn_end(room_code)
+            return
 
+    # Next tick on the following whole second, or right at the deadline
+    until_end = game_state.turn_end_time - time.time()
+    scheduler.call_later(min(1, max(0, until_end)), turn_timer_tick, room_code, turn_id)
+
+
+@room_locked
 def handle_turn_end(room_code):
     """Handle end of turn."""
     room = get_room(room_code)
-    game_state = get_game_state(room_code)
+    game_state = game_states.get(room_code)
+    
+    if not room or not game_state or not game_state.game_active:
+        return
     
-    if not room or not game_state.game_active:
+    # Already between turns (e.g. timer and last guess raced)
+    if not game_state.timer_active:
         return
+    room.touch()
+    
+    # Drop strokes still queued for the finished drawing
+    stroke_buffer.discard(room_code)
+    spectator_feed.discard(room_code)
+    
+    leaderboard = room.leaderboard.to_list()
     
     # Reveal the word to everyone at end of turn
-    socketio.emit('turn_ended', {
+    turn_ended = {
         'word': game_state.current_word,
-        'leaderboard': get_leaderboard(room.players)
-    }, room=room_code)
+        'leaderboard': leaderboard
+    }
+    socketio.emit('turn_ended', turn_ended, room=room_code)
+    emit_to_spectators(room, 'turn_ended', turn_ended)
+    replay_recorder.record(room_code, TURN_END, turn_ended)
+    queue_turn_thumbnail(room, game_state)
     
     reset_round_scores(room.players)
     game_ended = game_state.end_turn()
     
+    TURN_TRANSITIONS.inc('game_ended' if game_ended else 'next_turn')
+    
     if game_ended:
         winners = get_winner(room.players)
-        socketio.emit('game_ended', {
-            'final_leaderboard': get_leaderboard(room.players),
+        profile_store.record_game([p.username for p in room.players.values()],
+                                  [w['username'] for w in winners])
+        results = {
+            'final_leaderboard': leaderboard,
             'winners': winners
-        }, room=room_code)
+        }
+        results['replay_id'] = replay_recorder.end_game(room_code, results)
+        # Thumbnails still rendering follow as 'turn_thumbnail'
+        results['gallery'] = list(game_state.gallery)
+        socketio.emit('game_ended', results, room=room_code)
+        emit_to_spectators(room, 'game_ended', results)
         
         game_state.game_active = False
     else:
-        time.sleep(3)
-        game_state.start_turn()
+        # Pause to show the revealed word without blocking this thread
+        scheduler.call_later(TURN_TRANSITION_TIME, start_next_turn, room_code)
 
-        drawer = room.get_player(game_state.drawer_sid)
-        # Broadcast new turn info (do NOT include the secret word here)
-        socketio.emit('new_turn', {
-            'game_state': game_state.to_dict(),
-            'drawer_sid': game_state.drawer_sid,
-            'drawer_username': drawer.username if drawer else 'Unknown',
-            'category': game_state.word_category,
-            'word_length': len(game_state.current_word) if game_state.current_word else 0
-        }, room=room_code)
 
-        # Send the secret word only to the drawer
-        socketio.emit('your_turn_to_draw', {
-            'word': game_state.current_word,
-            'category': game_state.word_category
-        }, room=game_state.drawer_sid)
+def queue_turn_thumbnail(room, game_state):
+    """Render the finished drawing in the background for the end-of-game gallery."""
+    drawer = room.get_player(game_state.drawer_sid)
+    game_id = game_state.game_id
+    entry = {
+        'turn_id': game_state.turn_id,
+        'round': game_state.current_round,
+        'drawer': drawer.username if drawer else None,
+        'word': game_state.current_word
+    }
+
+    def thumbnail_ready(image):
+        # Runs on the scheduler (deliver_thumbnails), so serialize with the room's handlers
+        with room.lock:
+            # The room was closed or a new game started while this rendered
+            if game_states.get(room.room_code) is not game_state or game_state.game_id != game_id:
+                return
+            entry['image'] = image
+            game_state.gallery.append(entry)
+            socketio.emit('turn_thumbnail', entry, room=room.room_code)
+            emit_to_spectators(room, 'turn_thumbnail', entry)
+
+    thumbnail_renderer.submit(game_state.canvas.to_bytes(), thumbnail_ready)
+
+
+def deliver_thumbnails():
+    """Hand finished thumbnails to their rooms, then reschedule (runs on the scheduler)."""
+    try:
+        thumbnail_renderer.deliver()
+    finally:
+        scheduler.call_later(THUMBNAIL_POLL_INTERVAL, deliver_thumbnails)
+
+
+if thumbnail_renderer.enabled:
+    scheduler.call_later(THUMBNAIL_POLL_INTERVAL, deliver_thumbnails)
+
+
+@room_locked
+def start_next_turn(room_code):
+    """Begin the next turn after the inter-turn pause (runs on the scheduler)."""
+    room = get_room(room_code)
+    game_state = game_states.get(room_code)
+
+    if not room or not game_state or not game_state.game_active:
+        return
+
+    if not game_state.start_turn():
+        return
+
+    room.touch()
+    record_turn_start(room, game_state)
+    drawer = room.get_player(game_state.drawer_sid)
+    # Broadcast new turn info (do NOT include the secret word here)
+    new_turn = {
+        'state': room.sync.delta(room, game_state),
+        'drawer_sid': game_state.drawer_sid,
+        'drawer_username': drawer.username if drawer else 'Unknown',
+        'category': game_state.word_category,
+        'word_length': len(game_state.current_word) if game_state.current_word else 0
+    }
+    socketio.emit('new_turn', new_turn, room=room_code)
+    emit_to_spectators(room, 'new_turn', new_turn)
+
+    # Send the secret word only to the drawer
+    socketio.emit('your_turn_to_draw', {
+        'word': game_state.current_word,
+        'category': game_state.word_category
+    }, room=game_state.drawer_sid)
+
+    # Start periodic timer updates
+    start_turn_timer(room_code)
+
+
+@room_locked
+def close_idle_room(room_code, reason):
+    """Tear down a room chosen by the sweeper and tell anyone still in it."""
+    room = close_room_logic(room_code)
+    delete_game_state(room_code)
+    stroke_buffer.discard(room_code)
+    spectator_feed.discard(room_code)
+    replay_recorder.end_game(room_code)
+    if room is None:
+        return
+    
+    log_event(logger, logging.INFO, 'room_closed', room=room_code, reason=reason)
+    try:
+        socketio.emit('room_closed', {'reason': reason}, room=room_code)
+        socketio.close_room(room_code)
+        if room.spectators:
+            socketio.close_room(spectator_channel(room_code))
+    except Exception:
+        pass
+
+
+def expire_player(room, sid):
+    """Give up the seat of a player who never came back (sweeper, room lock held)."""
+    username = room.players[sid].username
+    if room.game_started:
+        # Restored mid-game players wait in `disconnected` too
+        remove_game_player(room, sid, username)
+        return
+    room.remove_player(sid)
+    if room.players:
+        socketio.emit('player_left', {
+            'username': username,
+            'state': room.sync.delta(room)
+        }, room=room.room_code)
+
+
+idle_sweeper = Sweeper(rooms, game_states, game_sessions, close_idle_room, expire_player)
+
+
+def run_idle_sweep():
+    """Sweep idle rooms and stale sessions, then reschedule (runs on the scheduler)."""
+    try:
+        idle_sweeper.sweep()
+    finally:
+        scheduler.call_later(GC_INTERVAL, run_idle_sweep)
+
+
+scheduler.call_later(GC_INTERVAL, run_idle_sweep)
+
+
+def resume_restored_rooms():
+    """Load the last snapshot and restart the timers of games in progress."""
+    for room in room_snapshotter.restore():
+        game_state = game_states.get(room.room_code)
+        if not game_state or not game_state.game_active:
+            continue
+        if game_state.timer_active:
+            start_turn_timer(room.room_code)
+        else:
+            # Restarted during the pause between turns
+            scheduler.call_later(TURN_TRANSITION_TIME, start_next_turn, room.room_code)
+    room_snapshotter.start()
 
-        # Start periodic timer updates
-        start_turn_timer(room_code)
 
 
 if __name__ == '__main__':
-    # Get port from environment (Render provides this)
-    port = int(os.environ.get('PORT', 5000))
-    
-    # Check if running on Render (production)
-    is_production = os.environ.get('RENDER') is not None
-    
-    if is_production:
-        print(f"🚀 Starting production server on port {port}")
-        # Production settings for Render
-        socketio.run(
-            app, 
-            host='0.0.0.0', 
-            port=port, 
-            debug=False,
-            allow_unsafe_werkzeug=True
-        )
-    else:
-        print(f"🔧 Starting development server on port {port}")
-        # Development settings for local testing
-        socketio.run(
-            app,
-            host='0.0.0.0',
-            port=port,
-            debug=True,
-            use_reloader=False,  # Disable reloader to avoid threading issues
-            log_output=True
-        )
\ No newline at end of file
+    # Running this module directly would make it the main module that
+    # multiprocessing re-imports in every worker process
+    raise SystemExit("Start the server with `python -m backend`")
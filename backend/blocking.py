@@ -0,0 +1,24 @@
+"""
+Blocking Calls - Disk work on a real OS thread under green-thread servers
+
+With ASYNC_MODE=eventlet or gevent the standard library is patched, so
+every `threading.Thread` is a green thread and a SQLite commit or an fsync
+inside one stalls the whole hub. run_blocking hands such calls to the
+hub's native thread pool and suspends only the calling green thread; in
+threading mode it simply makes the call.
+
+Functions passed in run on a thread the hub does not manage, so they must
+not take patched locks themselves; callers hold any lock around the call.
+"""
+from .config import ASYNC_MODE
+
+
+def run_blocking(func, *args):
+    """Call `func(*args)` on a native thread and return its result."""
+    if ASYNC_MODE == 'eventlet':
+        from eventlet import tpool
+        return tpool.execute(func, *args)
+    if ASYNC_MODE == 'gevent':
+        from gevent import get_hub
+        return get_hub().threadpool.apply(func, args)
+    return func(*args)
@@ -1,12 +1,33 @@
 """
 Game Configuration Settings
 """
+import os
+
+# Server Settings
+# 'threading' (Werkzeug, dev), 'eventlet' or 'gevent' (green threads, production)
+ASYNC_MODE = os.environ.get('ASYNC_MODE', 'threading')
+
+# Logging Settings
+LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO').upper()
+LOG_FORMAT = os.environ.get('LOG_FORMAT', 'text')  # 'text' (key=value) or 'json'
+LOG_SAMPLE_EVERY = int(os.environ.get('LOG_SAMPLE_EVERY', 100))  # for high-frequency events
+SOCKETIO_LOG_PACKETS = os.environ.get('SOCKETIO_LOG_PACKETS') == '1'  # Socket.IO/Engine.IO packet logs
+
+# Multi-worker Settings
+WORKER_ID = int(os.environ.get('WORKER_ID', 0))  # index of this process, 0..WORKER_COUNT-1
+WORKER_COUNT = int(os.environ.get('WORKER_COUNT', 1))
+# Socket.IO fan-out between workers, e.g. 'redis://localhost:6379' or a kombu
+# URL such as 'sqla+sqlite:////tmp/drawing-game-mq.db' for a local broker
+MESSAGE_QUEUE = os.environ.get('MESSAGE_QUEUE') or None
+STATE_BACKEND = os.environ.get('STATE_BACKEND', 'memory')  # 'memory' or 'sqlite'
+STATE_DB_PATH = os.environ.get('STATE_DB_PATH', 'drawing_game_state.db')
 
 # Game Rules
 TOTAL_ROUNDS = 3
 TURN_DURATION = 60  # seconds per turn
 MAX_PLAYERS = 8
 MIN_PLAYERS = 2
+QUICK_PLAY_MAX_CANDIDATES = 64  # lobbies quick play may turn down before it opens a new one
 
 # Scoring System
 POINTS_PER_CORRECT_GUESS = 10
@@ -21,12 +42,79 @@ ROOM_CODE_CHARS = "ABCDEFGHJKLMNPQRSTUVWXYZ23456789"  # Excluding confusing char
 # Timer Settings
 LOBBY_WAIT_TIME = 10  # seconds before auto-start if min players reached
 ROUND_TRANSITION_TIME = 5  # seconds to show scores between rounds
+TURN_TRANSITION_TIME = 3  # seconds to show the revealed word between turns
 GAME_END_DISPLAY_TIME = 10  # seconds to show final results
 
+# Idle Sweeper Settings
+GC_INTERVAL = 30  # seconds between sweeps of idle rooms and stale sessions
+LOBBY_RECONNECT_TTL = 120  # seconds a disconnected lobby player keeps their seat
+ROOM_IDLE_TTL = 30 * 60  # seconds before a lobby with no activity is closed
+ENDED_GAME_TTL = 5 * 60  # seconds a finished game is kept for late viewers
+MAX_ROOMS = int(os.environ.get('MAX_ROOMS', 10000))  # least recently active rooms are evicted above this
+
 # Canvas Settings
 CANVAS_WIDTH = 800
 CANVAS_HEIGHT = 600
 
+# Drawing Broadcast Settings
+DRAW_FLUSH_HZ = 30  # batched stroke frames sent per second per room
+STROKE_SNAPSHOT_INTERVAL = 64  # flushed frames between compacted canvas snapshots
+# Pixels a simplified stroke may deviate from the raw one; 0 disables. Simplifying
+# binary frames costs one decode and re-encode per room per flush tick
+STROKE_SIMPLIFY_TOLERANCE = 1.0
+STROKE_SIMPLIFY_LOOKAHEAD = 32  # raw points held back at most while a stroke is being simplified
+
+# Drawing Thumbnails (need NumPy; rendered in worker processes at the end of each turn)
+THUMBNAIL_WORKERS = int(os.environ.get('THUMBNAIL_WORKERS', 2))  # 0 disables thumbnails
+THUMBNAIL_SCALE = 4  # canvas pixels per thumbnail pixel along each axis
+THUMBNAIL_POLL_INTERVAL = 0.25  # seconds between hand-offs of finished thumbnails to their rooms
+
+# Spectator Settings
+MAX_SPECTATORS = 500  # read-only viewers per room, on top of MAX_PLAYERS
+SPECTATOR_FLUSH_HZ = 5  # drawing frames per second sent to spectators
+SPECTATOR_POINT_STRIDE = 2  # spectators get every Nth polyline point
+
+# Replay Recording
+REPLAY_ENABLED = os.environ.get('REPLAY_ENABLED', '1') == '1'
+REPLAY_DIR = os.environ.get('REPLAY_DIR', os.path.join(os.path.dirname(__file__), 'replays'))
+REPLAY_QUEUE_SIZE = 10000  # pending records before new ones are dropped
+REPLAY_FLUSH_INTERVAL = 1  # seconds of idle writer before buffered records hit the disk
+REPLAY_KEYFRAME_INTERVAL = 5  # seconds between full-canvas keyframes used for seeking
+REPLAY_OPEN_FILES = 64  # replay files kept open by the writer; the least recently written are closed
+
+# Crash-Safe Snapshots (live rooms are written periodically and restored at startup)
+SNAPSHOT_INTERVAL = float(os.environ.get('SNAPSHOT_INTERVAL', 5))  # seconds between snapshots; 0 disables
+SNAPSHOT_PATH = os.environ.get(
+    'SNAPSHOT_PATH', os.path.join(os.path.dirname(__file__), 'snapshots', f'worker-{WORKER_ID}.snap'))
+
+# Player Profiles (lifetime stats per username, persisted with write-behind)
+PROFILES_ENABLED = os.environ.get('PROFILES_ENABLED', '1') == '1'
+PROFILE_DB_PATH = os.environ.get('PROFILE_DB_PATH', os.path.join(os.path.dirname(__file__), 'profiles.db'))
+PROFILE_QUEUE_SIZE = 10000  # pending stat updates before new ones are dropped
+PROFILE_FLUSH_INTERVAL = 1  # seconds between batched commits
+PROFILE_BATCH_SIZE = 1000  # stat updates folded into one transaction at most
+
+# Rate Limits: {event: (events per second, burst size)} per connection
+RATE_LIMITS = {
+    'draw': (90, 180),
+    'guess': (3, 6),
+    'chat_message': (2, 5),
+    'reaction': (2, 5)
+}
+RATE_LIMIT_NOTICE_INTERVAL = 2  # seconds between 'rate_limited' notices per client
+REACTION_MERGE_WINDOW = 1  # seconds over which excess reactions are merged into counts
+# Reactions offered by the emoji bar in game.html; anything else is ignored
+REACTION_EMOJIS = frozenset(['😂', '❤️', '👍', '🔥', '👏', '😮', '🤔', '😍'])
+
+# Guess Matching
+CLOSE_GUESS_MAX_DISTANCE = 2  # edit distance for "so close" (1 for words of 5 letters or fewer)
+
 # Word Categories
 WORD_CATEGORIES = ["animals", "objects", "food", "sports", "nature"]
-DEFAULT_CATEGORY = "animals"
\ No newline at end of file
+DEFAULT_CATEGORY = "animals"
+# Relative category weights for word selection; missing categories weigh 1
+WORD_CATEGORY_WEIGHTS = {}
+# Optional external word list loaded on first use ("category,word" or one word per line)
+WORD_LIST_PATH = os.environ.get('WORD_LIST_PATH')
+# Directory of compiled word packs (<name>.wpk) that hosts can pick per room
+WORD_PACK_DIR = os.environ.get('WORD_PACK_DIR', os.path.join(os.path.dirname(__file__), 'word_packs'))
\ No newline at end of file
@@ -4,7 +4,9 @@ Game Logic - Rounds, Turns, and Game State Management
 import time
 from datetime import datetime
 from .config import TOTAL_ROUNDS, TURN_DURATION
-from .words import get_random_word
+from .words import WordSelector, GuessMatcher
+from .strokes import CanvasHistory
+from .rooms import rooms
 
 
 class GameState:
@@ -17,25 +19,32 @@ class GameState:
         self.drawer_sid = None
         self.current_word = None
         self.word_category = None
-        self.used_words = []  # Track used words to avoid repetition
+        self.guess_matcher = None  # Compiled matcher for current_word
+        self.word_selector = None  # Per-game deck so words don't repeat
         
         self.turn_start_time = None
         self.turn_end_time = None
         self.timer_active = False
+        self.turn_id = 0  # Incremented every turn so stale timers can be ignored
+        self.game_id = 0  # Incremented every game so late results of an earlier one can be ignored
         
         self.players_order = []  # List of SIDs in drawing order
         self.guessed_players = set()  # SIDs of players who guessed correctly
+        self.canvas = CanvasHistory()  # Strokes drawn during the current turn
+        self.gallery = []  # Rendered thumbnails of this game's finished drawings
         
         self.game_active = False
         self.game_ended = False
     
-    def start_game(self, player_sids):
-        """Initialize game with player order."""
+    def start_game(self, player_sids, word_pack=None):
+        """Initialize game with player order and an optional WordPack."""
         self.players_order = list(player_sids)
         self.game_active = True
         self.current_round = 1
         self.current_drawer_index = 0
-        self.used_words = []
+        self.game_id += 1
+        self.gallery = []
+        self.word_selector = WordSelector(words=word_pack.categories if word_pack else None)
     
     def start_turn(self):
         """Start a new turn."""
@@ -46,16 +55,20 @@ class GameState:
         self.drawer_sid = self.players_order[self.current_drawer_index]
         
         # Select a random word
-        self.current_word, self.word_category = get_random_word(exclude_words=self.used_words)
-        self.used_words.append(self.current_word)
+        if self.word_selector is None:
+            self.word_selector = WordSelector()
+        self.current_word, self.word_category = self.word_selector.next_word()
+        self.guess_matcher = GuessMatcher(self.current_word)
         
         # Start timer
+        self.turn_id += 1
         self.turn_start_time = time.time()
         self.turn_end_time = self.turn_start_time + TURN_DURATION
         self.timer_active = True
         
-        # Reset guessed players
+        # Reset guessed players and the drawing
         self.guessed_players.clear()
+        self.canvas.clear()
         
         return True
     
@@ -95,6 +108,21 @@ class GameState:
         """Check if a player has already guessed."""
         return sid in self.guessed_players
     
+    def check_guess(self, guess):
+        """Match a guess against the current word: 'correct', 'close' or None."""
+        if not self.guess_matcher:
+            return None
+        return self.guess_matcher.match(guess)
+    
+    def rebind_player(self, old_sid, sid):
+        """Carry a player's place in the game over to a new connection."""
+        self.players_order = [sid if s == old_sid else s for s in self.players_order]
+        if self.drawer_sid == old_sid:
+            self.drawer_sid = sid
+        if old_sid in self.guessed_players:
+            self.guessed_players.discard(old_sid)
+            self.guessed_players.add(sid)
+    
     def is_drawer(self, sid):
         """Check if a player is the current drawer."""
         return sid == self.drawer_sid
@@ -124,15 +152,19 @@ class GameState:
     def remove_player(self, sid):
         """Remove a player from the game (if they disconnect)."""
         if sid in self.players_order:
-            # If current drawer leaves, end turn
-            if sid == self.drawer_sid:
-                return True  # Signal to end turn
-            
+            index = self.players_order.index(sid)
             self.players_order.remove(sid)
             
-            # Adjust drawer index if needed
-            if self.current_drawer_index >= len(self.players_order):
+            # Keep the index on whoever draws next; a leaving drawer's turn
+            # still ends normally and end_turn then advances past them
+            if index < self.current_drawer_index or (index == self.current_drawer_index and sid == self.drawer_sid):
+                self.current_drawer_index -= 1
+            elif self.current_drawer_index >= len(self.players_order):
                 self.current_drawer_index = 0
+            
+            # If current drawer leaves, end turn
+            if sid == self.drawer_sid:
+                return True  # Signal to end turn
         
         return False
     
@@ -155,10 +187,11 @@ game_states = {}
 
 
 def get_game_state(room_code):
-    """Get or create game state for a room."""
-    if room_code not in game_states:
-        game_states[room_code] = GameState(room_code)
-    return game_states[room_code]
+    """Get or create game state for a room; None if the room does not exist."""
+    game_state = game_states.get(room_code)
+    if game_state is None and room_code in rooms:
+        game_state = game_states[room_code] = GameState(room_code)
+    return game_state
 
 
 def delete_game_state(room_code):
@@ -1,3 +1,6 @@
+from .wire import uses_binary
+
+
 def register_game_state_handlers(socketio, get_room_fn, get_game_state_fn, game_sessions):
     """Register game-state related socket handlers.
 
@@ -53,5 +56,8 @@ def register_game_state_handlers(socketio, get_room_fn, get_game_state_fn, game_
             'current_round': game_state.current_round,
             'is_drawer': is_drawer,
             'game_active': game_state.game_active,
-            'time_remaining': game_state.get_time_remaining()
+            'time_remaining': game_state.get_time_remaining(),
+            'canvas': game_state.canvas.get_payload(uses_binary(sid)),
+            'leaderboard': room.leaderboard.to_list(),
+            'state': room.sync.full(room, game_state)
         })
\ No newline at end of file
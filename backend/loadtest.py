@@ -0,0 +1,335 @@
+"""
+Load Test Harness - Simulates many concurrent rooms against a local server
+
+Usage:
+    pip install "python-socketio[asyncio_client]" psutil
+    python -m backend.loadtest --rooms 500 --players 4 --duration 60
+
+By default the server is started as a subprocess (`python -m backend`)
+on a free port; pass --url to target a server that is already running.
+Broadcast latency is measured on chat messages, which carry their send
+time and are echoed to the whole room including the sender.
+"""
+import argparse
+import asyncio
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+try:
+    import socketio
+except ImportError:  # pragma: no cover - reported at startup
+    socketio = None
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+from .config import CANVAS_WIDTH, CANVAS_HEIGHT
+
+LATENCY_PREFIX = 'lt:'
+
+
+class Stats:
+    """Counters shared by every simulated player."""
+
+    def __init__(self):
+        self.sent = {}
+        self.received = {}
+        self.latencies = []
+        self.errors = 0
+
+    def count_sent(self, event):
+        self.sent[event] = self.sent.get(event, 0) + 1
+
+    def count_received(self, event):
+        self.received[event] = self.received.get(event, 0) + 1
+
+
+class SimulatedPlayer:
+    """One socket.io client playing in a room."""
+
+    def __init__(self, url, username, room, stats, args):
+        self.url = url
+        self.username = username
+        self.room = room
+        self.stats = stats
+        self.args = args
+        self.sio = socketio.AsyncClient(reconnection=False)
+        self.is_drawer = False
+        self.x = random.uniform(0, CANVAS_WIDTH)
+        self.y = random.uniform(0, CANVAS_HEIGHT)
+        self._register_handlers()
+
+    def _register_handlers(self):
+        stats = self.stats
+
+        @self.sio.on('*')
+        async def any_event(event, data=None):
+            stats.count_received(event)
+
+        @self.sio.on('room_created')
+        async def on_room_created(data):
+            stats.count_received('room_created')
+            self.room['code'] = data['room_code']
+            self.room['created'].set()
+
+        @self.sio.on('your_turn_to_draw')
+        async def on_your_turn(data):
+            stats.count_received('your_turn_to_draw')
+            self.is_drawer = True
+            self.room['word'] = data.get('word')
+
+        @self.sio.on('new_turn')
+        async def on_new_turn(data):
+            stats.count_received('new_turn')
+            self.is_drawer = False
+            self.room['word'] = None
+
+        @self.sio.on('chat_message')
+        async def on_chat(data):
+            stats.count_received('chat_message')
+            message = data.get('message') or ''
+            if message.startswith(LATENCY_PREFIX):
+                try:
+                    sent_at = float(message[len(LATENCY_PREFIX):])
+                except ValueError:
+                    return
+                stats.latencies.append(time.perf_counter() - sent_at)
+
+        @self.sio.on('game_ended')
+        async def on_game_ended(data):
+            stats.count_received('game_ended')
+            self.room['ended'] = True
+
+    async def emit(self, event, data):
+        try:
+            await self.sio.emit(event, data)
+            self.stats.count_sent(event)
+        except Exception:
+            self.stats.errors += 1
+
+    async def connect(self):
+        query = f"?room={self.room['code']}" if self.room.get('code') else ''
+        await self.sio.connect(self.url + query, transports=['websocket'])
+
+    def _next_segment(self):
+        x = min(CANVAS_WIDTH, max(0, self.x + random.uniform(-8, 8)))
+        y = min(CANVAS_HEIGHT, max(0, self.y + random.uniform(-8, 8)))
+        segment = {'type': 'line', 'x1': self.x, 'y1': self.y, 'x2': x, 'y2': y,
+                   'color': '#000000', 'size': 3}
+        self.x, self.y = x, y
+        return segment
+
+    async def play(self, deadline):
+        """Drive draw/guess/chat traffic until the deadline."""
+        draw_interval = 1.0 / self.args.draw_hz
+        next_chat = time.monotonic() + random.uniform(0, self.args.chat_interval)
+        next_guess = time.monotonic() + random.uniform(0, self.args.guess_interval)
+
+        while time.monotonic() < deadline and not self.room.get('ended'):
+            now = time.monotonic()
+            code = self.room['code']
+
+            if self.is_drawer:
+                segments = [self._next_segment() for _ in range(self.args.segments_per_batch)]
+                await self.emit('draw', {'room_code': code, 'segments': segments})
+            else:
+                if now >= next_guess:
+                    word = self.room.get('word')
+                    # Mostly wrong guesses, occasionally the real word
+                    if word and random.random() < self.args.correct_ratio:
+                        guess = word
+                    else:
+                        guess = random.choice(['cat', 'house', 'tree', 'pizza', 'car'])
+                    await self.emit('guess', {'room_code': code, 'guess': guess})
+                    next_guess = now + self.args.guess_interval
+                if now >= next_chat:
+                    message = f'{LATENCY_PREFIX}{time.perf_counter()}'
+                    await self.emit('chat_message', {'room_code': code, 'message': message})
+                    next_chat = now + self.args.chat_interval
+
+            await asyncio.sleep(draw_interval)
+
+    async def close(self):
+        try:
+            await self.sio.disconnect()
+        except Exception:
+            pass
+
+
+async def run_room(index, url, stats, args, deadline):
+    """Create a room, fill it, start the game and play until the deadline."""
+    room = {'code': None, 'created': asyncio.Event(), 'word': None, 'ended': False}
+    host = SimulatedPlayer(url, f'host{index}', room, stats, args)
+    players = [host]
+
+    try:
+        await host.connect()
+        await host.emit('create_room', {'username': host.username})
+        await asyncio.wait_for(room['created'].wait(), timeout=30)
+
+        for n in range(1, args.players):
+            player = SimulatedPlayer(url, f'p{index}_{n}', room, stats, args)
+            await player.connect()
+            await player.emit('join_room', {'room_code': room['code'], 'username': player.username})
+            players.append(player)
+
+        await asyncio.sleep(0.5)
+        await host.emit('start_game', {'room_code': room['code']})
+        await asyncio.gather(*(p.play(deadline) for p in players))
+    except Exception:
+        stats.errors += 1
+    finally:
+        await asyncio.gather(*(p.close() for p in players))
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of an unsorted list (None if empty)."""
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start_server(port, async_mode, data_dir):
+    """Launch `python -m backend` and wait until it accepts connections.
+
+    Replays and snapshots live in `data_dir` (snapshots are never written)
+    and profiles are off, so a run neither restores the developer's rooms
+    nor leaves anything behind in the source tree.
+    """
+    env = dict(os.environ, PORT=str(port), ASYNC_MODE=async_mode, PROFILES_ENABLED='0',
+               SNAPSHOT_INTERVAL='0', SNAPSHOT_PATH=os.path.join(data_dir, 'rooms.snap'),
+               REPLAY_DIR=os.path.join(data_dir, 'replays'))
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    proc = subprocess.Popen([sys.executable, '-m', 'backend'], cwd=root, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    for _ in range(100):
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=0.2):
+                return proc
+        except OSError:
+            if proc.poll() is not None:
+                raise RuntimeError("Server exited during startup")
+            time.sleep(0.1)
+    proc.terminate()
+    raise RuntimeError("Server did not start listening in time")
+
+
+class ProcessSampler:
+    """Samples CPU and RSS of the server process while the test runs."""
+
+    def __init__(self, pid):
+        self.process = psutil.Process(pid) if (psutil and pid) else None
+        self.cpu = []
+        self.rss = []
+
+    async def run(self, deadline):
+        if not self.process:
+            return
+        self.process.cpu_percent(None)
+        while time.monotonic() < deadline:
+            await asyncio.sleep(1)
+            try:
+                self.cpu.append(self.process.cpu_percent(None))
+                self.rss.append(self.process.memory_info().rss)
+            except psutil.Error:
+                return
+
+
+async def run_load(url, args, server_pid):
+    stats = Stats()
+    started = time.monotonic()
+    deadline = started + args.duration
+    sampler = ProcessSampler(server_pid)
+
+    tasks = []
+    for index in range(args.rooms):
+        tasks.append(asyncio.create_task(run_room(index, url, stats, args, deadline)))
+        # Ramp up gradually so connection setup does not dominate the run
+        if args.ramp > 0:
+            await asyncio.sleep(args.ramp / args.rooms)
+
+    await asyncio.gather(sampler.run(deadline), *tasks)
+    return stats, time.monotonic() - started, sampler
+
+
+def report(stats, elapsed, sampler, args):
+    sent = sum(stats.sent.values())
+    received = sum(stats.received.values())
+    p50 = percentile(stats.latencies, 50)
+    p99 = percentile(stats.latencies, 99)
+
+    print(f"Rooms: {args.rooms}  Players/room: {args.players}  Duration: {elapsed:.1f}s")
+    print(f"Events sent:     {sent} ({sent / elapsed:.0f}/s)")
+    for event, count in sorted(stats.sent.items()):
+        print(f"  {event:<18} {count}")
+    print(f"Events received: {received} ({received / elapsed:.0f}/s)")
+    for event, count in sorted(stats.received.items()):
+        print(f"  {event:<18} {count}")
+    if p50 is not None:
+        print(f"Broadcast latency: p50 {p50 * 1000:.1f} ms  p99 {p99 * 1000:.1f} ms  "
+              f"({len(stats.latencies)} samples)")
+    if sampler.cpu:
+        avg_cpu = sum(sampler.cpu) / len(sampler.cpu)
+        peak_rss = max(sampler.rss)
+        print(f"Server CPU: avg {avg_cpu:.0f}%  ({avg_cpu / args.rooms:.2f}% per room)")
+        print(f"Server RSS: peak {peak_rss / 2**20:.1f} MiB  "
+              f"({peak_rss / args.rooms / 1024:.1f} KiB per room)")
+    else:
+        print("Server CPU/memory: install psutil and let the harness start the server")
+    print(f"Errors: {stats.errors}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Drawing game load generator")
+    parser.add_argument('--rooms', type=int, default=100)
+    parser.add_argument('--players', type=int, default=4, help="players per room")
+    parser.add_argument('--duration', type=float, default=30, help="seconds of traffic")
+    parser.add_argument('--ramp', type=float, default=5, help="seconds to open all rooms")
+    parser.add_argument('--draw-hz', type=float, default=30, help="drawer batches per second")
+    parser.add_argument('--segments-per-batch', type=int, default=3)
+    parser.add_argument('--guess-interval', type=float, default=2.0)
+    parser.add_argument('--chat-interval', type=float, default=3.0)
+    parser.add_argument('--correct-ratio', type=float, default=0.05)
+    parser.add_argument('--url', help="target an already running server instead of starting one")
+    parser.add_argument('--async-mode', default='eventlet', help="ASYNC_MODE for the spawned server")
+    args = parser.parse_args(argv)
+
+    if socketio is None:
+        parser.error('python-socketio with the asyncio client is required: '
+                     'pip install "python-socketio[asyncio_client]"')
+
+    proc = None
+    url = args.url
+    data_dir = tempfile.TemporaryDirectory(prefix='drawing-game-loadtest-')
+    if not url:
+        port = free_port()
+        proc = start_server(port, args.async_mode, data_dir.name)
+        url = f'http://127.0.0.1:{port}'
+
+    try:
+        stats, elapsed, sampler = asyncio.run(run_load(url, args, proc.pid if proc else None))
+        report(stats, elapsed, sampler, args)
+    finally:
+        if proc:
+            proc.terminate()
+            proc.wait(timeout=10)
+        data_dir.cleanup()
+
+
+if __name__ == '__main__':
+    main()
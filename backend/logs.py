@@ -0,0 +1,89 @@
+"""
+Logging Setup - Structured, level-gated logging with sampling
+"""
+import json
+import logging
+import sys
+
+from .config import LOG_LEVEL, LOG_FORMAT, LOG_SAMPLE_EVERY
+
+
+class KeyValueFormatter(logging.Formatter):
+    """Renders `time level logger event key=value ...` lines."""
+
+    def format(self, record):
+        fields = getattr(record, 'fields', None) or {}
+        parts = [
+            self.formatTime(record, '%Y-%m-%dT%H:%M:%S'),
+            record.levelname,
+            record.name,
+            record.getMessage()
+        ]
+        parts.extend(f'{key}={value}' for key, value in fields.items())
+        line = ' '.join(parts)
+        if record.exc_info:
+            line += '\n' + self.formatException(record.exc_info)
+        return line
+
+
+class JsonFormatter(logging.Formatter):
+    """Renders one JSON object per line for log shippers."""
+
+    def format(self, record):
+        entry = {
+            'ts': round(record.created, 3),
+            'level': record.levelname,
+            'logger': record.name,
+            'event': record.getMessage()
+        }
+        entry.update(getattr(record, 'fields', None) or {})
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+def configure_logging(level=LOG_LEVEL, fmt=LOG_FORMAT):
+    """Install a single stdout handler on the `backend` logger tree."""
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(JsonFormatter() if fmt == 'json' else KeyValueFormatter())
+
+    root = logging.getLogger('backend')
+    root.handlers[:] = [handler]
+    root.setLevel(level)
+    root.propagate = False
+
+
+def log_event(logger, level, event, **fields):
+    """Log `event` with structured fields; returns immediately when disabled."""
+    if logger.isEnabledFor(level):
+        logger.log(level, event, extra={'fields': fields})
+
+
+class Sampler:
+    """Lets one in every `every` occurrences of a key through.
+
+    Used for high-frequency events (connects, disconnects, joins) so their
+    logs stay representative without costing a write per event.
+    """
+
+    def __init__(self, every=LOG_SAMPLE_EVERY):
+        self.every = max(1, every)
+        self._counts = {}
+
+    def should_log(self, key):
+        count = self._counts.get(key, 0) + 1
+        self._counts[key] = count
+        return count % self.every == 1 or self.every == 1
+
+
+def log_sampled(logger, level, event, **fields):
+    """Like `log_event`, but only every LOG_SAMPLE_EVERY-th call per event.
+
+    The number of occurrences represented by the line is added as `sampled`.
+    """
+    if logger.isEnabledFor(level) and _sampler.should_log(event):
+        fields['sampled'] = _sampler.every
+        logger.log(level, event, extra={'fields': fields})
+
+
+_sampler = Sampler()
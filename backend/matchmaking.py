@@ -0,0 +1,82 @@
+"""
+Matchmaking - Index of open public lobbies for quick play
+
+Public rooms that have not started are filed in one bucket per player
+count. Quick play walks the buckets from the fullest non-full level down,
+so finding a seat costs at most MAX_PLAYERS bucket checks however many
+rooms exist, and lobbies fill up (and can start) before new ones are used.
+Lobbies the caller turns down (name taken, already tried) each cost one
+more check, up to QUICK_PLAY_MAX_CANDIDATES, after which the search gives up.
+"""
+import threading
+
+from .config import MAX_PLAYERS, QUICK_PLAY_MAX_CANDIDATES
+from .metrics import registry, Counter
+
+QUICK_PLAY = registry.register(Counter(
+    'drawing_game_quick_play_total', 'Quick play requests by outcome', 'outcome'))
+
+
+class LobbyIndex:
+    """Open public lobbies bucketed by fill level.
+
+    Each bucket is a dict used as an insertion-ordered set, so the lobby
+    waiting longest at a level is offered first.
+    """
+
+    def __init__(self, capacity=MAX_PLAYERS):
+        self.capacity = capacity
+        self._buckets = [{} for _ in range(capacity + 1)]  # [{room_code: None}] per player count
+        self._levels = {}  # {room_code: player count it is filed under}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._levels)
+
+    def __contains__(self, room_code):
+        return room_code in self._levels
+
+    def update(self, room):
+        """File a room under its current player count, or drop it if not open."""
+        level = room.get_player_count()
+        is_open = room.public and not room.game_started and 0 < level < self.capacity
+        with self._lock:
+            current = self._levels.get(room.room_code)
+            if current == level and is_open:
+                return
+            if current is not None:
+                del self._buckets[current][room.room_code]
+                del self._levels[room.room_code]
+            if is_open:
+                self._buckets[level][room.room_code] = None
+                self._levels[room.room_code] = level
+
+    def discard(self, room_code):
+        """Forget a room that was closed."""
+        with self._lock:
+            level = self._levels.pop(room_code, None)
+            if level is not None:
+                del self._buckets[level][room_code]
+
+    def best(self, accept=None, limit=QUICK_PLAY_MAX_CANDIDATES):
+        """Code of the fullest open lobby for which `accept(code)` holds, or None.
+
+        The first accepted lobby in the fullest bucket wins. Every lobby
+        `accept` rejects on the way costs a check, so the worst case is
+        `limit` rejected lobbies, after which None is returned as if no
+        lobby were open.
+        """
+        checked = 0
+        with self._lock:
+            for level in range(self.capacity - 1, 0, -1):
+                for room_code in self._buckets[level]:
+                    if accept is None or accept(room_code):
+                        return room_code
+                    checked += 1
+                    if checked >= limit:
+                        return None
+        return None
+
+
+# Global index of this worker's open public lobbies
+lobby_index = LobbyIndex()
@@ -0,0 +1,177 @@
+"""
+Metrics - Minimal Prometheus-style counters, gauges and histograms
+
+Rendered in the Prometheus text exposition format by `/metrics`.
+"""
+import bisect
+import functools
+import gc
+import threading
+import time
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+BYTE_BUCKETS = (64, 256, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+
+def _format_labels(label_name, label_value):
+    if label_name is None:
+        return ''
+    value = str(label_value).replace('\\', '\\\\').replace('"', '\\"')
+    return f'{{{label_name}="{value}"}}'
+
+
+class Counter:
+    """Monotonic counter with an optional single label."""
+
+    def __init__(self, name, help_text, label=None):
+        self.name = name
+        self.help = help_text
+        self.label = label
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, label_value=None, amount=1):
+        with self._lock:
+            self._values[label_value] = self._values.get(label_value, 0) + amount
+
+    def value(self, label_value=None):
+        return self._values.get(label_value, 0)
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} counter']
+        with self._lock:
+            items = list(self._values.items())
+        for label_value, value in items:
+            lines.append(f'{self.name}{_format_labels(self.label, label_value)} {value}')
+        return lines
+
+
+class Gauge:
+    """Gauge whose value is read from a callback at scrape time."""
+
+    def __init__(self, name, help_text, callback):
+        self.name = name
+        self.help = help_text
+        self.callback = callback
+
+    def render(self):
+        try:
+            value = self.callback()
+        except Exception:
+            value = float('nan')
+        return [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} gauge',
+                f'{self.name} {value}']
+
+
+class Histogram:
+    """Cumulative histogram with fixed buckets and an optional single label."""
+
+    def __init__(self, name, help_text, label=None, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.label = label
+        self.buckets = tuple(buckets)
+        self._series = {}  # {label_value: [bucket counts..., +Inf count, sum]}
+        self._lock = threading.Lock()
+
+    def observe(self, value, label_value=None):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_value)
+            if series is None:
+                series = self._series[label_value] = [0] * (len(self.buckets) + 2)
+            series[index] += 1
+            series[-1] += value
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            items = [(k, list(v)) for k, v in self._series.items()]
+        for label_value, series in items:
+            prefix = '' if self.label is None else f'{self.label}="{label_value}",'
+            cumulative = 0
+            for bound, count in zip(self.buckets + ('+Inf',), series[:-1]):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{prefix}le="{bound}"}} {cumulative}')
+            labels = _format_labels(self.label, label_value)
+            lines.append(f'{self.name}_sum{labels} {series[-1]}')
+            lines.append(f'{self.name}_count{labels} {cumulative}')
+        return lines
+
+
+class Registry:
+    """Holds every metric and renders the exposition text."""
+
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+EVENTS_RECEIVED = registry.register(Counter(
+    'drawing_game_events_received_total', 'Socket.IO events received by type', 'event'))
+EVENTS_EMITTED = registry.register(Counter(
+    'drawing_game_events_emitted_total', 'Socket.IO events emitted by type', 'event'))
+HANDLER_ERRORS = registry.register(Counter(
+    'drawing_game_handler_errors_total', 'Socket.IO handlers that raised', 'event'))
+HANDLER_SECONDS = registry.register(Histogram(
+    'drawing_game_handler_seconds', 'Time spent in Socket.IO handlers', 'event'))
+DRAW_FANOUT_SECONDS = registry.register(Histogram(
+    'drawing_game_draw_fanout_seconds', 'Time to fan out one batched drawing frame to a room'))
+PAYLOAD_BYTES = registry.register(Histogram(
+    'drawing_game_payload_bytes', 'Size of binary payloads by event', 'event', BYTE_BUCKETS))
+EVENTS_DROPPED = registry.register(Counter(
+    'drawing_game_events_rate_limited_total', 'Events dropped or merged by the rate limiter', 'event'))
+TURN_TRANSITIONS = registry.register(Counter(
+    'drawing_game_turn_transitions_total', 'Turns ended, by outcome', 'outcome'))
+GC_PAUSE_SECONDS = registry.register(Histogram(
+    'drawing_game_gc_pause_seconds', 'Garbage collector pause duration', 'generation'))
+
+
+def register_gauge(name, help_text, callback):
+    """Expose a value computed at scrape time."""
+    return registry.register(Gauge(name, help_text, callback))
+
+
+def instrument_handler(event, handler):
+    """Wrap a Socket.IO handler to count calls, errors and time spent."""
+    @functools.wraps(handler)
+    def wrapper(*args, **kwargs):
+        EVENTS_RECEIVED.inc(event)
+        start = time.perf_counter()
+        try:
+            return handler(*args, **kwargs)
+        except Exception:
+            HANDLER_ERRORS.inc(event)
+            raise
+        finally:
+            HANDLER_SECONDS.observe(time.perf_counter() - start, event)
+    return wrapper
+
+
+_gc_started_at = None
+
+
+def _gc_callback(phase, info):
+    global _gc_started_at
+    if phase == 'start':
+        _gc_started_at = time.perf_counter()
+    elif _gc_started_at is not None:
+        GC_PAUSE_SECONDS.observe(time.perf_counter() - _gc_started_at, info.get('generation'))
+        _gc_started_at = None
+
+
+def track_gc_pauses():
+    """Record every garbage collection pause in GC_PAUSE_SECONDS."""
+    if _gc_callback not in gc.callbacks:
+        gc.callbacks.append(_gc_callback)
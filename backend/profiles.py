@@ -0,0 +1,168 @@
+"""
+Player Profiles - Lifetime stats kept in SQLite with write-behind
+
+Handlers only put stat updates on a bounded queue. A writer thread folds
+everything queued within PROFILE_FLUSH_INTERVAL into one delta per player
+and commits them in a single transaction, so a correct guess never waits
+on the disk. SQLite calls go through run_blocking, so under eventlet or
+gevent they block a native thread rather than the hub. Players have no
+accounts; a profile belongs to a username.
+"""
+import logging
+import queue
+import sqlite3
+import threading
+import time
+
+from .blocking import run_blocking
+from .config import (
+    PROFILES_ENABLED, PROFILE_DB_PATH, PROFILE_QUEUE_SIZE, PROFILE_FLUSH_INTERVAL, PROFILE_BATCH_SIZE
+)
+from .metrics import registry, Counter, Histogram
+
+logger = logging.getLogger(__name__)
+
+# Columns summed per username; an update is a delta to each of them
+STAT_FIELDS = ('games_played', 'wins', 'correct_guesses', 'guess_seconds', 'drawer_points')
+
+PROFILE_UPDATES_DROPPED = registry.register(Counter(
+    'drawing_game_profile_updates_dropped_total', 'Profile updates dropped because the writer fell behind'))
+PROFILE_COMMIT_SECONDS = registry.register(Histogram(
+    'drawing_game_profile_commit_seconds', 'Time spent committing one batch of profile updates'))
+
+_UPSERT = (
+    'INSERT INTO profiles (username, {fields}, updated_at) VALUES (?, {marks}, ?) '
+    'ON CONFLICT(username) DO UPDATE SET {sums}, updated_at = excluded.updated_at'
+).format(
+    fields=', '.join(STAT_FIELDS),
+    marks=', '.join('?' for _ in STAT_FIELDS),
+    sums=', '.join(f'{field} = {field} + excluded.{field}' for field in STAT_FIELDS)
+)
+
+
+class ProfileStore:
+    """Queues stat updates from handlers and commits them in batches."""
+
+    def __init__(self, path=PROFILE_DB_PATH, max_queue=PROFILE_QUEUE_SIZE, enabled=PROFILES_ENABLED):
+        self.path = path
+        self.enabled = enabled
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._conn = None
+        self._db_lock = threading.Lock()
+        self._thread = None
+        self._thread_lock = threading.Lock()
+
+    def record_guess(self, username, seconds):
+        """A correct guess after `seconds` of the turn."""
+        self._put(username, {'correct_guesses': 1, 'guess_seconds': seconds})
+
+    def record_drawer_points(self, username, points):
+        self._put(username, {'drawer_points': points})
+
+    def record_game(self, usernames, winners):
+        """A finished game: everyone in `usernames` played, `winners` won."""
+        winners = set(winners)
+        for username in usernames:
+            self._put(username, {'games_played': 1, 'wins': int(username in winners)})
+
+    def get(self, username):
+        """Committed stats of a player, or None if they have none yet."""
+        if not self.enabled:
+            return None
+        with self._db_lock:
+            row = run_blocking(self._select, username)
+        if row is None:
+            return None
+        profile = dict(zip(STAT_FIELDS, row))
+        profile['username'] = username
+        profile['average_guess_seconds'] = (
+            round(profile['guess_seconds'] / profile['correct_guesses'], 2) if profile['correct_guesses'] else None
+        )
+        return profile
+
+    def flush(self):
+        """Block until every queued update is committed (shutdown and tests)."""
+        if self._thread is not None:
+            self._queue.join()
+
+    def _put(self, username, delta):
+        if not self.enabled or not username:
+            return
+        self._ensure_running()
+        try:
+            self._queue.put_nowait((username, delta))
+        except queue.Full:
+            PROFILE_UPDATES_DROPPED.inc()
+
+    def _ensure_running(self):
+        if self._thread is None:
+            with self._thread_lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, daemon=True)
+                    self._thread.start()
+
+    def _connect(self):
+        if self._conn is None:
+            # Shared by the writer and readers; every use holds _db_lock
+            # and may run on any thread of run_blocking's pool
+            self._conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('PRAGMA synchronous=NORMAL')
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS profiles ('
+                'username TEXT PRIMARY KEY, games_played INTEGER NOT NULL DEFAULT 0, '
+                'wins INTEGER NOT NULL DEFAULT 0, correct_guesses INTEGER NOT NULL DEFAULT 0, '
+                'guess_seconds REAL NOT NULL DEFAULT 0, drawer_points INTEGER NOT NULL DEFAULT 0, '
+                'updated_at REAL NOT NULL)'
+            )
+            self._conn.commit()
+        return self._conn
+
+    def _select(self, username):
+        return self._connect().execute(
+            f'SELECT {", ".join(STAT_FIELDS)} FROM profiles WHERE username = ?', (username,)
+        ).fetchone()
+
+    def _commit(self, rows):
+        conn = self._connect()
+        with conn:
+            conn.executemany(_UPSERT, rows)
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+
+            # Keep collecting for one flush interval so bursts share a commit
+            deadline = time.monotonic() + PROFILE_FLUSH_INTERVAL
+            while len(batch) < PROFILE_BATCH_SIZE:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            totals = {}  # {username: {field: delta}}
+            for username, delta in batch:
+                merged = totals.setdefault(username, dict.fromkeys(STAT_FIELDS, 0))
+                for field, value in delta.items():
+                    merged[field] += value
+
+            now = time.time()
+            rows = [(username, *(merged[field] for field in STAT_FIELDS), now)
+                    for username, merged in totals.items()]
+            start = time.perf_counter()
+            try:
+                with self._db_lock:
+                    run_blocking(self._commit, rows)
+            except sqlite3.Error:
+                logger.exception("profile_commit_failed", extra={'fields': {'updates': len(batch)}})
+            PROFILE_COMMIT_SECONDS.observe(time.perf_counter() - start)
+
+            for _ in batch:
+                self._queue.task_done()
+
+
+# Global profile store shared by all rooms
+profile_store = ProfileStore()
@@ -0,0 +1,103 @@
+"""
+Rate Limiting - Token buckets per connection and event type
+"""
+import threading
+import time
+
+from .config import RATE_LIMITS, RATE_LIMIT_NOTICE_INTERVAL
+from .metrics import EVENTS_DROPPED
+
+
+class TokenBucket:
+    """Classic token bucket: `rate` tokens per second, holding up to `burst`."""
+    __slots__ = ('rate', 'burst', 'tokens', 'updated_at', 'last_notice')
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated_at = time.monotonic()
+        self.last_notice = 0.0
+
+    def consume(self, now, cost=1):
+        """Take `cost` tokens if available."""
+        elapsed = now - self.updated_at
+        if elapsed > 0:
+            self.tokens = min(self.burst, self.tokens + elapsed * self.rate)
+            self.updated_at = now
+        if self.tokens >= cost:
+            self.tokens -= cost
+            return True
+        return False
+
+
+class RateLimiter:
+    """Per-sid, per-event token buckets configured by RATE_LIMITS."""
+
+    def __init__(self, limits):
+        self.limits = limits
+        self._buckets = {}  # {(sid, event): TokenBucket}
+        self._lock = threading.Lock()
+        self.dropped = {event: 0 for event in limits}  # Total drops per event
+
+    def allow(self, sid, event):
+        """Check whether `sid` may send one more `event` right now.
+
+        Returns (allowed, notify). `notify` is True for the first drop in each
+        RATE_LIMIT_NOTICE_INTERVAL so callers can tell the client without
+        flooding it with notices.
+        """
+        limit = self.limits.get(event)
+        if limit is None:
+            return True, False
+
+        now = time.monotonic()
+        key = (sid, event)
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = TokenBucket(*limit)
+                self._buckets[key] = bucket
+            if bucket.consume(now):
+                return True, False
+
+            self.dropped[event] = self.dropped.get(event, 0) + 1
+            EVENTS_DROPPED.inc(event)
+            notify = now - bucket.last_notice >= RATE_LIMIT_NOTICE_INTERVAL
+            if notify:
+                bucket.last_notice = now
+            return False, notify
+
+    def forget(self, sid):
+        """Drop all buckets for a disconnected client."""
+        with self._lock:
+            for event in self.limits:
+                self._buckets.pop((sid, event), None)
+
+
+class ReactionMerger:
+    """Collects rate-limited reactions so they are sent as one counted event."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = {}  # {room_code: {emoji: count}}
+
+    def add(self, room_code, emoji):
+        """Count one merged reaction. Returns True if a flush must be scheduled."""
+        with self._lock:
+            counts = self._pending.get(room_code)
+            first = counts is None
+            if first:
+                counts = self._pending[room_code] = {}
+            counts[emoji] = counts.get(emoji, 0) + 1
+            return first
+
+    def pop(self, room_code):
+        """Take the merged counts for a room."""
+        with self._lock:
+            return self._pending.pop(room_code, {})
+
+
+# Global limiter and reaction merger
+rate_limiter = RateLimiter(RATE_LIMITS)
+reaction_merger = ReactionMerger()
@@ -0,0 +1,318 @@
+"""
+Game Replays - Background recording and seekable playback
+
+Every game is appended to its own file in REPLAY_DIR. Handlers only put
+records on a bounded queue; a single writer thread drains it in batches
+into buffered files, so recording never waits on the disk. At most
+REPLAY_OPEN_FILES are open at once; a file closed to make room is simply
+reopened for append when its game records again.
+
+File layout (little-endian):
+
+    header      magic b'RPL1'
+    records     uint8 kind, uint32 milliseconds since game start,
+                uint32 payload length, payload
+
+Stroke and keyframe payloads are in the binary wire format (see wire.py);
+every other payload is JSON. A keyframe holds the whole canvas, so a
+reader can seek by starting from the last keyframe before the target.
+"""
+import bisect
+import collections
+import json
+import logging
+import mmap
+import os
+import queue
+import re
+import struct
+import threading
+import time
+
+from .config import (
+    REPLAY_ENABLED, REPLAY_DIR, REPLAY_QUEUE_SIZE, REPLAY_FLUSH_INTERVAL, REPLAY_KEYFRAME_INTERVAL,
+    REPLAY_OPEN_FILES
+)
+from .metrics import registry, Counter
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'RPL1'
+REPLAY_EXTENSION = '.replay'
+
+GAME_START = 1
+TURN_START = 2
+STROKES = 3
+CLEAR = 4
+GUESS = 5
+TURN_END = 6
+KEYFRAME = 7
+GAME_END = 8
+
+KIND_NAMES = {
+    GAME_START: 'game_start', TURN_START: 'turn_start', STROKES: 'strokes', CLEAR: 'clear',
+    GUESS: 'guess', TURN_END: 'turn_end', KEYFRAME: 'keyframe', GAME_END: 'game_end'
+}
+_BINARY_KINDS = (STROKES, KEYFRAME)
+
+_RECORD = struct.Struct('<BII')
+
+_REPLAY_ID = re.compile(r'^[A-Z0-9]{1,16}-\d{1,16}$')
+_WRITE_BUFFER_BYTES = 64 * 1024
+_WRITE_BATCH = 512
+
+REPLAY_RECORDS_DROPPED = registry.register(Counter(
+    'drawing_game_replay_records_dropped_total', 'Replay records dropped because the writer fell behind'))
+
+
+def replay_path(replay_id):
+    """File path of a replay, or None if the id is malformed."""
+    if not replay_id or not _REPLAY_ID.match(replay_id):
+        return None
+    return os.path.join(REPLAY_DIR, replay_id + REPLAY_EXTENSION)
+
+
+def list_replays():
+    """Ids of the recorded replays, newest first."""
+    if not os.path.isdir(REPLAY_DIR):
+        return []
+    ids = [os.path.splitext(name)[0] for name in os.listdir(REPLAY_DIR)
+           if name.endswith(REPLAY_EXTENSION)]
+    return sorted(ids, key=lambda replay_id: int(replay_id.rsplit('-', 1)[1]), reverse=True)
+
+
+class _Recording:
+    """Per-room bookkeeping for the game being recorded."""
+    __slots__ = ('replay_id', 'started_at', 'last_keyframe')
+
+    def __init__(self, replay_id, started_at):
+        self.replay_id = replay_id
+        self.started_at = started_at
+        self.last_keyframe = started_at
+
+
+class ReplayRecorder:
+    """Queues replay records from handlers and writes them on one thread."""
+
+    def __init__(self, directory=REPLAY_DIR, max_queue=REPLAY_QUEUE_SIZE, enabled=REPLAY_ENABLED,
+                 max_open_files=REPLAY_OPEN_FILES):
+        self.directory = directory
+        self.enabled = enabled
+        self.max_open_files = max_open_files
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._recordings = {}  # {room_code: _Recording}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def start_game(self, room_code, info):
+        """Open a new replay for a room's game and return its id."""
+        if not self.enabled:
+            return None
+        now = time.monotonic()
+        replay_id = f'{room_code}-{int(time.time() * 1000)}'
+        with self._lock:
+            self._recordings[room_code] = _Recording(replay_id, now)
+            self._ensure_running()
+        self._put(replay_id, GAME_START, 0, info)
+        return replay_id
+
+    def replay_id(self, room_code):
+        recording = self._recordings.get(room_code)
+        return recording.replay_id if recording else None
+
+    def record(self, room_code, kind, payload=b''):
+        """Queue one record for a room's current game; never blocks."""
+        recording = self._recordings.get(room_code)
+        if recording is None:
+            return False
+        offset = int((time.monotonic() - recording.started_at) * 1000)
+        return self._put(recording.replay_id, kind, offset, payload)
+
+    def record_strokes(self, room_code, frame, canvas):
+        """Queue a flushed drawing frame, plus a keyframe when one is due."""
+        recording = self._recordings.get(room_code)
+        if recording is None or not frame:
+            return
+        self.record(room_code, STROKES, frame)
+        now = time.monotonic()
+        if now - recording.last_keyframe >= REPLAY_KEYFRAME_INTERVAL:
+            recording.last_keyframe = now
+            self.record(room_code, KEYFRAME, canvas.to_bytes())
+
+    def end_game(self, room_code, info=None):
+        """Write the final record and let the writer close the file."""
+        with self._lock:
+            recording = self._recordings.pop(room_code, None)
+        if recording is None:
+            return None
+        offset = int((time.monotonic() - recording.started_at) * 1000)
+        self._put(recording.replay_id, GAME_END, offset, info or {})
+        return recording.replay_id
+
+    def _put(self, replay_id, kind, offset, payload):
+        try:
+            self._queue.put_nowait((replay_id, kind, offset, payload))
+            return True
+        except queue.Full:
+            REPLAY_RECORDS_DROPPED.inc()
+            return False
+
+    def _ensure_running(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        files = collections.OrderedDict()  # {replay_id: buffered file}, least recently written first
+        while True:
+            try:
+                batch = [self._queue.get(timeout=REPLAY_FLUSH_INTERVAL)]
+            except queue.Empty:
+                # Idle: push buffered records to disk so readers can see them
+                for f in files.values():
+                    f.flush()
+                continue
+
+            # Take whatever else is queued so each file gets one bulk write
+            while len(batch) < _WRITE_BATCH:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            chunks = {}
+            finished = []
+            for replay_id, kind, offset, payload in batch:
+                if kind not in _BINARY_KINDS:
+                    payload = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+                chunks.setdefault(replay_id, []).append(_RECORD.pack(kind, offset, len(payload)) + payload)
+                if kind == GAME_END:
+                    finished.append(replay_id)
+
+            for replay_id, parts in chunks.items():
+                try:
+                    f = files.get(replay_id)
+                    if f is None:
+                        # Games that never end (or many concurrent ones) must not exhaust descriptors
+                        while len(files) >= self.max_open_files:
+                            files.popitem(last=False)[1].close()
+                        f = files[replay_id] = self._open(replay_id)
+                    else:
+                        files.move_to_end(replay_id)
+                    f.write(b''.join(parts))
+                except OSError:
+                    logger.exception("replay_write_failed", extra={'fields': {'replay': replay_id}})
+
+            for replay_id in finished:
+                f = files.pop(replay_id, None)
+                if f is not None:
+                    f.close()
+
+    def _open(self, replay_id):
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, replay_id + REPLAY_EXTENSION)
+        is_new = not os.path.exists(path)
+        f = open(path, 'ab', buffering=_WRITE_BUFFER_BYTES)
+        if is_new:
+            f.write(MAGIC)
+        return f
+
+
+class ReplayReader:
+    """Reads a replay file through mmap and plays it back from any point."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mm[:len(MAGIC)] != MAGIC:
+            self._mm.close()
+            raise ValueError(f"{path} is not a replay")
+
+        # Index record headers only; payloads are read on demand
+        self.records = []  # [(offset_ms, kind, payload start, payload length)]
+        pos = len(MAGIC)
+        size = len(self._mm)
+        while pos + _RECORD.size <= size:
+            kind, offset, length = _RECORD.unpack_from(self._mm, pos)
+            start = pos + _RECORD.size
+            if start + length > size:
+                break  # Partially written tail
+            self.records.append((offset, kind, start, length))
+            pos = start + length
+
+        self._times = [record[0] for record in self.records]
+
+        # Points where the canvas is known without replaying earlier strokes
+        self._seek_points = [i for i, record in enumerate(self.records)
+                             if record[1] in (TURN_START, CLEAR, KEYFRAME)]
+
+    @property
+    def duration_ms(self):
+        return self.records[-1][0] if self.records else 0
+
+    def close(self):
+        self._mm.close()
+
+    def payload(self, index):
+        """Decoded payload of record `index` (bytes for drawing, else JSON)."""
+        _, kind, start, length = self.records[index]
+        data = self._mm[start:start + length]
+        if kind in _BINARY_KINDS:
+            return data
+        return json.loads(data) if data else None
+
+    def _last_before(self, kind, index):
+        for i in range(index, -1, -1):
+            if self.records[i][1] == kind:
+                return i
+        return None
+
+    def events(self, start_ms=0):
+        """Yield (offset_ms, kind name, payload) from `start_ms` onwards.
+
+        Seeking yields the game/turn context and a 'canvas' event holding
+        the drawing as of `start_ms`, rebuilt from the nearest keyframe.
+        """
+        first = bisect.bisect_left(self._times, start_ms)
+        if first > 0:
+            yield from self._seek(first, start_ms)
+
+        for i in range(first, len(self.records)):
+            if self.records[i][1] != KEYFRAME:
+                yield self.records[i][0], KIND_NAMES[self.records[i][1]], self.payload(i)
+
+    def _seek(self, first, start_ms):
+        """Context and canvas for a playback starting at record `first`."""
+        for kind in (GAME_START, TURN_START):
+            i = self._last_before(kind, first - 1)
+            if i is not None:
+                yield start_ms, KIND_NAMES[kind], self.payload(i)
+
+        seek = bisect.bisect_left(self._seek_points, first) - 1
+        canvas = b''
+        if seek >= 0:
+            i = self._seek_points[seek]
+            if self.records[i][1] == KEYFRAME:
+                canvas = self.payload(i)
+            i += 1
+        else:
+            i = 0
+        for i in range(i, first):
+            if self.records[i][1] == STROKES:
+                canvas += self.payload(i)
+        yield start_ms, 'canvas', canvas
+
+    def play(self, speed=1.0, start_ms=0, sleep=time.sleep):
+        """Like events(), but paced in real time divided by `speed`."""
+        clock = time.monotonic()
+        for offset, kind, payload in self.events(start_ms):
+            due = clock + (offset - start_ms) / 1000.0 / speed
+            wait = due - time.monotonic()
+            if wait > 0:
+                sleep(wait)
+            yield offset, kind, payload
+
+
+# Global recorder shared by all rooms
+replay_recorder = ReplayRecorder()
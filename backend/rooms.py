@@ -1,20 +1,37 @@
 """
 Room and Player Management
 """
+import logging
 import random
 import string
+import threading
+import time
 from datetime import datetime
-from .config import ROOM_CODE_LENGTH, ROOM_CODE_CHARS, MAX_PLAYERS
+from .config import ROOM_CODE_LENGTH, ROOM_CODE_CHARS, MAX_PLAYERS, MAX_SPECTATORS, WORKER_ID
+from .store import room_directory, is_local_room
+from .logs import log_event, log_sampled
+from .scoring import Leaderboard
+from .statesync import StateTracker
+from .matchmaking import lobby_index, QUICK_PLAY
+
+logger = logging.getLogger(__name__)
 
 # Global storage for rooms (in production, use Redis or database)
 rooms = {}
 
+# Reverse index of which room each connected player is in: {sid: room_code}
+player_rooms = {}
+
+# Which room each spectator is watching: {sid: room_code}
+spectator_rooms = {}
+
 
 def generate_room_code():
-    """Generate a unique room code."""
+    """Generate a unique room code owned by this worker."""
     while True:
         code = ''.join(random.choices(ROOM_CODE_CHARS, k=ROOM_CODE_LENGTH))
-        if code not in rooms:
+        # Codes hash to their owning worker, so only keep ones that map here
+        if code not in rooms and is_local_room(code) and room_directory.lookup(code) is None:
             return code
 
 
@@ -38,31 +55,81 @@ class Player:
 
 class Room:
     """Represents a game room."""
-    def __init__(self, room_code, host_sid, host_username):
+    def __init__(self, room_code, host_sid, host_username, word_pack=None, public=False):
         if not room_code or not host_sid or not host_username:
             raise ValueError("Room code, host SID, and host username are required")
             
         self.room_code = room_code.upper()  # Ensure uppercase
+        # Serializes every state change in this room; rooms never share a lock.
+        # Reentrant because handlers call each other (guess -> turn end).
+        self.lock = threading.RLock()
         self.host_sid = host_sid
         self.players = {}  # {sid: Player}
+        self.usernames = {}  # {username: sid}
+        self.spectators = set()  # SIDs watching read-only; not players
+        self.disconnected = {}  # {sid: time.monotonic()} lobby players waiting to reconnect
+        self.last_active = time.monotonic()  # Refreshed by touch(); used by the idle sweeper
+        self.version = 0  # Bumped on every state change (see touch()) so snapshots can skip unchanged rooms
+        self.leaderboard = Leaderboard()  # Players ranked by score
+        self.public = public  # Offered to strangers by quick play while in the lobby
         self.game_started = False
+        self.word_pack = word_pack  # Name of the custom word pack, or None for the built-in bank
+        self.sync = StateTracker()  # Sequence and baseline for delta broadcasts
         self.created_at = datetime.now()
         
         # Add host as first player
         try:
             player = Player(host_sid, host_username)
-            self.players[host_sid] = player
-            print(f"🏠 Room initialized - Code: {room_code}, Host: {host_username}, Player count: {len(self.players)}")
+            self._index_player(player)
+            log_event(logger, logging.DEBUG, 'room_initialized', room=self.room_code, host=host_username)
             
             if host_sid not in self.players:
                 raise Exception("Failed to add host to players list")
                 
         except Exception as e:
-            print(f"❌ Error initializing room: {str(e)}")
+            logger.exception("room_init_failed", extra={'fields': {'room': room_code}})
             raise
     
+    def _index_player(self, player):
+        """Store a player and keep the sid/username indexes in sync."""
+        self.players[player.sid] = player
+        self.usernames[player.username] = player.sid
+        player_rooms[player.sid] = self.room_code
+        self.leaderboard.add(player)
+
+    def _unindex_sid(self, sid):
+        """Remove a sid from the players dict and the reverse index."""
+        self.leaderboard.remove(self.players[sid])
+        del self.players[sid]
+        self.disconnected.pop(sid, None)
+        if player_rooms.get(sid) == self.room_code:
+            del player_rooms[sid]
+
+    @property
+    def game_started(self):
+        return self._game_started
+
+    @game_started.setter
+    def game_started(self, started):
+        # A started game no longer takes quick-play players
+        self._game_started = started
+        lobby_index.update(self)
+
+    def touch(self):
+        """Mark the room as in use right now (every handler that changes it does)."""
+        self.last_active = time.monotonic()
+        self.version += 1
+    
+    def mark_disconnected(self, sid):
+        """Remember when a lobby player dropped so the sweeper can expire them."""
+        if sid in self.players:
+            self.disconnected[sid] = time.monotonic()
+            # A change, but not activity: the idle clock keeps running
+            self.version += 1
+    
     def add_player(self, sid, username):
         """Add a player to the room."""
+        self.touch()
         if len(self.players) >= MAX_PLAYERS:
             return False, "Room is full"
         
@@ -71,41 +138,92 @@ class Room:
             return False, "Already in room"
 
         # Check for an existing player with the same username
-        for existing_sid, p in list(self.players.items()):
-            if p.username == username:
-                # If username exists but SID differs, treat as a reconnect/rehang
-                if existing_sid != sid:
-                    # Swap SID key to the new connection
-                    print(f"🔁 Rejoin detected for username '{username}' (old SID: {existing_sid} -> new SID: {sid})")
-                    # Remove old mapping and update Player.sid
-                    del self.players[existing_sid]
-                    p.sid = sid
-                    self.players[sid] = p
-                    # If the rejoining player was the host, update host_sid to new SID
-                    if self.host_sid == existing_sid:
-                        print(f"🔧 Updating host SID for room {self.room_code}: {existing_sid} -> {sid}")
-                        self.host_sid = sid
-                    return True, "Rejoined successfully"
-                else:
-                    return False, "Already in room"
+        existing_sid = self.usernames.get(username)
+        if existing_sid is not None:
+            # If username exists but SID differs, treat as a reconnect/rehang
+            p = self.players[existing_sid]
+            log_event(logger, logging.INFO, 'player_rejoined', room=self.room_code, user=username,
+                      old_sid=existing_sid, sid=sid)
+            # Remove old mapping and update Player.sid
+            self._unindex_sid(existing_sid)
+            p.sid = sid
+            self._index_player(p)
+            # If the rejoining player was the host, update host_sid to new SID
+            if self.host_sid == existing_sid:
+                log_event(logger, logging.DEBUG, 'host_sid_updated', room=self.room_code, sid=sid)
+                self.host_sid = sid
+            return True, "Rejoined successfully"
 
         # No duplicate username found - add new player
-        self.players[sid] = Player(sid, username)
-        print(f"✅ Player added - Room: {self.room_code}, User: {username}, Total players: {len(self.players)}")
+        self._index_player(Player(sid, username))
+        lobby_index.update(self)
+        log_event(logger, logging.DEBUG, 'player_added', room=self.room_code, user=username,
+                  players=len(self.players))
         return True, "Joined successfully"
     
     def remove_player(self, sid):
         """Remove a player from the room."""
         if sid in self.players:
-            del self.players[sid]
+            player = self.players[sid]
+            self._unindex_sid(sid)
+            if self.usernames.get(player.username) == sid:
+                del self.usernames[player.username]
             
             # If host leaves, assign new host
             if sid == self.host_sid and self.players:
-                self.host_sid = list(self.players.keys())[0]
+                self.host_sid = next(iter(self.players))
             
+            self.touch()
+            lobby_index.update(self)
             return True
         return False
     
+    def restore_player(self, sid, username, score=0, has_guessed=False):
+        """Seat a player from a snapshot; they wait to reattach like a dropped lobby player."""
+        player = self.players.get(sid)
+        if player is not None:
+            self._unindex_sid(sid)  # Re-ranked below with the restored score
+        else:
+            player = Player(sid, username)
+        player.score = score
+        player.has_guessed = has_guessed
+        self._index_player(player)
+        self.disconnected[sid] = time.monotonic()
+        return player
+    
+    def reattach_player(self, username, sid):
+        """Give a disconnected player's seat to their new connection.
+
+        Returns the old SID, or None if no such player is waiting.
+        """
+        old_sid = self.usernames.get(username)
+        if old_sid is None or old_sid not in self.disconnected:
+            return None
+        player = self.players[old_sid]
+        self._unindex_sid(old_sid)
+        player.sid = sid
+        self._index_player(player)
+        if self.host_sid == old_sid:
+            self.host_sid = sid
+        self.touch()
+        return old_sid
+    
+    def add_spectator(self, sid):
+        """Let a connection watch the room without playing."""
+        if sid in self.players:
+            return False, "Already playing in this room"
+        if sid not in self.spectators and len(self.spectators) >= MAX_SPECTATORS:
+            return False, "Too many spectators"
+        self.spectators.add(sid)
+        spectator_rooms[sid] = self.room_code
+        return True, "Spectating"
+    
+    def remove_spectator(self, sid):
+        """Stop a connection from watching the room."""
+        self.spectators.discard(sid)
+        if spectator_rooms.get(sid) == self.room_code:
+            del spectator_rooms[sid]
+    
     def get_player(self, sid):
         """Get a player by socket ID."""
         return self.players.get(sid)
@@ -125,39 +243,49 @@ class Room:
             'host_sid': self.host_sid,
             'players': self.get_players_list(),
             'player_count': self.get_player_count(),
-            'game_started': self.game_started
+            'game_started': self.game_started,
+            'word_pack': self.word_pack,
+            'public': self.public,
+            'spectator_count': len(self.spectators)
         }
 
 
-def create_room(host_sid, host_username):
-    """Create a new room."""
+def create_room(host_sid, host_username, word_pack=None, public=False):
+    """Create a new room, optionally using a custom word pack.
+
+    Public rooms are also offered to strangers through quick play.
+    """
     if not host_sid or not host_username:
         raise ValueError("Host SID and username are required to create a room")
         
     try:
         room_code = generate_room_code()
-        room = Room(room_code, host_sid, host_username)
+        room = Room(room_code, host_sid, host_username, word_pack=word_pack, public=public)
         
         # Verify room was created successfully
         if not room or room.get_player_count() == 0:
             raise Exception("Room creation failed - no players added")
             
         # Store room in global rooms dictionary
-        rooms[room_code] = room
+        register_room(room)
         
-        print(f"🎨 Room created successfully:")
-        print(f"   - Code: {room_code}")
-        print(f"   - Host: {host_username} (SID: {host_sid})")
-        print(f"   - Players: {room.get_player_count()}")
-        print(f"   - Total rooms: {len(rooms)}")
+        log_sampled(logger, logging.INFO, 'room_created', room=room_code, host=host_username,
+                    total_rooms=len(rooms))
         
         return room
         
     except Exception as e:
-        print(f"❌ Failed to create room: {str(e)}")
+        logger.exception("room_create_failed", extra={'fields': {'host': host_username}})
         raise
 
 
+def register_room(room):
+    """Make a new or restored room reachable by code, worker and quick play."""
+    rooms[room.room_code] = room
+    room_directory.register(room.room_code, WORKER_ID)
+    lobby_index.update(room)
+
+
 def get_room(room_code):
     """Get a room by code."""
     return rooms.get(room_code.upper())
@@ -166,7 +294,6 @@ def get_room(room_code):
 def join_room(room_code, sid, username):
     """Join an existing room."""
     if not room_code:
-        print("❌ No room code provided")
         return None, "Room code is required"
         
     # Convert room code to uppercase for consistency
@@ -174,27 +301,61 @@ def join_room(room_code, sid, username):
     room = get_room(room_code)
     
     if not room:
-        print(f"❌ Room not found: {room_code}")
-        print(f"Available rooms: {list(rooms.keys())}")
+        if remote_owner(room_code) is not None:
+            log_event(logger, logging.DEBUG, 'join_wrong_worker', room=room_code)
+            return None, "Room is hosted on another server"
+        log_sampled(logger, logging.INFO, 'join_room_not_found', room=room_code)
         return None, "Room not found"
     
     if room.game_started:
         return None, "Game already in progress"
     
-    # Log room state before adding player
-    print(f"📊 Room state before adding player - Code: {room_code}, Players: {room.get_player_count()}")
-    
     success, message = room.add_player(sid, username)
     
     if success:
-        # Log successful join
-        print(f"✅ Player joined successfully - Room: {room_code}, User: {username}, Total players: {room.get_player_count()}")
+        log_event(logger, logging.DEBUG, 'player_joined', room=room_code, user=username,
+                  players=room.get_player_count())
         return room, message
     else:
-        print(f"❌ Failed to add player: {message}")
+        log_event(logger, logging.DEBUG, 'join_rejected', room=room_code, reason=message)
         return None, message
 
 
+def quick_play(sid, username):
+    """Seat a player in the fullest open public lobby, or open a new one.
+
+    Returns (room, created).
+    """
+    tried = set()
+
+    def has_seat(room_code):
+        # Skip rooms where the name is taken: add_player would treat it as a rejoin
+        room = rooms.get(room_code)
+        return room_code not in tried and room is not None and username not in room.usernames
+
+    while True:
+        room_code = lobby_index.best(has_seat)
+        if room_code is None:
+            break
+        tried.add(room_code)
+        room = rooms.get(room_code)
+        if room is None:
+            continue
+        # The lobby may have filled, started or taken the name since it was picked
+        with room.lock:
+            if room.game_started or username in room.usernames:
+                continue
+            success, _ = room.add_player(sid, username)
+        if success:
+            QUICK_PLAY.inc('joined')
+            log_event(logger, logging.DEBUG, 'quick_play_joined', room=room_code, user=username,
+                      players=room.get_player_count())
+            return room, False
+
+    QUICK_PLAY.inc('created')
+    return create_room(sid, username, public=True), True
+
+
 def leave_room(room_code, sid):
     """Leave a room."""
     room = get_room(room_code)
@@ -204,16 +365,53 @@ def leave_room(room_code, sid):
     
     room.remove_player(sid)
     
-    # Delete room if empty
+    # Delete room if empty; spectators have nothing left to watch
     if room.get_player_count() == 0:
-        del rooms[room_code]
+        for spectator_sid in list(room.spectators):
+            room.remove_spectator(spectator_sid)
+        del rooms[room.room_code]
+        room_directory.unregister(room.room_code)
     
     return True
 
 
+def close_room(room_code):
+    """Delete a room and everything indexed under it. Returns the removed Room."""
+    room = rooms.pop(room_code, None)
+    lobby_index.discard(room_code)
+    if room is None:
+        return None
+    for sid in list(room.players):
+        room._unindex_sid(sid)
+    room.usernames.clear()
+    for sid in list(room.spectators):
+        room.remove_spectator(sid)
+    room_directory.unregister(room_code)
+    return room
+
+
+def locate_room(room_code):
+    """Return the id of the worker that owns a room, or None if it does not exist."""
+    return room_directory.lookup(room_code.upper())
+
+
+def remote_owner(room_code):
+    """Return the id of another worker that owns a room, or None if this one does or none does."""
+    worker = locate_room(room_code) if room_code else None
+    return worker if worker != WORKER_ID else None
+
+
 def get_player_room(sid):
     """Find which room a player is in."""
-    for room in rooms.values():
-        if sid in room.players:
-            return room
-    return None
\ No newline at end of file
+    room_code = player_rooms.get(sid)
+    if room_code is None:
+        return None
+    return rooms.get(room_code)
+
+
+def get_spectator_room(sid):
+    """Find which room a spectator is watching."""
+    room_code = spectator_rooms.get(sid)
+    if room_code is None:
+        return None
+    return rooms.get(room_code)
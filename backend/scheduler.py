@@ -0,0 +1,94 @@
+"""
+Shared Timer Scheduler - One thread drives every room's deadlines
+"""
+import heapq
+import itertools
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class TimerHandle:
+    """A scheduled callback that can be cancelled before it fires."""
+    __slots__ = ('deadline', 'seq', 'callback', 'args', 'cancelled')
+
+    def __init__(self, deadline, seq, callback, args):
+        self.deadline = deadline
+        self.seq = seq
+        self.callback = callback
+        self.args = args
+        self.cancelled = False
+
+    def __lt__(self, other):
+        return (self.deadline, self.seq) < (other.deadline, other.seq)
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class Scheduler:
+    """Min-heap of deadlines served by a single background thread.
+
+    Callbacks run on the scheduler thread and must not block; anything
+    that needs to wait should schedule a follow-up callback instead.
+    The number of threads is independent of the number of rooms.
+    """
+
+    def __init__(self):
+        self._heap = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._thread = None
+
+    def call_later(self, delay, callback, *args):
+        """Run `callback(*args)` after `delay` seconds."""
+        return self.call_at(time.monotonic() + max(0, delay), callback, *args)
+
+    def call_at(self, deadline, callback, *args):
+        """Run `callback(*args)` at a `time.monotonic()` deadline."""
+        handle = TimerHandle(deadline, next(self._seq), callback, args)
+        with self._cond:
+            heapq.heappush(self._heap, handle)
+            self._ensure_running()
+            # Wake the worker if this is now the earliest deadline
+            if self._heap[0] is handle:
+                self._cond.notify()
+        return handle
+
+    def pending_count(self):
+        """Number of scheduled (not yet fired) callbacks, cancelled ones included."""
+        with self._cond:
+            return len(self._heap)
+
+    def _ensure_running(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while True:
+                    # Skip cancelled entries at the top of the heap
+                    while self._heap and self._heap[0].cancelled:
+                        heapq.heappop(self._heap)
+                    if not self._heap:
+                        self._cond.wait()
+                        continue
+                    wait = self._heap[0].deadline - time.monotonic()
+                    if wait <= 0:
+                        handle = heapq.heappop(self._heap)
+                        break
+                    self._cond.wait(wait)
+
+            try:
+                handle.callback(*handle.args)
+            except Exception:
+                logger.exception("scheduled_callback_failed",
+                                 extra={'fields': {'callback': getattr(handle.callback, '__name__', handle.callback)}})
+
+
+# Global scheduler shared by all rooms
+scheduler = Scheduler()
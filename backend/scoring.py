@@ -1,6 +1,8 @@
 """
 Scoring Logic for Drawing Game
 """
+import bisect
+
 from .config import (
     POINTS_PER_CORRECT_GUESS,
     DRAWER_POINTS_PER_GUESS,
@@ -63,6 +65,86 @@ def get_leaderboard(players):
     return leaderboard
 
 
+class Leaderboard:
+    """
+    Players of a room kept ranked by score as points are awarded.
+    
+    Entries are sorted by (-score, username, sid), the same order as
+    `get_leaderboard`, and repositioned with a binary search when a score
+    changes instead of re-sorting the whole board.
+    """
+    
+    def __init__(self):
+        self._keys = []  # Sorted (-score, username, sid)
+        self._players = {}  # {sid: Player}
+        self._cached = None
+    
+    @staticmethod
+    def _key(player):
+        return (-player.score, player.username, player.sid)
+    
+    def add(self, player):
+        """Start ranking a player."""
+        bisect.insort(self._keys, self._key(player))
+        self._players[player.sid] = player
+        self._cached = None
+    
+    def remove(self, player):
+        """Stop ranking a player (call before changing its sid)."""
+        key = self._key(player)
+        index = bisect.bisect_left(self._keys, key)
+        if index < len(self._keys) and self._keys[index] == key:
+            del self._keys[index]
+        self._players.pop(player.sid, None)
+        self._cached = None
+    
+    def add_points(self, player, points):
+        """
+        Add points to a player's score and reposition it.
+        
+        Returns:
+            Dictionary {sid: entry} for every player whose score or rank changed
+        """
+        old_key = self._key(player)
+        old_index = bisect.bisect_left(self._keys, old_key)
+        if old_index < len(self._keys) and self._keys[old_index] == old_key:
+            del self._keys[old_index]
+        else:
+            old_index = None
+        
+        player.score += points
+        new_key = self._key(player)
+        new_index = bisect.bisect_left(self._keys, new_key)
+        self._keys.insert(new_index, new_key)
+        self._players[player.sid] = player
+        self._cached = None
+        
+        # Everyone between the old and new positions moved by one rank
+        if old_index is None:
+            low, high = new_index, len(self._keys) - 1
+        else:
+            low, high = min(old_index, new_index), max(old_index, new_index)
+        return {self._keys[i][2]: self._entry(i) for i in range(low, high + 1)}
+    
+    def _entry(self, index):
+        score, username, sid = self._keys[index]
+        return {'username': username, 'score': -score, 'sid': sid, 'rank': index + 1}
+    
+    def rank(self, sid):
+        """1-based rank of a player, or None if not ranked."""
+        player = self._players.get(sid)
+        if not player:
+            return None
+        return bisect.bisect_left(self._keys, self._key(player)) + 1
+    
+    def to_list(self):
+        """Full board in rank order (same shape as `get_leaderboard`)."""
+        if self._cached is None:
+            self._cached = [{'username': username, 'score': -score, 'sid': sid}
+                            for score, username, sid in self._keys]
+        return self._cached
+
+
 def get_winner(players):
     """
     Determine the winner(s) of the game.
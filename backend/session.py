@@ -24,6 +24,11 @@ class GameSession:
         if sid in self.active_sessions:
             self.active_sessions[sid].update(kwargs)
     
+    def move_session(self, old_sid, sid):
+        """Hand a session over to a player's new connection."""
+        if old_sid in self.active_sessions:
+            self.active_sessions[sid] = self.active_sessions.pop(old_sid)
+    
     def get_session(self, sid):
         """Get session data for a player."""
         return self.active_sessions.get(sid)
@@ -0,0 +1,88 @@
+"""
+Spectators - Read-only viewers served by a separate, slower broadcast tier
+
+Spectators sit in their own Socket.IO room next to the players' room, so
+player broadcasts never fan out to them. Drawing reaches them through
+SpectatorFeed: the player flusher only appends the frames it already has,
+and a separate flusher merges, thins and re-encodes them a few times per
+second into one payload shared by every viewer.
+"""
+import threading
+
+from .config import SPECTATOR_POINT_STRIDE
+from .strokes import compact_strokes
+from .wire import encode_strokes, decode_strokes
+
+
+def spectator_channel(room_code):
+    """Socket.IO room holding a game room's spectators."""
+    return f'{room_code}:spectators'
+
+
+def downsample_strokes(strokes, stride=SPECTATOR_POINT_STRIDE):
+    """Keep every `stride`-th polyline point, always including both ends."""
+    if stride <= 1:
+        return strokes
+    for stroke in strokes:
+        if stroke['type'] != 'polyline':
+            continue
+        points = stroke['points']
+        count = len(points) // 2
+        if count <= 2:
+            continue
+        kept = []
+        for i in list(range(0, count - 1, stride)) + [count - 1]:
+            kept.append(points[2 * i])
+            kept.append(points[2 * i + 1])
+        stroke['points'] = kept
+    return strokes
+
+
+class SpectatorFeed:
+    """Pending drawing per room, waiting for the spectator flusher."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = {}  # {room_code: [binary frame, ...]}
+
+    def add(self, room_code, strokes=None, binary=None):
+        """Queue one flushed player frame; the expensive work happens in drain()."""
+        with self._lock:
+            frames = self._pending.setdefault(room_code, [])
+            if strokes:
+                frames.append(strokes)
+            if binary:
+                frames.append(binary)
+
+    def discard(self, room_code):
+        """Drop queued drawing for a room (canvas cleared or turn over)."""
+        with self._lock:
+            self._pending.pop(room_code, None)
+
+    def drain(self):
+        """Return [(room_code, binary frame)] merged and downsampled for spectators."""
+        with self._lock:
+            if not self._pending:
+                return []
+            pending = self._pending
+            self._pending = {}
+
+        frames = []
+        for room_code, queued in pending.items():
+            strokes = []
+            for frame in queued:
+                if isinstance(frame, list):
+                    strokes.extend(frame)
+                else:
+                    try:
+                        strokes.extend(decode_strokes(frame))
+                    except ValueError:
+                        continue
+            if strokes:
+                strokes = downsample_strokes(compact_strokes(strokes))
+                frames.append((room_code, encode_strokes(strokes)))
+        return frames
+
+
+# Global spectator feed shared by all rooms
+spectator_feed = SpectatorFeed()
@@ -0,0 +1,74 @@
+"""
+State Sync - Versioned delta broadcasts of room and game state
+
+Every broadcast that changes a room carries only the fields that changed
+since the previous one, tagged with a per-room sequence number. A client
+that sees a gap in the sequence asks for a full resync.
+"""
+
+
+class StateTracker:
+    """Remembers the last broadcast state of one room to compute deltas."""
+
+    def __init__(self):
+        self.seq = 0
+        self._room = {}
+        self._players = {}  # {sid: player dict}
+        self._game = {}
+
+    @staticmethod
+    def _room_fields(room):
+        return {
+            'room_code': room.room_code,
+            'host_sid': room.host_sid,
+            'player_count': room.get_player_count(),
+            'game_started': room.game_started,
+            'word_pack': room.word_pack
+        }
+
+    @staticmethod
+    def _game_fields(game_state):
+        if game_state is None:
+            return {}
+        return game_state.to_dict()
+
+    def delta(self, room, game_state=None):
+        """Compute the changes since the last delta and advance the sequence."""
+        room_fields = self._room_fields(room)
+        players = {sid: player.to_dict() for sid, player in room.players.items()}
+        game_fields = self._game_fields(game_state)
+
+        delta = {'seq': self.seq + 1}
+
+        changed_room = {k: v for k, v in room_fields.items() if self._room.get(k) != v}
+        if changed_room:
+            delta['room'] = changed_room
+
+        upsert = [p for sid, p in players.items() if self._players.get(sid) != p]
+        remove = [sid for sid in self._players if sid not in players]
+        if upsert or remove:
+            delta['players'] = {'upsert': upsert, 'remove': remove}
+
+        changed_game = {k: v for k, v in game_fields.items() if self._game.get(k) != v}
+        if changed_game:
+            delta['game'] = changed_game
+
+        self.seq += 1
+        self._room = room_fields
+        self._players = players
+        if game_state is not None:
+            self._game = game_fields
+        return delta
+
+    def full(self, room, game_state=None):
+        """Complete current state tagged with the latest sequence number.
+
+        The baseline used for deltas is left untouched: the next delta may
+        repeat a few fields the client already has, which is harmless.
+        """
+        return {
+            'seq': self.seq,
+            'room': self._room_fields(room),
+            'players': room.get_players_list(),
+            'game': self._game_fields(game_state) or None
+        }
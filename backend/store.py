@@ -0,0 +1,100 @@
+"""
+Shared Room Directory - Which worker process owns which room
+
+Live Room/GameState/GameSession objects stay in the memory of the worker
+that owns the room (room affinity), so handlers keep mutating them
+directly. Only ownership is shared between workers, through a pluggable
+directory backend.
+"""
+import sqlite3
+import threading
+import time
+import zlib
+
+from .config import WORKER_ID, WORKER_COUNT, STATE_BACKEND, STATE_DB_PATH
+
+
+def room_owner(room_code):
+    """Deterministically map a room code to the worker that owns it.
+
+    A load balancer can compute the same function over the `room` query
+    parameter to route every connection for a room to its owner.
+    """
+    if WORKER_COUNT <= 1:
+        return 0
+    return zlib.crc32(room_code.upper().encode('utf-8')) % WORKER_COUNT
+
+
+def is_local_room(room_code):
+    """Check whether this worker owns a room code."""
+    return room_owner(room_code) == WORKER_ID
+
+
+class MemoryRoomDirectory:
+    """Single-process directory; used when only one worker runs."""
+
+    def __init__(self):
+        self._rooms = {}  # {room_code: worker_id}
+
+    def register(self, room_code, worker_id):
+        self._rooms[room_code] = worker_id
+
+    def unregister(self, room_code):
+        self._rooms.pop(room_code, None)
+
+    def lookup(self, room_code):
+        """Return the owning worker id, or None if the room does not exist."""
+        return self._rooms.get(room_code)
+
+    def count(self):
+        return len(self._rooms)
+
+
+class SQLiteRoomDirectory:
+    """Directory shared by worker processes on one host through a SQLite file."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        # One connection guarded by a lock; handlers may run on many threads
+        self._conn = sqlite3.connect(path, timeout=5, isolation_level=None,
+                                     check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS rooms ('
+            'room_code TEXT PRIMARY KEY, worker_id INTEGER NOT NULL, created_at REAL NOT NULL)'
+        )
+
+    def _execute(self, sql, params=()):
+        with self._lock:
+            return self._conn.execute(sql, params).fetchone()
+
+    def register(self, room_code, worker_id):
+        self._execute(
+            'INSERT OR REPLACE INTO rooms (room_code, worker_id, created_at) VALUES (?, ?, ?)',
+            (room_code, worker_id, time.time())
+        )
+
+    def unregister(self, room_code):
+        self._execute('DELETE FROM rooms WHERE room_code = ?', (room_code,))
+
+    def lookup(self, room_code):
+        row = self._execute('SELECT worker_id FROM rooms WHERE room_code = ?', (room_code,))
+        return row[0] if row else None
+
+    def count(self):
+        return self._execute('SELECT COUNT(*) FROM rooms')[0]
+
+
+def create_room_directory():
+    """Build the directory backend selected by STATE_BACKEND."""
+    if STATE_BACKEND == 'sqlite':
+        return SQLiteRoomDirectory(STATE_DB_PATH)
+    if STATE_BACKEND == 'memory':
+        return MemoryRoomDirectory()
+    raise ValueError(f"Unknown STATE_BACKEND: {STATE_BACKEND}")
+
+
+# Global room directory
+room_directory = create_room_directory()
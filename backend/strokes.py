@@ -0,0 +1,433 @@
+"""
+Stroke Batching - Coalesces drawing segments into polylines per room
+"""
+import logging
+import math
+import threading
+
+from .config import STROKE_SNAPSHOT_INTERVAL, STROKE_SIMPLIFY_TOLERANCE, STROKE_SIMPLIFY_LOOKAHEAD
+from .wire import encode_strokes, decode_strokes
+
+logger = logging.getLogger(__name__)
+
+
+def _coordinates(segment, keys):
+    """Floats for `keys` of a client segment (missing ones are 0), or None if any is bad."""
+    values = []
+    for key in keys:
+        try:
+            value = float(segment.get(key, 0))
+        except (TypeError, ValueError):
+            return None
+        if not math.isfinite(value):
+            return None
+        values.append(value)
+    return values
+
+
+def simplify_polyline(points, tolerance):
+    """Indices of the points worth keeping in a flat [x0, y0, x1, y1, ...] list.
+
+    A radial-distance pass drops points closer than `tolerance` to the
+    previous kept point, then Ramer-Douglas-Peucker drops points within
+    `tolerance` of the line between their neighbours. The first and last
+    points are always kept.
+    """
+    count = len(points) // 2
+    if count <= 2 or tolerance <= 0:
+        return list(range(count))
+
+    tol_sq = tolerance * tolerance
+    radial = [0]
+    px, py = points[0], points[1]
+    for i in range(1, count - 1):
+        x, y = points[2 * i], points[2 * i + 1]
+        if (x - px) ** 2 + (y - py) ** 2 >= tol_sq:
+            radial.append(i)
+            px, py = x, y
+    radial.append(count - 1)
+
+    keep = [False] * len(radial)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(radial) - 1)]
+    while stack:
+        first, last = stack.pop()
+        if last - first < 2:
+            continue
+        ax, ay = points[2 * radial[first]], points[2 * radial[first] + 1]
+        bx, by = points[2 * radial[last]], points[2 * radial[last] + 1]
+        dx, dy = bx - ax, by - ay
+        length_sq = dx * dx + dy * dy
+        worst, worst_sq = None, tol_sq
+        for j in range(first + 1, last):
+            x, y = points[2 * radial[j]], points[2 * radial[j] + 1]
+            if length_sq == 0:
+                dist_sq = (x - ax) ** 2 + (y - ay) ** 2
+            else:
+                cross = dx * (y - ay) - dy * (x - ax)
+                dist_sq = cross * cross / length_sq
+            if dist_sq > worst_sq:
+                worst, worst_sq = j, dist_sq
+        if worst is not None:
+            keep[worst] = True
+            stack.append((first, worst))
+            stack.append((worst, last))
+
+    return [index for index, kept in zip(radial, keep) if kept]
+
+
+class StrokeSimplifier:
+    """Streaming polyline simplification for each room's drawer.
+
+    The end of the stroke being drawn is held back: points are only sent
+    once later points confirm they are needed, for at most `lookahead`
+    points or until the room has a flush tick with nothing new.
+    """
+
+    def __init__(self, tolerance=STROKE_SIMPLIFY_TOLERANCE, lookahead=STROKE_SIMPLIFY_LOOKAHEAD):
+        self.tolerance = tolerance
+        self.lookahead = lookahead
+        self._open = {}  # {room_code: {'color', 'size', 'points', 'sent'}} stroke in progress
+
+    def feed(self, room_code, strokes):
+        """Simplify newly drawn strokes; returns the strokes ready to send."""
+        out = []
+        for stroke in strokes:
+            current = self._open.get(room_code)
+            if (stroke['type'] == 'polyline' and current
+                    and current['color'] == stroke['color'] and current['size'] == stroke['size']
+                    and current['points'][-2:] == stroke['points'][:2]):
+                current['points'].extend(stroke['points'][2:])
+            else:
+                out.extend(self.finish(room_code))
+                if stroke['type'] != 'polyline':
+                    out.append(stroke)
+                    continue
+                current = self._open[room_code] = {
+                    'color': stroke['color'], 'size': stroke['size'],
+                    'points': list(stroke['points']), 'sent': False
+                }
+            out.extend(self._settle(current))
+        return out
+
+    def _polyline(self, current, points, indices):
+        current['sent'] = True
+        return {
+            'type': 'polyline',
+            'points': [c for i in indices for c in (points[2 * i], points[2 * i + 1])],
+            'color': current['color'],
+            'size': current['size']
+        }
+
+    def _settle(self, current):
+        """Send the points that are already certain, holding back the tail."""
+        points = current['points']
+        keep = simplify_polyline(points, self.tolerance)
+        if len(points) // 2 > self.lookahead + 1:
+            # Lookahead exhausted: send everything, continue from the last point
+            current['points'] = points[-2:]
+            return [self._polyline(current, points, keep)]
+        if len(keep) <= 2:
+            return []
+        # Everything up to the second-to-last kept point is final; the raw
+        # points after it stay open so the next batch can be simplified with them
+        cut = keep[-2]
+        current['points'] = points[2 * cut:]
+        return [self._polyline(current, points, keep[:-1])]
+
+    def finish(self, room_code):
+        """Send whatever is held back for a room's stroke and close it."""
+        current = self._open.pop(room_code, None)
+        if current is None:
+            return []
+        points = current['points']
+        if len(points) >= 4:
+            return [self._polyline(current, points, simplify_polyline(points, self.tolerance))]
+        if not current['sent']:
+            # A stroke that never moved still has to show up
+            return [self._polyline(current, points + points, [0, 1])]
+        return []
+
+    def open_rooms(self):
+        return list(self._open)
+
+    def discard(self, room_code):
+        self._open.pop(room_code, None)
+
+
+class StrokeBuffer:
+    """Collects incoming line segments per room and merges them into polylines.
+
+    The drawer's client sends one segment per mousemove. Instead of
+    re-broadcasting each one, segments are appended here and flushed as a
+    single batched frame on a fixed tick.
+    """
+
+    def __init__(self, simplifier=None):
+        self._lock = threading.Lock()
+        self._pending = {}  # {room_code: {'sender': sid, 'strokes': [...], 'binary': [...]}}
+        self.simplifier = simplifier
+        self._simplify_lock = threading.Lock()
+        self._senders = {}  # {room_code: (sender_sid, binary)} of strokes held by the simplifier
+
+    def _entry(self, room_code, sender_sid):
+        entry = self._pending.get(room_code)
+        if entry is None:
+            entry = {'sender': sender_sid, 'strokes': [], 'binary': []}
+            self._pending[room_code] = entry
+        entry['sender'] = sender_sid
+        return entry
+
+    def add_segment(self, room_code, sender_sid, segment):
+        """Add one drawing segment, extending the last polyline when possible.
+
+        Segments come straight from clients; ones with non-numeric
+        coordinates or size are dropped.
+        """
+        if not isinstance(segment, dict):
+            return
+        stroke_type = segment.get('type', 'line')
+        color = segment.get('color')
+        size = segment.get('size')
+        if size is not None:
+            size = _coordinates(segment, ('size',))
+            if size is None:
+                return
+            size = size[0]
+        coordinates = _coordinates(segment, ('x', 'y') if stroke_type == 'dot' else ('x1', 'y1', 'x2', 'y2'))
+        if coordinates is None:
+            return
+
+        with self._lock:
+            strokes = self._entry(room_code, sender_sid)['strokes']
+
+            if stroke_type == 'dot':
+                x, y = coordinates
+                strokes.append({
+                    'type': 'dot',
+                    'x': x,
+                    'y': y,
+                    'color': color,
+                    'size': size
+                })
+                return
+
+            x1, y1, x2, y2 = coordinates
+
+            # Continue the previous polyline if this segment starts where it ended
+            if strokes:
+                last = strokes[-1]
+                points = last.get('points')
+                if (last['type'] == 'polyline' and last['color'] == color
+                        and last['size'] == size
+                        and points[-2] == x1 and points[-1] == y1):
+                    points.append(x2)
+                    points.append(y2)
+                    return
+
+            strokes.append({
+                'type': 'polyline',
+                'points': [x1, y1, x2, y2],
+                'color': color,
+                'size': size
+            })
+
+    def add_segments(self, room_code, sender_sid, segments):
+        """Add a list of segments in order."""
+        for segment in segments:
+            self.add_segment(room_code, sender_sid, segment)
+
+    def add_binary(self, room_code, sender_sid, frame):
+        """Queue an already-encoded binary frame; returns False if it was dropped.
+
+        Frames are concatenated into the canvas history and replays, so
+        one that does not decode on its own would garble every frame
+        after it. Such frames are rejected here.
+        """
+        try:
+            if not decode_strokes(frame):
+                return False
+        except ValueError:
+            return False
+        with self._lock:
+            self._entry(room_code, sender_sid)['binary'].append(frame)
+        return True
+
+    def discard(self, room_code):
+        """Drop any pending strokes for a room (e.g. canvas cleared)."""
+        with self._lock:
+            self._pending.pop(room_code, None)
+        if self.simplifier:
+            with self._simplify_lock:
+                self.simplifier.discard(room_code)
+                self._senders.pop(room_code, None)
+
+    def drain(self):
+        """Remove and return all pending frames.
+
+        Returns a list of (room_code, sender_sid, strokes, binary) where
+        `binary` is the concatenation of queued binary frames (or None).
+        """
+        with self._lock:
+            pending = self._pending
+            self._pending = {}
+
+        if self.simplifier:
+            return self._simplify(pending)
+
+        frames = []
+        for room_code, entry in pending.items():
+            binary = b''.join(entry['binary']) if entry['binary'] else None
+            if entry['strokes'] or binary:
+                frames.append((room_code, entry['sender'], entry['strokes'], binary))
+        return frames
+
+    def _simplify(self, pending):
+        """Run drained frames through the simplifier, keeping each room's format.
+
+        Binary frames are decoded and re-encoded here, once per room per
+        tick; that is the price of simplifying them.
+        """
+        frames = []
+        with self._simplify_lock:
+            for room_code, entry in pending.items():
+                strokes = self.simplifier.feed(room_code, entry['strokes'])
+                binary = None
+                if entry['binary']:
+                    try:
+                        decoded = decode_strokes(b''.join(entry['binary']))
+                    except ValueError:
+                        logger.exception("binary_frame_undecodable", extra={'fields': {
+                            'room': room_code, 'bytes': sum(len(frame) for frame in entry['binary'])}})
+                        decoded = []
+                    simplified = self.simplifier.feed(room_code, decoded)
+                    binary = encode_strokes(simplified) if simplified else None
+                if room_code in self.simplifier.open_rooms():
+                    self._senders[room_code] = (entry['sender'], bool(entry['binary']))
+                else:
+                    self._senders.pop(room_code, None)
+                if strokes or binary:
+                    frames.append((room_code, entry['sender'], strokes, binary))
+
+            # Rooms with nothing new this tick: the held-back stroke end is final
+            for room_code in self.simplifier.open_rooms():
+                if room_code in pending:
+                    continue
+                tail = self.simplifier.finish(room_code)
+                sender, binary = self._senders.pop(room_code, (None, False))
+                if tail:
+                    if binary:
+                        frames.append((room_code, sender, [], encode_strokes(tail)))
+                    else:
+                        frames.append((room_code, sender, tail, None))
+        return frames
+
+
+def iter_segments(data):
+    """Yield the segments contained in a `draw` payload.
+
+    Clients may send either a single segment (legacy) or a batch under
+    the `segments` key.
+    """
+    segments = data.get('segments')
+    if isinstance(segments, list):
+        for segment in segments:
+            if isinstance(segment, dict):
+                yield segment
+    else:
+        yield data
+
+
+def compact_strokes(strokes):
+    """Merge polylines that continue each other with the same color and size."""
+    compacted = []
+    for stroke in strokes:
+        if compacted and stroke['type'] == 'polyline':
+            last = compacted[-1]
+            points = stroke['points']
+            if (last['type'] == 'polyline' and last['color'] == stroke['color']
+                    and last['size'] == stroke['size']
+                    and last['points'][-2:] == points[:2]):
+                last['points'].extend(points[2:])
+                continue
+        if stroke['type'] == 'polyline':
+            stroke = dict(stroke, points=list(stroke['points']))
+        compacted.append(stroke)
+    return compacted
+
+
+class CanvasHistory:
+    """Drawing history for the current turn.
+
+    Frames are stored in the binary wire format: a compacted snapshot plus
+    the frames recorded since. Every STROKE_SNAPSHOT_INTERVAL frames the
+    tail is folded into a new snapshot, so a late joiner gets the whole
+    picture in one payload.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.snapshot = b''
+        self.tail = []  # [bytes, ...] frames recorded after the snapshot
+        self.version = 0  # Bumped on every change so room snapshots can skip unchanged canvases
+
+    def record(self, strokes=None, binary=None):
+        """Record one flushed frame (JSON strokes and/or a binary frame).
+
+        Returns the frame in the binary wire format, or b'' if it was empty.
+        """
+        frame = b''
+        if strokes:
+            frame += encode_strokes(strokes)
+        if binary:
+            frame += binary
+        if not frame:
+            return frame
+
+        with self._lock:
+            self.tail.append(frame)
+            self.version += 1
+            if len(self.tail) >= STROKE_SNAPSHOT_INTERVAL:
+                self._compact()
+        return frame
+
+    def _compact(self):
+        data = self.snapshot + b''.join(self.tail)
+        try:
+            self.snapshot = encode_strokes(compact_strokes(decode_strokes(data)))
+        except ValueError:
+            # Keep the raw frames rather than lose the drawing
+            self.snapshot = data
+        self.tail = []
+
+    def clear(self):
+        """Forget everything drawn (canvas cleared or new turn)."""
+        with self._lock:
+            self.snapshot = b''
+            self.tail = []
+            self.version += 1
+
+    def to_bytes(self):
+        """The whole drawing as one binary wire-format frame."""
+        with self._lock:
+            return self.snapshot + b''.join(self.tail)
+
+    def get_payload(self, binary=True):
+        """Snapshot plus tail for a reconnecting client.
+
+        Binary clients get the raw bytes; others get decoded stroke lists.
+        """
+        with self._lock:
+            snapshot = self.snapshot
+            tail = b''.join(self.tail)
+
+        if binary:
+            return {'snapshot': snapshot, 'tail': tail}
+        try:
+            return {'snapshot': decode_strokes(snapshot), 'tail': decode_strokes(tail)}
+        except ValueError:
+            return {'snapshot': [], 'tail': []}
+
+
+# Global stroke buffer shared by all rooms
+stroke_buffer = StrokeBuffer(StrokeSimplifier() if STROKE_SIMPLIFY_TOLERANCE > 0 else None)
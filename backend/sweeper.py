@@ -0,0 +1,106 @@
+"""
+Idle Sweeper - Periodic reclamation of idle rooms and stale sessions
+
+Rooms, game states and sessions are otherwise only removed on the happy
+path (the last player leaving a started game), so abandoned lobbies,
+finished games and orphaned entries would stay in memory forever.
+"""
+import heapq
+import logging
+import time
+
+from .config import LOBBY_RECONNECT_TTL, ROOM_IDLE_TTL, ENDED_GAME_TTL, MAX_ROOMS
+from .logs import log_event
+from .metrics import registry, Counter, Histogram
+
+logger = logging.getLogger(__name__)
+
+RECLAIMED = registry.register(Counter(
+    'drawing_game_gc_reclaimed_total', 'Objects reclaimed by the idle sweeper', 'kind'))
+SWEEP_SECONDS = registry.register(Histogram(
+    'drawing_game_gc_sweep_seconds', 'Time spent in one idle sweep'))
+
+
+class Sweeper:
+    """Applies per-state TTLs and the MAX_ROOMS cap to the in-memory stores.
+
+    `close_room(room_code, reason)` is called for every room to remove, so
+    the caller can notify clients and drop related per-room state;
+    `player_expired(room, sid)` removes every seat given up (by default
+    only from the room), so the caller can also update a running game.
+    """
+
+    def __init__(self, rooms, game_states, sessions, close_room, player_expired=None, max_rooms=MAX_ROOMS):
+        self.rooms = rooms
+        self.game_states = game_states
+        self.sessions = sessions
+        self.close_room = close_room
+        self.player_expired = player_expired
+        self.max_rooms = max_rooms
+
+    def sweep(self, now=None):
+        """Run one pass and return {kind: count} of what was reclaimed."""
+        start = time.perf_counter()
+        now = time.monotonic() if now is None else now
+        reclaimed = {}
+
+        def reclaim(kind, count=1):
+            reclaimed[kind] = reclaimed.get(kind, 0) + count
+
+        # Game states whose room is already gone
+        for room_code in [code for code in list(self.game_states) if code not in self.rooms]:
+            self.game_states.pop(room_code, None)
+            reclaim('game_state')
+
+        for room_code, room in list(self.rooms.items()):
+            with room.lock:
+                # Players who never came back (lobby seats and restored games)
+                for sid, since in list(room.disconnected.items()):
+                    if now - since >= LOBBY_RECONNECT_TTL and sid in room.players:
+                        if self.player_expired:
+                            self.player_expired(room, sid)
+                        else:
+                            room.remove_player(sid)
+                        room.disconnected.pop(sid, None)
+                        reclaim('player')
+
+                reason = self._expiry_reason(room, self.game_states.get(room_code), now)
+                if reason:
+                    self.close_room(room_code, reason)
+                    reclaim('room')
+
+        # Over the cap: evict idle rooms first, then the least recently active
+        excess = len(self.rooms) - self.max_rooms
+        if excess > 0:
+            def lru_key(item):
+                game_state = self.game_states.get(item[0])
+                return (bool(game_state and game_state.game_active), item[1].last_active)
+
+            for room_code, _ in heapq.nsmallest(excess, list(self.rooms.items()), key=lru_key):
+                self.close_room(room_code, 'evicted')
+                reclaim('room_evicted')
+
+        # Sessions of players no longer in the room they were created for
+        for sid, data in list(self.sessions.active_sessions.items()):
+            room = self.rooms.get(data.get('room_code'))
+            if room is None or sid not in room.players:
+                self.sessions.remove_session(sid)
+                reclaim('session')
+
+        for kind, count in reclaimed.items():
+            RECLAIMED.inc(kind, count)
+        SWEEP_SECONDS.observe(time.perf_counter() - start)
+        if reclaimed:
+            log_event(logger, logging.INFO, 'idle_sweep', rooms=len(self.rooms), **reclaimed)
+        return reclaimed
+
+    @staticmethod
+    def _expiry_reason(room, game_state, now):
+        idle = now - room.last_active
+        if not room.players:
+            return 'empty'
+        if game_state and game_state.game_active:
+            return None
+        if room.game_started:
+            return 'ended' if idle >= ENDED_GAME_TTL else None
+        return 'idle' if idle >= ROOM_IDLE_TTL else None
@@ -0,0 +1,195 @@
+"""
+Drawing Thumbnails - Server-side rendering of finished drawings
+
+At the end of each turn the canvas history is rasterized into a
+CANVAS_WIDTH x CANVAS_HEIGHT buffer with NumPy, box-filtered down by
+THUMBNAIL_SCALE and encoded as a PNG for the end-of-game gallery.
+Rendering runs in a process pool so a large drawing never holds up the
+room's handlers. Finished renders are only queued by the pool's result
+thread; the server hands them to their rooms from its own loop with
+deliver(). Without NumPy thumbnails are simply not produced.
+"""
+import base64
+import collections
+import logging
+import multiprocessing
+import struct
+import threading
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from .config import CANVAS_WIDTH, CANVAS_HEIGHT, THUMBNAIL_WORKERS, THUMBNAIL_SCALE
+from .metrics import registry, Counter, Histogram
+from .wire import decode_strokes
+
+logger = logging.getLogger(__name__)
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+BACKGROUND = (255, 255, 255)
+
+THUMBNAILS_RENDERED = registry.register(Counter(
+    'drawing_game_thumbnails_total', 'Turn thumbnails by outcome', 'outcome'))
+THUMBNAIL_SECONDS = registry.register(Histogram(
+    'drawing_game_thumbnail_seconds', 'Time from turn end until its thumbnail is ready'))
+
+
+def _parse_color(color):
+    try:
+        value = int(color[1:7], 16) if color and color.startswith('#') and len(color) >= 7 else 0
+    except ValueError:
+        value = 0
+    return (value >> 16) & 0xFF, (value >> 8) & 0xFF, value & 0xFF
+
+
+def _disc(radius):
+    """(dy, dx) offsets of the pixels covered by a brush of `radius`."""
+    r = int(np.ceil(radius))
+    dy, dx = np.mgrid[-r:r + 1, -r:r + 1]
+    inside = dx * dx + dy * dy <= radius * radius + 0.25
+    return dy[inside], dx[inside]
+
+
+def _sample_polyline(points, spacing):
+    """Points along a polyline, at most `spacing` pixels apart."""
+    if len(points) == 1:
+        return points
+    segments = points[1:] - points[:-1]
+    lengths = np.hypot(segments[:, 0], segments[:, 1])
+    steps = np.maximum(1, np.ceil(lengths / spacing)).astype(np.int64)
+
+    # Every segment contributes `steps` samples at t = 0, 1/steps, ...
+    segment = np.repeat(np.arange(len(segments)), steps)
+    first = np.repeat(np.cumsum(steps) - steps, steps)
+    t = (np.arange(len(segment)) - first) / np.repeat(steps, steps)
+    samples = points[segment] + segments[segment] * t[:, None]
+    return np.vstack([samples, points[-1:]])
+
+
+def rasterize(strokes, width=CANVAS_WIDTH, height=CANVAS_HEIGHT):
+    """Draw decoded strokes onto a white (height, width, 3) uint8 image."""
+    image = np.empty((height, width, 3), dtype=np.uint8)
+    image[:] = BACKGROUND
+    discs = {}
+
+    for stroke in strokes:
+        radius = max(0.5, (stroke.get('size') or 1) / 2)
+        if stroke['type'] == 'dot':
+            points = np.array([[stroke['x'], stroke['y']]], dtype=np.float64)
+        else:
+            points = np.asarray(stroke['points'], dtype=np.float64).reshape(-1, 2)
+            if not len(points):
+                continue
+            points = _sample_polyline(points, max(0.5, radius / 2))
+
+        # Stamp the brush at every sample; round caps and joins come for free
+        centers = np.unique(np.rint(points).astype(np.int64), axis=0)
+        if radius not in discs:
+            discs[radius] = _disc(radius)
+        dy, dx = discs[radius]
+        xs = (centers[:, 0:1] + dx).ravel()
+        ys = (centers[:, 1:2] + dy).ravel()
+        inside = (xs >= 0) & (xs < width) & (ys >= 0) & (ys < height)
+        image[ys[inside], xs[inside]] = _parse_color(stroke.get('color'))
+
+    return image
+
+
+def downscale(image, factor=THUMBNAIL_SCALE):
+    """Box-filter an image down by an integer factor."""
+    if factor <= 1:
+        return image
+    height = image.shape[0] // factor * factor
+    width = image.shape[1] // factor * factor
+    blocks = image[:height, :width].reshape(height // factor, factor, width // factor, factor, 3)
+    return blocks.mean(axis=(1, 3)).round().astype(np.uint8)
+
+
+def _png_chunk(tag, body):
+    return struct.pack('>I', len(body)) + tag + body + struct.pack('>I', zlib.crc32(tag + body) & 0xFFFFFFFF)
+
+
+def encode_png(image):
+    """Encode a (height, width, 3) uint8 image as an 8-bit RGB PNG."""
+    height, width = image.shape[:2]
+    rows = np.zeros((height, width * 3 + 1), dtype=np.uint8)  # Leading 0: no row filter
+    rows[:, 1:] = image.reshape(height, width * 3)
+    header = struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)
+    return (PNG_SIGNATURE + _png_chunk(b'IHDR', header) +
+            _png_chunk(b'IDAT', zlib.compress(rows.tobytes(), 9)) + _png_chunk(b'IEND', b''))
+
+
+def render_thumbnail(canvas_frame):
+    """PNG thumbnail of a canvas in the binary wire format (runs in a worker)."""
+    return encode_png(downscale(rasterize(decode_strokes(canvas_frame))))
+
+
+class ThumbnailRenderer:
+    """Renders finished drawings in a lazily started process pool."""
+
+    def __init__(self, workers=THUMBNAIL_WORKERS):
+        self.workers = workers
+        self._executor = None
+        self._lock = threading.Lock()
+        self._done = collections.deque()  # [(future, submitted, callback)] awaiting deliver()
+
+    @property
+    def enabled(self):
+        return np is not None and self.workers > 0
+
+    def submit(self, canvas_frame, callback):
+        """Render `canvas_frame` off the caller's thread.
+
+        `callback(data_url)` is called by a later deliver() once the PNG
+        is ready. Returns False if nothing was submitted.
+        """
+        if not self.enabled or not canvas_frame:
+            return False
+        submitted = time.perf_counter()
+
+        def done(future):
+            # Runs on the pool's native result thread: under eventlet or gevent
+            # it must not take the server's (green) locks, so it only queues
+            self._done.append((future, submitted, callback))
+
+        self._get_executor().submit(render_thumbnail, canvas_frame).add_done_callback(done)
+        return True
+
+    def deliver(self):
+        """Run the callbacks of finished renders on the calling thread; returns how many ran."""
+        delivered = 0
+        while self._done:
+            future, submitted, callback = self._done.popleft()
+            try:
+                png = future.result()
+            except Exception:
+                THUMBNAILS_RENDERED.inc('failed')
+                logger.exception("thumbnail_failed")
+                continue
+            THUMBNAILS_RENDERED.inc('rendered')
+            THUMBNAIL_SECONDS.observe(time.perf_counter() - submitted)
+            try:
+                callback('data:image/png;base64,' + base64.b64encode(png).decode('ascii'))
+            except Exception:
+                logger.exception("thumbnail_delivery_failed")
+            delivered += 1
+        return delivered
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                # Spawned, not forked, so workers start without the server's
+                # threads and patched modules; the server runs from
+                # backend/__main__.py, which spawn does not re-import
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context('spawn'))
+            return self._executor
+
+
+# Global renderer shared by all rooms
+thumbnail_renderer = ThumbnailRenderer()
@@ -0,0 +1,191 @@
+"""
+Compact Binary Wire Format for Drawing Data
+
+A frame is a sequence of strokes, so frames can be concatenated as-is.
+Each stroke is encoded little-endian as:
+
+    uint8   kind         0 = polyline, 1 = dot
+    uint8   color index  into PALETTE, or CUSTOM_COLOR followed by 3 RGB bytes
+    uint8   brush size
+    uint16  point count  n (1 for dots)
+    int16   x0, y0       first point, quantized by COORD_SCALE
+    int8    dx, dy       (n - 1) deltas from the previous point
+
+Deltas larger than an int8 are split into several collinear steps by the
+encoder, and polylines with more points than a uint16 count are split into
+consecutive strokes that share their joining point, so every polyline fits
+the format.
+"""
+import struct
+
+KIND_POLYLINE = 0
+KIND_DOT = 1
+
+COORD_SCALE = 4  # quarter-pixel precision; 800px * 4 fits comfortably in int16
+CUSTOM_COLOR = 255
+
+PALETTE = [
+    '#000000', '#FFFFFF', '#FF0000', '#00FF00', '#0000FF', '#FFFF00',
+    '#FF00FF', '#00FFFF', '#808080', '#C0C0C0', '#800000', '#808000',
+    '#008000', '#800080', '#008080', '#000080', '#FFA500', '#A52A2A',
+    '#FFC0CB', '#667EEA', '#764BA2', '#F093FB', '#F5576C', '#4FACFE'
+]
+_PALETTE_INDEX = {color: i for i, color in enumerate(PALETTE)}
+
+_HEADER = struct.Struct('<BBBH')
+_POINT = struct.Struct('<hh')
+_DELTA = struct.Struct('<bb')
+_INT16_MIN, _INT16_MAX = -32768, 32767
+_MAX_DELTAS = 0xFFFF - 1  # the point count includes the first point
+
+# Wire format chosen by each connection: {sid: 'binary'}
+wire_formats = {}
+
+
+def set_wire_format(sid, wire_format):
+    """Record the wire format negotiated by a connection."""
+    if wire_format == 'binary':
+        wire_formats[sid] = 'binary'
+    else:
+        wire_formats.pop(sid, None)
+
+
+def uses_binary(sid):
+    """Check whether a connection receives binary drawing frames."""
+    return sid in wire_formats
+
+
+def forget_connection(sid):
+    """Drop the negotiated format for a disconnected client."""
+    wire_formats.pop(sid, None)
+
+
+def _quantize(value):
+    q = int(round(float(value) * COORD_SCALE))
+    return max(_INT16_MIN, min(_INT16_MAX, q))
+
+
+def _encode_color(color, out):
+    color = (color or '#000000').upper()
+    index = _PALETTE_INDEX.get(color)
+    if index is not None:
+        out.append(index)
+        return
+    try:
+        rgb = bytes.fromhex(color.lstrip('#')[:6].ljust(6, '0'))
+    except ValueError:
+        rgb = b'\x00\x00\x00'
+    out.append(CUSTOM_COLOR)
+    out += rgb
+
+
+def _encode_points(points):
+    """Turn a flat [x, y, ...] list into (x0, y0, [(dx, dy), ...])."""
+    x0, y0 = _quantize(points[0]), _quantize(points[1])
+    deltas = []
+    px, py = x0, y0
+    for i in range(2, len(points) - 1, 2):
+        x, y = _quantize(points[i]), _quantize(points[i + 1])
+        dx, dy = x - px, y - py
+        # Split long jumps into int8-sized collinear steps
+        steps = max(1, (max(abs(dx), abs(dy)) + 126) // 127)
+        sx, sy = px, py
+        for step in range(1, steps + 1):
+            nx = px + (dx * step) // steps
+            ny = py + (dy * step) // steps
+            deltas.append((nx - sx, ny - sy))
+            sx, sy = nx, ny
+        px, py = x, y
+    return x0, y0, deltas
+
+
+def encode_strokes(strokes):
+    """Encode a list of stroke dicts (polyline/dot/line) into bytes."""
+    out = bytearray()
+    for stroke in strokes:
+        stroke_type = stroke.get('type')
+        if stroke_type == 'dot':
+            kind = KIND_DOT
+            points = [stroke.get('x', 0), stroke.get('y', 0)]
+        elif stroke_type == 'line':
+            kind = KIND_POLYLINE
+            points = [stroke.get('x1', 0), stroke.get('y1', 0),
+                      stroke.get('x2', 0), stroke.get('y2', 0)]
+        else:
+            kind = KIND_POLYLINE
+            points = stroke.get('points') or []
+        if len(points) < 2:
+            continue
+
+        x0, y0, deltas = _encode_points(points)
+        head = bytearray([kind])
+        _encode_color(stroke.get('color'), head)
+        head.append(max(0, min(255, int(stroke.get('size') or 0))))
+
+        start = 0
+        while True:
+            chunk = deltas[start:start + _MAX_DELTAS]
+            out += head
+            out += struct.pack('<H', len(chunk) + 1)
+            out += _POINT.pack(x0, y0)
+            for dx, dy in chunk:
+                out += _DELTA.pack(dx, dy)
+                x0 += dx
+                y0 += dy
+            # Continue a long polyline from the point this stroke ended on
+            start += _MAX_DELTAS
+            if start >= len(deltas):
+                break
+    return bytes(out)
+
+
+def decode_strokes(data):
+    """Decode bytes produced by `encode_strokes` back into stroke dicts.
+
+    Raises ValueError if the frame is truncated or malformed.
+    """
+    strokes = []
+    view = memoryview(data)
+    offset = 0
+    end = len(view)
+    try:
+        while offset < end:
+            kind = view[offset]
+            color_index = view[offset + 1]
+            offset += 2
+            if color_index == CUSTOM_COLOR:
+                color = '#' + bytes(view[offset:offset + 3]).hex().upper()
+                if len(color) != 7:
+                    raise ValueError("Truncated color")
+                offset += 3
+            elif color_index < len(PALETTE):
+                color = PALETTE[color_index]
+            else:
+                raise ValueError(f"Unknown palette index {color_index}")
+
+            size = view[offset]
+            count, = struct.unpack_from('<H', view, offset + 1)
+            offset += 3
+            x, y = _POINT.unpack_from(view, offset)
+            offset += _POINT.size
+
+            if kind == KIND_DOT:
+                strokes.append({'type': 'dot', 'x': x / COORD_SCALE, 'y': y / COORD_SCALE,
+                                'color': color, 'size': size})
+                continue
+            if kind != KIND_POLYLINE:
+                raise ValueError(f"Unknown stroke kind {kind}")
+
+            points = [x / COORD_SCALE, y / COORD_SCALE]
+            for _ in range(count - 1):
+                dx, dy = _DELTA.unpack_from(view, offset)
+                offset += _DELTA.size
+                x += dx
+                y += dy
+                points.append(x / COORD_SCALE)
+                points.append(y / COORD_SCALE)
+            strokes.append({'type': 'polyline', 'points': points,
+                            'color': color, 'size': size})
+    except (IndexError, struct.error) as e:
+        raise ValueError(f"Malformed drawing frame: {e}") from e
+    return strokes
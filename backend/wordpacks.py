@@ -0,0 +1,197 @@
+"""
+Word Packs - Compiled, memory-mapped custom word lists
+
+A pack is compiled once from a text list into a compact binary file and
+then opened with mmap, so every room using the same pack shares one
+read-only mapping instead of holding its own Python strings.
+
+File layout (little-endian):
+
+    header      magic b'WPK1', uint32 category count, uint32 word count
+    categories  per category: uint32 name offset, uint32 name length,
+                uint32 first word index, uint32 word count
+    offsets     uint32 * (word count + 1), word i is blob[off[i]:off[i+1]]
+    blob        UTF-8 category names and words
+
+Usage:
+    python -m backend.wordpacks compile my_words.txt word_packs/my_words.wpk
+"""
+import logging
+import mmap
+import os
+import re
+import struct
+import sys
+import threading
+
+from .config import WORD_PACK_DIR
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'WPK1'
+PACK_EXTENSION = '.wpk'
+
+_HEADER = struct.Struct('<4sII')
+_CATEGORY = struct.Struct('<IIII')
+_OFFSET = struct.Struct('<I')
+_PACK_NAME = re.compile(r'^[A-Za-z0-9_-]{1,64}$')
+
+
+def compile_word_pack(categories, dest_path):
+    """Write {category: [words]} to `dest_path` in the pack format."""
+    categories = {name: list(dict.fromkeys(w for w in words if w))
+                  for name, words in categories.items()}
+
+    # Category names first, then every word back to back
+    blob = bytearray()
+    records = []
+    first = 0
+    for name, words in categories.items():
+        name_bytes = name.encode('utf-8')
+        records.append((len(blob), len(name_bytes), first, len(words)))
+        blob += name_bytes
+        first += len(words)
+
+    offsets = []
+    for words in categories.values():
+        for word in words:
+            offsets.append(len(blob))
+            blob += word.encode('utf-8')
+    offsets.append(len(blob))
+
+    # Write to a temp file and rename so readers never see a partial pack
+    tmp_path = dest_path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(_HEADER.pack(MAGIC, len(records), first))
+        for record in records:
+            f.write(_CATEGORY.pack(*record))
+        f.write(struct.pack(f'<{len(offsets)}I', *offsets))
+        f.write(blob)
+    os.replace(tmp_path, dest_path)
+    return dest_path
+
+
+def read_word_list(path):
+    """Parse a text list (`category,word` or one word per line) into {category: [words]}."""
+    default_category = os.path.splitext(os.path.basename(path))[0]
+    categories = {}
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            category, sep, word = line.partition(',')
+            if not sep:
+                category, word = default_category, line
+            word = word.strip()
+            if word:
+                categories.setdefault(category.strip(), []).append(word)
+    return categories
+
+
+class PackCategory:
+    """Read-only sequence of one category's words, decoded on access."""
+    __slots__ = ('pack', 'first', 'count')
+
+    def __init__(self, pack, first, count):
+        self.pack = pack
+        self.first = first
+        self.count = count
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        if not 0 <= index < self.count:
+            raise IndexError(index)
+        return self.pack.word(self.first + index)
+
+    def __iter__(self):
+        for i in range(self.count):
+            yield self.pack.word(self.first + i)
+
+
+class WordPack:
+    """A compiled pack opened through a shared read-only mmap."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            # mmap refuses empty files; a short one would fail on the header
+            if os.fstat(f.fileno()).st_size < _HEADER.size:
+                raise ValueError(f"{path} is too short to be a word pack")
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, category_count, word_count = _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            self._mm.close()
+            raise ValueError(f"{path} is not a word pack")
+
+        self.word_count = word_count
+        self._offsets_at = _HEADER.size + category_count * _CATEGORY.size
+        self._blob_at = self._offsets_at + (word_count + 1) * _OFFSET.size
+
+        # Only the small category table becomes Python objects
+        self.categories = {}
+        for i in range(category_count):
+            name_offset, name_len, first, count = _CATEGORY.unpack_from(
+                self._mm, _HEADER.size + i * _CATEGORY.size)
+            start = self._blob_at + name_offset
+            name = self._mm[start:start + name_len].decode('utf-8')
+            if count:
+                self.categories[name] = PackCategory(self, first, count)
+
+    def word(self, index):
+        """Decode word `index` straight from the mapping."""
+        start, end = struct.unpack_from('<II', self._mm, self._offsets_at + index * _OFFSET.size)
+        return self._mm[self._blob_at + start:self._blob_at + end].decode('utf-8')
+
+
+_open_packs = {}  # {pack name: WordPack}, shared by every room
+_open_lock = threading.Lock()
+
+
+def list_word_packs():
+    """Names of the compiled packs available in WORD_PACK_DIR."""
+    if not os.path.isdir(WORD_PACK_DIR):
+        return []
+    return sorted(os.path.splitext(name)[0] for name in os.listdir(WORD_PACK_DIR)
+                  if name.endswith(PACK_EXTENSION))
+
+
+def get_word_pack(name):
+    """Return the shared WordPack called `name`, or None if it does not exist."""
+    if not isinstance(name, str) or not _PACK_NAME.match(name):
+        return None
+    pack = _open_packs.get(name)
+    if pack is not None:
+        return pack
+
+    path = os.path.join(WORD_PACK_DIR, name + PACK_EXTENSION)
+    if not os.path.isfile(path):
+        return None
+    with _open_lock:
+        pack = _open_packs.get(name)
+        if pack is None:
+            try:
+                pack = _open_packs[name] = WordPack(path)
+            except (OSError, ValueError, struct.error):
+                logger.exception("word_pack_unreadable", extra={'fields': {'path': path}})
+                return None
+    return pack
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) != 3 or argv[0] != 'compile':
+        print("usage: python -m backend.wordpacks compile <words.txt> <pack.wpk>")
+        return 2
+    source, dest = argv[1], argv[2]
+    compile_word_pack(read_word_list(source), dest)
+    pack = WordPack(dest)
+    print(f"Compiled {pack.word_count} words in {len(pack.categories)} categories to {dest}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,7 +1,14 @@
 """
 Word Bank for Drawing Game
 """
+import bisect
+import itertools
 import random
+import re
+import unicodedata
+
+from .config import WORD_CATEGORY_WEIGHTS, WORD_LIST_PATH, CLOSE_GUESS_MAX_DISTANCE
+from .wordpacks import read_word_list
 
 WORD_BANK = {
     "animals": [
@@ -69,23 +76,123 @@ WORD_BANK = {
 }
 
 
+# Precomputed per-category word arrays, built on first use
+_category_words = None
+_word_file_loaded = False
+
+
+def register_word_file(path, replace=False):
+    """Load an external word list into the word bank.
+
+    Each non-empty line is either `category,word` or just `word`, in which
+    case the file name (without extension) is used as the category. Lines
+    starting with `#` are ignored.
+    """
+    global _category_words
+    loaded = read_word_list(path)
+
+    for category, words in loaded.items():
+        if replace or category not in WORD_BANK:
+            WORD_BANK[category] = words
+        else:
+            WORD_BANK[category] = WORD_BANK[category] + words
+    _category_words = None
+
+
+def get_category_words():
+    """Return {category: tuple(words)}, building it once (and loading WORD_LIST_PATH lazily)."""
+    global _category_words, _word_file_loaded
+    if _category_words is None:
+        if WORD_LIST_PATH and not _word_file_loaded:
+            _word_file_loaded = True
+            register_word_file(WORD_LIST_PATH)
+        # Drop duplicates while keeping order, so a deck never repeats a word
+        _category_words = {category: tuple(dict.fromkeys(words))
+                           for category, words in WORD_BANK.items() if words}
+    return _category_words
+
+
+class WordDeck:
+    """Lazy shuffled deck over a word tuple.
+
+    Performs one step of Fisher-Yates per draw, recording only the swapped
+    positions, so a draw is O(1) and a new deck costs nothing up front even
+    for very large word lists. Words do not repeat until the deck is
+    exhausted, after which it starts over.
+    """
+
+    def __init__(self, words):
+        self.words = words
+        self._swaps = {}
+        self._remaining = len(words)
+
+    def draw(self):
+        if self._remaining == 0:
+            self._swaps.clear()
+            self._remaining = len(self.words)
+
+        last = self._remaining - 1
+        j = random.randint(0, last)
+        index = self._swaps.get(j, j)
+        # Move the last undrawn position into the slot we just used
+        self._swaps[j] = self._swaps.pop(last, last)
+        if j == last:
+            self._swaps.pop(j, None)
+        self._remaining = last
+        return self.words[index]
+
+    def __len__(self):
+        return self._remaining
+
+
+class WordSelector:
+    """Per-game word source: picks a weighted category, then draws from its deck.
+
+    `words` maps categories to word sequences; it defaults to the built-in
+    bank and can be a memory-mapped WordPack's categories.
+    """
+
+    def __init__(self, weights=None, words=None):
+        self._words = get_category_words() if words is None else words
+        self._decks = {}
+        weights = WORD_CATEGORY_WEIGHTS if weights is None else weights
+        self._categories = tuple(self._words)
+        self._cum_weights = tuple(itertools.accumulate(
+            max(0, weights.get(category, 1)) for category in self._categories))
+
+    def _pick_category(self):
+        total = self._cum_weights[-1]
+        if total <= 0:
+            return random.choice(self._categories)
+        return self._categories[bisect.bisect_right(self._cum_weights, random.random() * total)]
+
+    def next_word(self, category=None):
+        """Return (word, category) without repeating until a category is exhausted."""
+        if category is None or category not in self._words:
+            category = self._pick_category()
+        deck = self._decks.get(category)
+        if deck is None:
+            deck = self._decks[category] = WordDeck(self._words[category])
+        return deck.draw(), category
+
+
 def get_random_word(category=None, exclude_words=None):
     """
     Get a random word from a category.
     """
-    if exclude_words is None:
-        exclude_words = []
+    words = get_category_words()
+    exclude_words = set(exclude_words or ())
 
     # Choose random category if not specified
-    if category is None or category not in WORD_BANK:
-        category = random.choice(list(WORD_BANK.keys()))
+    if category is None or category not in words:
+        category = random.choice(tuple(words))
 
     # Filter out excluded words
-    available_words = [w for w in WORD_BANK[category] if w not in exclude_words]
+    available_words = [w for w in words[category] if w not in exclude_words]
 
     # If all words used, reset and use all words
     if not available_words:
-        available_words = WORD_BANK[category]
+        available_words = words[category]
 
     word = random.choice(available_words)
     return word, category
@@ -104,8 +211,125 @@ def get_word_hint(word, reveal_count=1):
     return ' '.join(hint)
 
 
+_SEPARATORS = re.compile(r'[\s\-_\.\']+')
+
+
+def normalize_guess(text):
+    """Fold case, accents and separators so 'Ice-Cream ' == 'ice cream'."""
+    text = unicodedata.normalize('NFKD', text)
+    text = ''.join(c for c in text if not unicodedata.combining(c))
+    return _SEPARATORS.sub(' ', text.casefold()).strip()
+
+
+# "-es" plurals only follow these endings (box/boxes, not grape/grap-es)
+_SIBILANT_ENDINGS = ('s', 'x', 'z', 'ch', 'sh')
+# Words ending like this are singular (bus, tennis, glass), so nothing is stripped
+_SINGULAR_S_ENDINGS = ('ss', 'us', 'is')
+
+
+def _plural_variants(word):
+    """Simple English singular/plural forms of a normalized word.
+
+    Singular forms are only derived from words that look plural, so a
+    truncated guess ("bu", "tenni") never matches a singular target.
+    """
+    variants = {word}
+    if word.endswith('s') and len(word) > 2 and not word.endswith(_SINGULAR_S_ENDINGS):
+        if word.endswith('es') and word[:-2].endswith(('ss', 'x', 'z', 'ch', 'sh')):
+            variants.add(word[:-2])
+        else:
+            variants.add(word[:-1])
+            if word.endswith('ies') and len(word) > 3:
+                variants.add(word[:-3] + 'y')
+    elif word.endswith(_SIBILANT_ENDINGS):
+        variants.add(word + 'es')
+    else:
+        variants.add(word + 's')
+        if word.endswith('y') and len(word) > 1 and word[-2] not in 'aeiou':
+            variants.add(word[:-1] + 'ies')
+    return variants
+
+
+def bounded_edit_distance(a, b, limit):
+    """Levenshtein distance between a and b, or limit + 1 if it exceeds limit.
+
+    Only a diagonal band of width 2 * limit + 1 is computed and the scan
+    stops as soon as every cell in a row is over the limit.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    if len(a) > len(b):
+        a, b = b, a
+
+    over = limit + 1
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        lo = max(1, i - limit)
+        hi = min(len(b), i + limit)
+        current = [over] * (len(b) + 1)
+        current[0] = i if i <= limit else over
+        row_min = current[0]
+        ca = a[i - 1]
+        for j in range(lo, hi + 1):
+            cost = 0 if ca == b[j - 1] else 1
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if value > over:
+                value = over
+            current[j] = value
+            if value < row_min:
+                row_min = value
+        if row_min > limit:
+            return over
+        previous = current
+    return min(previous[len(b)], over)
+
+
+class GuessMatcher:
+    """Matcher for one turn's word, compiled once in GameState.start_turn.
+
+    Accepts case, accent, whitespace/hyphen and plural variants of the word
+    and flags guesses within a small edit distance as close.
+    """
+
+    CORRECT = 'correct'
+    CLOSE = 'close'
+
+    def __init__(self, word):
+        self.word = word
+        normalized = normalize_guess(word)
+        self.target = normalized
+
+        accepted = set()
+        for form in (normalized, normalized.replace(' ', '')):
+            accepted.add(form)
+            # Pluralize the last word only ("ice creams", "magic wands")
+            head, _, last = form.rpartition(' ')
+            for variant in _plural_variants(last):
+                accepted.add(f'{head} {variant}' if head else variant)
+        self.accepted = frozenset(accepted)
+
+        compact = normalized.replace(' ', '')
+        self._compact_target = compact
+        self._close_limit = 1 if len(compact) <= 5 else CLOSE_GUESS_MAX_DISTANCE
+
+    def match(self, guess):
+        """Return CORRECT, CLOSE or None for a raw guess."""
+        normalized = normalize_guess(guess)
+        if normalized in self.accepted:
+            return self.CORRECT
+        if not normalized:
+            return None
+        compact = normalized.replace(' ', '')
+        if compact in self.accepted:
+            return self.CORRECT
+        distance = bounded_edit_distance(compact, self._compact_target, self._close_limit)
+        if distance <= self._close_limit:
+            return self.CLOSE
+        return None
+
+
 def validate_guess(guess, correct_word):
     """
-    Check if a guess is correct (case-insensitive, strip whitespace).
+    Check if a guess is correct (ignoring case, accents, separators and plurals).
     """
-    return guess.strip().lower() == correct_word.strip().lower()
+    return GuessMatcher(correct_word).match(guess) == GuessMatcher.CORRECT
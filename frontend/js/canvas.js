@@ -218,14 +218,48 @@ function drawDot(x, y, color = null, size = null) {
     ctx.closePath();
 }
 
+function drawPolyline(points, color, size) {
+    if (!points || points.length < 4) {
+        return;
+    }
+    ctx.beginPath();
+    ctx.moveTo(points[0], points[1]);
+    for (let i = 2; i < points.length; i += 2) {
+        ctx.lineTo(points[i], points[i + 1]);
+    }
+    ctx.strokeStyle = color || currentColor;
+    ctx.lineWidth = size || currentBrushSize;
+    ctx.stroke();
+    ctx.closePath();
+}
+
 function drawOnCanvas(data) {
     if (data.type === 'line') {
         drawLine(data.x1, data.y1, data.x2, data.y2, data.color, data.size);
+    } else if (data.type === 'polyline') {
+        drawPolyline(data.points, data.color, data.size);
     } else if (data.type === 'dot') {
         drawDot(data.x, data.y, data.color, data.size);
     }
 }
 
+// Redraw the server-side history (snapshot + tail) after a reconnect
+function restoreCanvas(canvasState) {
+    if (!canvasState || !ctx) {
+        return;
+    }
+    clearDrawingCanvas();
+    [canvasState.snapshot, canvasState.tail].forEach((part) => {
+        if (!part) {
+            return;
+        }
+        const strokes = Array.isArray(part)
+            ? part
+            : (window.WireFormat ? window.WireFormat.decodeStrokes(part) : []);
+        strokes.forEach(drawOnCanvas);
+    });
+}
+
 function clearDrawingCanvas() {
     if (ctx && canvas) {
         ctx.clearRect(0, 0, canvas.width, canvas.height);
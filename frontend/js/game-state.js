@@ -12,6 +12,14 @@ document.addEventListener('DOMContentLoaded', () => {
     if (roomCode) {
         document.getElementById('gameRoomCode').textContent = roomCode;
         
+        if (isSpectator) {
+            // Spectators only watch: no drawing tools, no chat box
+            const chatForm = document.getElementById('chatForm');
+            if (chatForm) chatForm.style.display = 'none';
+            spectateRoom(roomCode.toUpperCase());
+            return;
+        }
+        
         // Load initial state from localStorage if available
         try {
             const savedState = localStorage.getItem('gameState');
@@ -40,6 +48,7 @@ document.addEventListener('DOMContentLoaded', () => {
 // Handle game state response
 socket.on('game_state_update', (data) => {
     console.log('Received game state:', data);
+    applyFullState(data.state);
     
     // Update drawer information
     if (data.current_drawer) {
@@ -66,6 +75,16 @@ socket.on('game_state_update', (data) => {
         }
     }
     
+    // Full board once on load; later updates arrive as rank changes
+    if (data.leaderboard && typeof updateScoreboard === 'function') {
+        updateScoreboard(data.leaderboard);
+    }
+    
+    // Redraw whatever has been drawn so far this turn
+    if (data.canvas && typeof restoreCanvas === 'function') {
+        restoreCanvas(data.canvas);
+    }
+    
     // Update category and round information
     document.getElementById('currentCategory').textContent = data.category || '-';
     document.getElementById('currentRound').textContent = data.current_round || '1';
@@ -31,12 +31,23 @@ function initializeHomePage() {
     
     if (createRoomForm) {
         createRoomForm.addEventListener('submit', handleCreateRoom);
+        loadWordPacks();
     }
     
     if (joinRoomForm) {
         joinRoomForm.addEventListener('submit', handleJoinRoom);
     }
     
+    const watchRoomBtn = document.getElementById('watchRoomBtn');
+    if (watchRoomBtn) {
+        watchRoomBtn.addEventListener('click', handleWatchRoom);
+    }
+    
+    const quickPlayBtn = document.getElementById('quickPlayBtn');
+    if (quickPlayBtn) {
+        quickPlayBtn.addEventListener('click', handleQuickPlay);
+    }
+    
     console.log('✅ Home page initialized');
 }
 
@@ -57,13 +68,69 @@ function handleCreateRoom(e) {
     
     // Create room via socket
     if (window.socketClient) {
-        window.socketClient.createRoom(username);
+        const wordPack = document.getElementById('wordPack');
+        window.socketClient.createRoom(username, wordPack ? wordPack.value : null);
         displayNotification('Creating room...', 'info');
     } else {
         displayNotification('Connection error. Please refresh.', 'error');
     }
 }
 
+// Offer the server's custom word packs, if it has any
+function loadWordPacks() {
+    const group = document.getElementById('wordPackGroup');
+    const select = document.getElementById('wordPack');
+    if (!group || !select || !window.socketClient) {
+        return;
+    }
+    
+    window.socketClient.listWordPacks().then((packs) => {
+        packs.forEach((name) => {
+            const option = document.createElement('option');
+            option.value = name;
+            option.textContent = name;
+            select.appendChild(option);
+        });
+        if (packs.length) {
+            group.style.display = '';
+        }
+    });
+}
+
+function handleQuickPlay() {
+    const username = document.getElementById('createUsername').value.trim();
+    
+    if (!username) {
+        displayNotification('Please enter your name', 'error');
+        return;
+    }
+    
+    if (username.length < 2 || username.length > 20) {
+        displayNotification('Name must be 2-20 characters', 'error');
+        return;
+    }
+    
+    // The server seats us in the fullest open public lobby
+    if (window.socketClient) {
+        window.socketClient.quickPlay(username);
+        displayNotification('Finding a game...', 'info');
+    } else {
+        displayNotification('Connection error. Please refresh.', 'error');
+    }
+}
+
+function handleWatchRoom() {
+    const roomCode = document.getElementById('roomCode').value.trim().toUpperCase();
+    
+    if (!roomCode || roomCode.length !== 6) {
+        displayNotification('Please enter a valid 6-character room code', 'error');
+        return;
+    }
+    
+    // Spectators need no name and can watch games already in progress
+    window.location.href = `game.html?room=${roomCode}&spectate=1`;
+}
+
 function handleJoinRoom(e) {
     e.preventDefault();
     
@@ -288,12 +355,13 @@ function showTurnEndModal(word, leaderboard) {
     }, 1000);
 }
 
-function showGameEndModal(leaderboard, winners) {
+function showGameEndModal(leaderboard, winners, replayId = null) {
     const modal = document.getElementById('gameEndModal');
     const winnerAnnouncement = document.getElementById('winnerAnnouncement');
     const finalScores = document.getElementById('finalScores');
     const playAgainBtn = document.getElementById('playAgainBtn');
     const backToHomeBtn = document.getElementById('backToHomeBtn');
+    const watchReplayBtn = document.getElementById('watchReplayBtn');
     
     if (!modal) return;
     
@@ -342,10 +410,30 @@ function showGameEndModal(leaderboard, winners) {
         };
     }
     
+    if (watchReplayBtn && replayId) {
+        watchReplayBtn.style.display = '';
+        watchReplayBtn.onclick = () => {
+            window.location.href = `replay.html?id=${encodeURIComponent(replayId)}`;
+        };
+    }
+    
     // Show modal
     modal.style.display = 'flex';
 }
 
+function renderGallery(gallery) {
+    const galleryEl = document.getElementById('gameGallery');
+    if (!galleryEl) return;
+    
+    galleryEl.style.display = gallery.length ? '' : 'none';
+    galleryEl.innerHTML = gallery.map(item => `
+        <figure class="gallery-item">
+            <img src="${item.image}" alt="${escapeHtml(item.word || '')}" loading="lazy">
+            <figcaption>${escapeHtml(item.word || '')} · ${escapeHtml(item.drawer || '?')}</figcaption>
+        </figure>
+    `).join('');
+}
+
 // ==================== NOTIFICATION SYSTEM ====================
 function displayNotification(message, type = 'info') {
     let notificationEl = document.getElementById('errorMessage');
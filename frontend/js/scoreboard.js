@@ -5,6 +5,7 @@
 
 let scoreboardList = null;
 let currentDrawerSid = null;
+let currentLeaderboard = [];  // Last known board; rank changes are applied on top
 
 // Initialize scoreboard
 function initializeScoreboard() {
@@ -21,13 +22,32 @@ function initializeScoreboard() {
 // ==================== SCOREBOARD FUNCTIONS ====================
 
 function updateScoreboard(leaderboard) {
+    currentLeaderboard = (leaderboard || []).map((player) => ({ ...player }));
+    renderScoreboard(currentLeaderboard);
+}
+
+// Merge only the entries the server reports as changed
+function applyRankChanges(changes) {
+    (changes || []).forEach((change) => {
+        const existing = currentLeaderboard.find((player) => player.sid === change.sid);
+        if (existing) {
+            existing.score = change.score;
+            existing.username = change.username;
+        } else {
+            currentLeaderboard.push({ ...change });
+        }
+    });
+    renderScoreboard(currentLeaderboard);
+}
+
+function renderScoreboard(leaderboard) {
     if (!scoreboardList) return;
     
     // Clear existing scores
     scoreboardList.innerHTML = '';
     
-    // Sort by score (descending)
-    const sortedPlayers = [...leaderboard].sort((a, b) => b.score - a.score);
+    // Sort by score (descending), then by username like the server
+    const sortedPlayers = [...leaderboard].sort((a, b) => (b.score - a.score) || a.username.localeCompare(b.username));
     
     // Create score items
     sortedPlayers.forEach((player, index) => {
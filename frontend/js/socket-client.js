@@ -8,24 +8,43 @@ let currentRoomCode = null;
 let currentUsername = null;
 let mySocketId = null;
 let isDrawer = false;
+// Read-only viewers open game.html?room=CODE&spectate=1
+const isSpectator = new URLSearchParams(window.location.search).get('spectate') === '1';
 
-// Initialize Socket.IO connection
-function initializeSocket() {
-    // Get the correct server URL
-    let serverUrl;
-    
+// Outgoing drawing segments are queued and sent in batches
+const DRAW_SEND_INTERVAL_MS = 33;
+let pendingSegments = [];
+let drawSendTimer = null;
+let useBinaryDrawing = false;
+
+// Thumbnails of this game's finished drawings, shown on the game-over screen
+let turnGallery = [];
+
+// The last join/spectate request, retried once after rerouting to the room's worker
+let pendingJoin = null;
+
+// Get the correct server URL
+function getServerUrl() {
     if (window.location.hostname === 'localhost' || window.location.hostname === '127.0.0.1') {
         // Local development
-        serverUrl = 'http://localhost:5000';
-    } else {
-        // Production (Render or any deployed server)
-        serverUrl = window.location.origin;
+        return 'http://localhost:5000';
     }
-    
+    // Production (Render or any deployed server)
+    return window.location.origin;
+}
+
+// Initialize Socket.IO connection
+function initializeSocket() {
+    const serverUrl = getServerUrl();
     console.log('🔌 Connecting to:', serverUrl);
     
+    // The room code is sent with the handshake so a load balancer can route
+    // every connection for a room to the worker process that owns it
+    const routeRoom = new URLSearchParams(window.location.search).get('room');
+    
     // Connect to server
     socket = io(serverUrl, {
+        query: routeRoom ? { room: routeRoom.toUpperCase() } : {},
         transports: ['polling', 'websocket'],
         reconnection: true,
         reconnectionDelay: 1000,
@@ -39,6 +58,16 @@ function initializeSocket() {
     socket.on('connect', () => {
         console.log('✅ Connected to server');
         showNotification('Connected to server', 'success');
+        // Ask for compact binary drawing frames when the encoder is loaded
+        useBinaryDrawing = false;
+        if (window.WireFormat) {
+            socket.emit('set_wire_format', { format: 'binary' });
+        }
+        // Reconnected to the worker that owns the room: send the request again
+        if (pendingJoin && pendingJoin.rerouted) {
+            socket.emit(pendingJoin.event, pendingJoin.payload);
+            return;
+        }
         // If we're on the lobby page and have stored room/username, try to (re)join automatically
         try {
             if (window.location.pathname.includes('lobby.html')) {
@@ -55,7 +84,17 @@ function initializeSocket() {
                     // Update current variables and emit join
                     currentUsername = storedUsername;
                     currentRoomCode = targetRoom;
-                    socket.emit('join_room', { room_code: targetRoom, username: storedUsername });
+                    pendingJoin = { event: 'join_room', payload: { room_code: targetRoom, username: storedUsername }, rerouted: false };
+                    socket.emit('join_room', pendingJoin.payload);
+                }
+            } else if (window.location.pathname.includes('game.html') && !isSpectator) {
+                // Reclaim our seat if we dropped or the server restarted from a snapshot
+                const roomParam = new URLSearchParams(window.location.search).get('room');
+                const storedUsername = localStorage.getItem('username');
+                if (roomParam && storedUsername) {
+                    currentUsername = storedUsername;
+                    currentRoomCode = roomParam.toUpperCase();
+                    socket.emit('reattach', { room_code: currentRoomCode, username: storedUsername });
                 }
             }
         } catch (e) {
@@ -63,6 +102,13 @@ function initializeSocket() {
         }
     });
 
+    // Spectators are not remembered by the server, so watch again after a reconnect
+    socket.io.on('reconnect', () => {
+        if (isSpectator && currentRoomCode) {
+            spectateRoom(currentRoomCode);
+        }
+    });
+
     socket.on('disconnect', () => {
         console.log('❌ Disconnected from server');
         showNotification('Disconnected from server', 'error');
@@ -78,12 +124,36 @@ function initializeSocket() {
         console.log('My socket ID:', mySocketId);
     });
 
+    socket.on('wire_format', (data) => {
+        useBinaryDrawing = data.format === 'binary';
+    });
+
+    socket.on('reconnected', (data) => {
+        applyFullState(data.state);
+        refreshStateViews();
+        if (data.canvas && typeof restoreCanvas === 'function') {
+            restoreCanvas(data.canvas);
+        }
+        // Our SID changed, so ask again whether we are the drawer
+        if (window.location.pathname.includes('game.html')) {
+            socket.emit('get_game_state', { room_code: data.room_code });
+        }
+    });
+
+    socket.on('reattach_failed', (data) => {
+        console.log('No seat to reattach to in', data.room_code);
+    });
+
     // Room event handlers
     socket.on('room_created', handleRoomCreated);
     socket.on('room_joined', handleRoomJoined);
+    socket.on('quick_play_matched', handleQuickPlayMatched);
     socket.on('join_error', handleJoinError);
     socket.on('player_joined', handlePlayerJoined);
     socket.on('player_left', handlePlayerLeft);
+    socket.on('state_sync', handleStateSync);
+    socket.on('spectating', handleSpectating);
+    socket.on('room_closed', handleRoomClosed);
 
     // Game event handlers
     socket.on('game_started', handleGameStarted);
@@ -92,37 +162,68 @@ function initializeSocket() {
     socket.on('timer_update', handleTimerUpdate);
     socket.on('turn_ended', handleTurnEnded);
     socket.on('game_ended', handleGameEnded);
+    socket.on('turn_thumbnail', handleTurnThumbnail);
 
     // Drawing event handlers
     socket.on('draw', handleRemoteDraw);
+    socket.on('draw_batch', handleRemoteDrawBatch);
+    socket.on('draw_bin', handleRemoteDrawBinary);
     socket.on('clear_canvas', handleRemoteClearCanvas);
 
     // Chat event handlers
     socket.on('chat_message', handleChatMessage);
     socket.on('correct_guess', handleCorrectGuess);
     socket.on('already_guessed', handleAlreadyGuessed);
+    socket.on('close_guess', handleCloseGuess);
 
     // Reaction event handlers
     socket.on('reaction', handleReaction);
 
+    // Server-side throttling notice
+    socket.on('rate_limited', handleRateLimited);
+
     // Error handler
     socket.on('error', handleError);
 }
 
 // ==================== EMIT FUNCTIONS ====================
 
-function createRoom(username) {
+function createRoom(username, wordPack = null) {
     currentUsername = username;
     // Persist username for reconnection after page navigation
     try { localStorage.setItem('username', username); } catch (e) {}
-    socket.emit('create_room', { username });
+    const payload = { username };
+    if (wordPack) {
+        payload.word_pack = wordPack;
+    }
+    socket.emit('create_room', payload);
 }
 
 function joinRoom(roomCode, username) {
     currentUsername = username;
     currentRoomCode = roomCode;
     try { localStorage.setItem('username', username); localStorage.setItem('room_code', roomCode); } catch (e) {}
-    socket.emit('join_room', { room_code: roomCode, username });
+    pendingJoin = { event: 'join_room', payload: { room_code: roomCode, username }, rerouted: false };
+    socket.emit('join_room', pendingJoin.payload);
+}
+
+// Names of the custom word packs a new room can use
+function listWordPacks() {
+    return fetch(`${getServerUrl()}/word_packs`)
+        .then((response) => response.ok ? response.json() : [])
+        .catch(() => []);
+}
+
+function quickPlay(username) {
+    currentUsername = username;
+    try { localStorage.setItem('username', username); } catch (e) {}
+    socket.emit('quick_play', { username });
+}
+
+function spectateRoom(roomCode) {
+    currentRoomCode = roomCode;
+    pendingJoin = { event: 'spectate_room', payload: { room_code: roomCode }, rerouted: false };
+    socket.emit('spectate_room', pendingJoin.payload);
 }
 
 function startGame() {
@@ -130,13 +231,38 @@ function startGame() {
 }
 
 function sendDrawing(drawData) {
-    socket.emit('draw', {
-        room_code: currentRoomCode,
-        ...drawData
-    });
+    pendingSegments.push(drawData);
+    if (!drawSendTimer) {
+        drawSendTimer = setTimeout(flushDrawing, DRAW_SEND_INTERVAL_MS);
+    }
+}
+
+function flushDrawing() {
+    drawSendTimer = null;
+    if (pendingSegments.length === 0) {
+        return;
+    }
+    if (useBinaryDrawing) {
+        socket.emit('draw', {
+            room_code: currentRoomCode,
+            bin: window.WireFormat.encodeSegments(pendingSegments)
+        });
+    } else {
+        socket.emit('draw', {
+            room_code: currentRoomCode,
+            segments: pendingSegments
+        });
+    }
+    pendingSegments = [];
 }
 
 function clearCanvas() {
+    // Anything still queued was drawn before the clear
+    pendingSegments = [];
+    if (drawSendTimer) {
+        clearTimeout(drawSendTimer);
+        drawSendTimer = null;
+    }
     socket.emit('clear_canvas', { room_code: currentRoomCode });
 }
 
@@ -195,13 +321,42 @@ function handleRoomCreated(data) {
 function handleRoomJoined(data) {
     console.log('Room joined:', data);
     currentRoomCode = data.room_code;
-    if (window.location.pathname.includes('lobby.html')) {
-        updateLobbyPlayers(data.room.players);
-        checkHostStatus(data.room.host_sid);
-    }
+    pendingJoin = null;
+    applyFullState(data.state);
+    refreshStateViews();
+}
+
+function handleQuickPlayMatched(data) {
+    console.log('Quick play matched:', data);
+    currentRoomCode = data.room_code.toUpperCase();
+    try { localStorage.setItem('room_code', currentRoomCode); } catch (e) {}
+    showNotification(data.created ? 'No open games, created a new room' : 'Found a game!', 'success');
+    
+    setTimeout(() => {
+        window.location.href = `lobby.html?room=${currentRoomCode}`;
+    }, 500);
+}
+
+function handleRoomClosed(data) {
+    const reason = data && data.reason === 'idle' ? 'The room was closed after being idle' : 'The room was closed';
+    showNotification(reason, 'warning');
+    try { localStorage.removeItem('room_code'); } catch (e) {}
+    setTimeout(() => {
+        window.location.href = 'index.html';
+    }, 2000);
 }
 
 function handleJoinError(data) {
+    // The room lives on another worker; reconnect with its code in the
+    // handshake so the load balancer routes us to that worker, then retry once
+    if (data.worker !== null && data.worker !== undefined && pendingJoin && !pendingJoin.rerouted) {
+        console.log('🔀 Rerouting to worker', data.worker, 'for room', pendingJoin.payload.room_code);
+        pendingJoin.rerouted = true;
+        socket.io.opts.query = { room: pendingJoin.payload.room_code };
+        socket.disconnect().connect();
+        return;
+    }
+    pendingJoin = null;
     showNotification(data.message, 'error');
 }
 
@@ -209,8 +364,8 @@ function handlePlayerJoined(data) {
     console.log('Player joined:', data);
     showNotification(`${data.username} joined the room`, 'info');
     
-    if (window.location.pathname.includes('lobby.html')) {
-        updateLobbyPlayers(data.players);
+    if (applyStateDelta(data.state)) {
+        refreshStateViews();
     }
 }
 
@@ -218,15 +373,62 @@ function handlePlayerLeft(data) {
     console.log('Player left:', data);
     showNotification(`${data.username} left the room`, 'info');
     
-    if (window.location.pathname.includes('lobby.html')) {
-        updateLobbyPlayers(data.players);
-    } else if (window.location.pathname.includes('game.html')) {
-        updateScoreboard(data.players);
+    if (!applyStateDelta(data.state)) {
+        return;
+    }
+    if (window.location.pathname.includes('game.html')) {
+        updateScoreboard(getStatePlayers());
+    } else {
+        refreshStateViews();
+    }
+}
+
+// A full state arrived after a missed delta
+function handleStateSync(state) {
+    applyFullState(state);
+    if (window.location.pathname.includes('game.html')) {
+        updateScoreboard(getStatePlayers());
+        updateGameState(roomState.game);
+    } else {
+        refreshStateViews();
+    }
+}
+
+function handleSpectating(data) {
+    console.log('Spectating:', data);
+    currentRoomCode = data.room_code;
+    pendingJoin = null;
+    applyFullState(data.state);
+    isDrawer = false;
+    disableDrawing();
+    
+    document.getElementById('currentDrawerName').textContent = data.drawer_username || '-';
+    document.getElementById('currentWord').textContent = data.word_length > 0 ? '_ '.repeat(data.word_length).trim() : 'Waiting for game...';
+    if (roomState.game) {
+        updateGameState(roomState.game);
+    }
+    updateScoreboard(data.leaderboard);
+    if (data.canvas && typeof restoreCanvas === 'function') {
+        restoreCanvas(data.canvas);
+    }
+    showNotification('Watching as a spectator', 'info');
+}
+
+function refreshStateViews() {
+    if (window.location.pathname.includes('lobby.html') && roomState.seq !== null) {
+        updateLobbyPlayers(getStatePlayers());
+        checkHostStatus(roomState.room.host_sid);
     }
 }
 
 function handleGameStarted(data) {
     console.log('Game started:', data);
+    if (isSpectator) {
+        // Spectators are already on the game page
+        handleNewTurn(data);
+        return;
+    }
+    applyStateDelta(data.state);
     isDrawer = (data.drawer_sid === mySocketId);
     
     // Store initial game state
@@ -251,6 +453,13 @@ function handleYourTurnToDraw(data) {
 
 function handleNewTurn(data) {
     console.log('New turn:', data);
+    applyStateDelta(data.state);
+    // After a missed delta roomState.game is stale until the resync lands,
+    // so hold the turn back instead of showing the old drawer or word
+    whenStateSynced(() => showNewTurn(data));
+}
+
+function showNewTurn(data) {
     isDrawer = (data.drawer_sid === mySocketId);
     
     // Update current drawer display
@@ -279,7 +488,7 @@ function handleNewTurn(data) {
         try { window.isDrawer = false; } catch (e) {}
     }
     
-    updateGameState(data.game_state);
+    updateGameState(roomState.game);
     clearDrawingCanvas();
 }
 
@@ -298,13 +507,39 @@ function handleTurnEnded(data) {
     console.log('Turn ended:', data);
     // Stop client-side timer if running
     if (typeof stopTimer === 'function') stopTimer();
+    updateScoreboard(data.leaderboard);
     showTurnEndModal(data.word, data.leaderboard);
 }
 
 function handleGameEnded(data) {
     console.log('Game ended:', data);
     if (typeof stopTimer === 'function') stopTimer();
-    showGameEndModal(data.final_leaderboard, data.winners);
+    (data.gallery || []).forEach(addGalleryItem);
+    sessionStorage.setItem('gameResults', JSON.stringify({
+        winners: data.winners,
+        leaderboard: data.final_leaderboard,
+        gallery: turnGallery
+    }));
+    showGameEndModal(data.final_leaderboard, data.winners, data.replay_id);
+    renderGallery(turnGallery);
+}
+
+// Thumbnails are rendered on the server after each turn, so the last few
+// can arrive after 'game_ended'
+function handleTurnThumbnail(data) {
+    addGalleryItem(data);
+    const results = JSON.parse(sessionStorage.getItem('gameResults') || 'null');
+    if (results) {
+        results.gallery = turnGallery;
+        sessionStorage.setItem('gameResults', JSON.stringify(results));
+        renderGallery(turnGallery);
+    }
+}
+
+function addGalleryItem(item) {
+    if (turnGallery.some(existing => existing.turn_id === item.turn_id)) return;
+    turnGallery.push(item);
+    turnGallery.sort((a, b) => a.turn_id - b.turn_id);
 }
 
 function handleRemoteDraw(data) {
@@ -313,6 +548,18 @@ function handleRemoteDraw(data) {
     }
 }
 
+function handleRemoteDrawBatch(data) {
+    if (!isDrawer && data && data.strokes) {
+        data.strokes.forEach(drawOnCanvas);
+    }
+}
+
+function handleRemoteDrawBinary(data) {
+    if (!isDrawer && window.WireFormat) {
+        window.WireFormat.decodeStrokes(data).forEach(drawOnCanvas);
+    }
+}
+
 function handleRemoteClearCanvas() {
     if (!isDrawer) {
         clearDrawingCanvas();
@@ -326,17 +573,37 @@ function handleChatMessage(data) {
 function handleCorrectGuess(data) {
     showNotification(`${data.username} guessed correctly! +${data.points} points`, 'success');
     addChatMessage('System', `${data.username} guessed the word!`, true, 'correct');
-    updateScoreboard(data.leaderboard);
+    if (data.rank_changes) {
+        applyRankChanges(data.rank_changes);
+    } else if (data.leaderboard) {
+        updateScoreboard(data.leaderboard);
+    }
 }
 
 function handleAlreadyGuessed(data) {
     showNotification(data.message, 'warning');
 }
 
+function handleCloseGuess(data) {
+    addChatMessage('System', data.message, true, 'close');
+}
+
 function handleReaction(data) {
+    if (data.count) {
+        // Merged reactions: show a few floating copies rather than one per sender
+        const copies = Math.min(data.count, 5);
+        for (let i = 0; i < copies; i++) {
+            showReactionOnCanvas(data.emoji, Math.random() * 80 + 10, Math.random() * 80 + 10);
+        }
+        return;
+    }
     showReactionOnCanvas(data.emoji, data.x, data.y);
 }
 
+function handleRateLimited(data) {
+    showNotification(data.message || 'Slow down!', 'warning');
+}
+
 function handleError(data) {
     console.error('Server error:', data);
     showNotification(data.message || 'An error occurred', 'error');
@@ -367,7 +634,10 @@ if (typeof io !== 'undefined') {
 // Export functions for use in other scripts
 window.socketClient = {
     createRoom,
+    listWordPacks,
     joinRoom,
+    quickPlay,
+    spectateRoom,
     startGame,
     sendDrawing,
     clearCanvas,
@@ -378,5 +648,6 @@ window.socketClient = {
     getSocket: () => socket,
     getRoomCode: () => currentRoomCode,
     getUsername: () => currentUsername,
-    isDrawer: () => isDrawer
+    isDrawer: () => isDrawer,
+    isSpectator: () => isSpectator
 };
\ No newline at end of file
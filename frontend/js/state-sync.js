@@ -0,0 +1,75 @@
+/**
+ * Versioned Room State
+ * Applies the server's delta broadcasts and resyncs when one is missed
+ */
+
+const roomState = {
+    seq: null,             // Last applied sequence number, null until a full state arrives
+    room: {},
+    players: new Map(),    // sid -> player
+    game: null
+};
+let stateSyncPending = false;
+// Event handlers held back until the requested full state arrives
+let afterStateSync = [];
+
+// Replace everything with a full snapshot from the server
+function applyFullState(state) {
+    if (!state) return;
+    roomState.seq = state.seq;
+    roomState.room = { ...state.room };
+    roomState.players = new Map((state.players || []).map((player) => [player.sid, { ...player }]));
+    roomState.game = state.game ? { ...state.game } : null;
+    stateSyncPending = false;
+
+    const deferred = afterStateSync;
+    afterStateSync = [];
+    deferred.forEach((callback) => callback());
+}
+
+// Run `callback` now, or once the pending resync has replaced the stale state
+function whenStateSynced(callback) {
+    if (stateSyncPending) {
+        afterStateSync.push(callback);
+    } else {
+        callback();
+    }
+}
+
+// Merge one delta; returns false (and asks for a resync) if deltas were missed
+function applyStateDelta(delta) {
+    if (!delta) return false;
+    if (roomState.seq !== null && delta.seq <= roomState.seq) {
+        // Already covered by a full state received after this delta was sent
+        return true;
+    }
+    if (roomState.seq === null || delta.seq !== roomState.seq + 1) {
+        requestStateSync();
+        return false;
+    }
+
+    if (delta.room) {
+        Object.assign(roomState.room, delta.room);
+    }
+    if (delta.players) {
+        (delta.players.remove || []).forEach((sid) => roomState.players.delete(sid));
+        (delta.players.upsert || []).forEach((player) => roomState.players.set(player.sid, { ...player }));
+    }
+    if (delta.game) {
+        roomState.game = { ...(roomState.game || {}), ...delta.game };
+    }
+    roomState.seq = delta.seq;
+    return true;
+}
+
+function requestStateSync() {
+    if (stateSyncPending || !socket) return;
+    stateSyncPending = true;
+    socket.emit('request_state_sync', {});
+}
+
+function getStatePlayers() {
+    return Array.from(roomState.players.values());
+}
+
+window.roomState = roomState;
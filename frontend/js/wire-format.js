@@ -0,0 +1,141 @@
+/**
+ * Binary Wire Format for Drawing Data
+ * Mirrors backend/wire.py: quantized int16 start point, int8 deltas,
+ * palette-indexed colors. Frames are plain sequences of strokes.
+ */
+
+const WIRE_KIND_POLYLINE = 0;
+const WIRE_KIND_DOT = 1;
+const WIRE_COORD_SCALE = 4;
+const WIRE_CUSTOM_COLOR = 255;
+
+const WIRE_PALETTE = [
+    '#000000', '#FFFFFF', '#FF0000', '#00FF00', '#0000FF', '#FFFF00',
+    '#FF00FF', '#00FFFF', '#808080', '#C0C0C0', '#800000', '#808000',
+    '#008000', '#800080', '#008080', '#000080', '#FFA500', '#A52A2A',
+    '#FFC0CB', '#667EEA', '#764BA2', '#F093FB', '#F5576C', '#4FACFE'
+];
+
+function wireQuantize(value) {
+    const q = Math.round(value * WIRE_COORD_SCALE);
+    return Math.max(-32768, Math.min(32767, q));
+}
+
+// Merge consecutive line segments that share style and endpoints into polylines
+function coalesceSegments(segments) {
+    const strokes = [];
+    segments.forEach((seg) => {
+        if (seg.type === 'dot') {
+            strokes.push({ type: 'dot', points: [seg.x, seg.y], color: seg.color, size: seg.size });
+            return;
+        }
+        const last = strokes[strokes.length - 1];
+        if (last && last.type === 'polyline' && last.color === seg.color && last.size === seg.size) {
+            const n = last.points.length;
+            if (last.points[n - 2] === seg.x1 && last.points[n - 1] === seg.y1) {
+                last.points.push(seg.x2, seg.y2);
+                return;
+            }
+        }
+        strokes.push({ type: 'polyline', points: [seg.x1, seg.y1, seg.x2, seg.y2], color: seg.color, size: seg.size });
+    });
+    return strokes;
+}
+
+function encodeSegments(segments) {
+    const bytes = [];
+    const pushInt16 = (v) => { bytes.push(v & 0xFF, (v >> 8) & 0xFF); };
+
+    coalesceSegments(segments).forEach((stroke) => {
+        const pts = stroke.points;
+        let x = wireQuantize(pts[0]);
+        let y = wireQuantize(pts[1]);
+        const deltas = [];
+        for (let i = 2; i + 1 < pts.length; i += 2) {
+            const nx = wireQuantize(pts[i]);
+            const ny = wireQuantize(pts[i + 1]);
+            const dx = nx - x;
+            const dy = ny - y;
+            // Split long jumps into int8-sized steps
+            const steps = Math.max(1, Math.ceil(Math.max(Math.abs(dx), Math.abs(dy)) / 127));
+            let sx = x;
+            let sy = y;
+            for (let s = 1; s <= steps; s++) {
+                const px = x + Math.floor(dx * s / steps);
+                const py = y + Math.floor(dy * s / steps);
+                deltas.push(px - sx, py - sy);
+                sx = px;
+                sy = py;
+            }
+            x = nx;
+            y = ny;
+        }
+
+        bytes.push(stroke.type === 'dot' ? WIRE_KIND_DOT : WIRE_KIND_POLYLINE);
+        const color = (stroke.color || '#000000').toUpperCase();
+        const index = WIRE_PALETTE.indexOf(color);
+        if (index >= 0) {
+            bytes.push(index);
+        } else {
+            const hex = color.replace('#', '').padEnd(6, '0');
+            bytes.push(WIRE_CUSTOM_COLOR,
+                parseInt(hex.substr(0, 2), 16) || 0,
+                parseInt(hex.substr(2, 2), 16) || 0,
+                parseInt(hex.substr(4, 2), 16) || 0);
+        }
+        bytes.push(Math.max(0, Math.min(255, stroke.size | 0)));
+        const count = deltas.length / 2 + 1;
+        bytes.push(count & 0xFF, (count >> 8) & 0xFF);
+        pushInt16(wireQuantize(pts[0]));
+        pushInt16(wireQuantize(pts[1]));
+        deltas.forEach((d) => bytes.push(d & 0xFF));
+    });
+
+    return new Uint8Array(bytes).buffer;
+}
+
+function decodeStrokes(buffer) {
+    const view = new DataView(buffer instanceof ArrayBuffer ? buffer : buffer.buffer);
+    const strokes = [];
+    let offset = 0;
+
+    while (offset < view.byteLength) {
+        const kind = view.getUint8(offset);
+        const colorIndex = view.getUint8(offset + 1);
+        offset += 2;
+        let color;
+        if (colorIndex === WIRE_CUSTOM_COLOR) {
+            color = '#' + [0, 1, 2].map((i) => view.getUint8(offset + i).toString(16).padStart(2, '0')).join('').toUpperCase();
+            offset += 3;
+        } else {
+            color = WIRE_PALETTE[colorIndex] || '#000000';
+        }
+        const size = view.getUint8(offset);
+        const count = view.getUint16(offset + 1, true);
+        offset += 3;
+        let x = view.getInt16(offset, true);
+        let y = view.getInt16(offset + 2, true);
+        offset += 4;
+
+        if (kind === WIRE_KIND_DOT) {
+            strokes.push({ type: 'dot', x: x / WIRE_COORD_SCALE, y: y / WIRE_COORD_SCALE, color, size });
+            continue;
+        }
+
+        const points = [x / WIRE_COORD_SCALE, y / WIRE_COORD_SCALE];
+        for (let i = 1; i < count; i++) {
+            x += view.getInt8(offset);
+            y += view.getInt8(offset + 1);
+            offset += 2;
+            points.push(x / WIRE_COORD_SCALE, y / WIRE_COORD_SCALE);
+        }
+        strokes.push({ type: 'polyline', points, color, size });
+    }
+
+    return strokes;
+}
+
+window.WireFormat = {
+    encodeSegments,
+    decodeStrokes
+};
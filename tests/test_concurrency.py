@@ -0,0 +1,32 @@
+import threading
+
+from backend.config import MAX_PLAYERS
+from backend.rooms import Room
+
+
+def test_joins_under_the_room_lock_never_overfill_a_room():
+    room = Room('LOCK01', 'host', 'Host')
+    start = threading.Barrier(20)
+    results = []
+
+    def join(n):
+        start.wait()
+        with room.lock:
+            results.append(room.add_player(f'sid{n}', f'player{n}')[0])
+
+    threads = [threading.Thread(target=join, args=(n,)) for n in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results.count(True) == MAX_PLAYERS - 1
+    assert room.get_player_count() == MAX_PLAYERS
+
+
+def test_room_lock_is_reentrant():
+    room = Room('LOCK02', 'host', 'Host')
+    with room.lock:
+        with room.lock:
+            room.add_player('guest', 'Guest')
+    assert room.get_player_count() == 2
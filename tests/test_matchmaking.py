@@ -0,0 +1,54 @@
+from backend.matchmaking import LobbyIndex
+
+
+class Lobby:
+    def __init__(self, room_code, players, public=True, game_started=False):
+        self.room_code = room_code
+        self.players = players
+        self.public = public
+        self.game_started = game_started
+
+    def get_player_count(self):
+        return self.players
+
+
+def test_fullest_open_lobby_wins():
+    index = LobbyIndex(capacity=4)
+    for lobby in (Lobby('ONE', 1), Lobby('TWO', 2), Lobby('FULL', 4), Lobby('PRIVATE', 3, public=False),
+                  Lobby('STARTED', 3, game_started=True)):
+        index.update(lobby)
+
+    assert len(index) == 2 and 'FULL' not in index
+    assert index.best() == 'TWO'
+    assert index.best(lambda code: code != 'TWO') == 'ONE'
+
+
+def test_moved_and_removed_lobbies():
+    index = LobbyIndex(capacity=4)
+    lobby = Lobby('A', 1)
+    index.update(lobby)
+    index.update(Lobby('B', 2))
+    lobby.players = 3
+    index.update(lobby)
+    assert index.best() == 'A'
+
+    index.discard('A')
+    assert 'A' not in index and index.best() == 'B'
+    lobby.game_started = True
+    index.update(lobby)
+    assert 'A' not in index
+
+
+def test_search_gives_up_after_limit_rejections():
+    index = LobbyIndex(capacity=4)
+    for i in range(10):
+        index.update(Lobby(f'R{i}', 2))
+    checked = []
+
+    def accept(code):
+        checked.append(code)
+        return code == 'R9'
+
+    assert index.best(accept, limit=5) is None
+    assert len(checked) == 5
+    assert index.best(accept, limit=20) == 'R9'
@@ -0,0 +1,40 @@
+import sqlite3
+
+from backend.profiles import ProfileStore
+
+
+def test_updates_are_merged_and_committed_in_the_background(tmp_path):
+    path = str(tmp_path / 'profiles.db')
+    store = ProfileStore(path=path, enabled=True)
+    store.record_guess('ann', 12.0)
+    store.record_guess('ann', 6.0)
+    store.record_drawer_points('bob', 15)
+    store.record_game(['ann', 'bob'], ['ann'])
+    store.flush()
+
+    ann = store.get('ann')
+    assert ann['correct_guesses'] == 2 and ann['average_guess_seconds'] == 9.0
+    assert (ann['games_played'], ann['wins']) == (1, 1)
+    bob = store.get('bob')
+    assert (bob['drawer_points'], bob['wins'], bob['average_guess_seconds']) == (15, 0, None)
+    assert store.get('cid') is None
+
+    store.record_game(['ann'], [])
+    store.flush()
+    with sqlite3.connect(path) as conn:
+        assert conn.execute('SELECT games_played, wins FROM profiles WHERE username = ?', ('ann',)).fetchone() == (2, 1)
+
+
+def test_full_queue_drops_updates_instead_of_blocking(tmp_path):
+    store = ProfileStore(path=str(tmp_path / 'profiles.db'), max_queue=1, enabled=True)
+    store._ensure_running = lambda: None  # No writer: the queue cannot drain
+    store.record_guess('ann', 1.0)
+    store.record_guess('ann', 1.0)
+    assert store._queue.qsize() == 1
+
+
+def test_disabled_store_records_nothing(tmp_path):
+    store = ProfileStore(path=str(tmp_path / 'profiles.db'), enabled=False)
+    store.record_guess('ann', 1.0)
+    store.flush()
+    assert store.get('ann') is None and store._thread is None
@@ -0,0 +1,34 @@
+from backend.ratelimit import ReactionMerger, RateLimiter, TokenBucket
+
+
+def test_bucket_refills_at_its_rate_up_to_the_burst():
+    bucket = TokenBucket(rate=2, burst=3)
+    now = bucket.updated_at
+    assert [bucket.consume(now) for _ in range(4)] == [True, True, True, False]
+
+    assert bucket.consume(now + 0.5)
+    assert not bucket.consume(now + 0.5)
+    bucket.consume(now + 100)
+    assert bucket.tokens == 2
+
+
+def test_limits_are_per_connection_and_event():
+    limiter = RateLimiter({'chat': (1, 1)})
+    assert limiter.allow('a', 'chat') == (True, False)
+    assert limiter.allow('a', 'chat') == (False, True)
+    assert limiter.allow('a', 'chat') == (False, False)
+    assert limiter.allow('b', 'chat') == (True, False)
+    assert limiter.allow('a', 'draw') == (True, False)
+    assert limiter.dropped['chat'] == 2
+
+    limiter.forget('a')
+    assert limiter.allow('a', 'chat') == (True, False)
+
+
+def test_reactions_merge_per_room_until_popped():
+    merger = ReactionMerger()
+    assert merger.add('ROOM', '🔥')
+    assert not merger.add('ROOM', '🔥')
+    assert not merger.add('ROOM', '👍')
+    assert merger.pop('ROOM') == {'🔥': 2, '👍': 1}
+    assert merger.pop('ROOM') == {}
@@ -0,0 +1,63 @@
+import os
+import time
+
+from backend.replay import (
+    CLEAR, GUESS, KEYFRAME, STROKES, TURN_START, REPLAY_EXTENSION, ReplayReader, ReplayRecorder
+)
+from backend.wire import encode_strokes
+
+
+def stroke(x):
+    return encode_strokes([{'type': 'dot', 'x': x, 'y': x, 'color': '#000000', 'size': 2}])
+
+
+def wait_for_end(path, records, timeout=5):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if os.path.exists(path):
+            reader = ReplayReader(path)
+            if len(reader.records) == records:
+                return reader
+            reader.close()
+        time.sleep(0.01)
+    raise AssertionError(f"{path} never got {records} records")
+
+
+def test_recorded_game_reads_back_and_seeks_from_the_last_keyframe(tmp_path):
+    recorder = ReplayRecorder(directory=str(tmp_path), enabled=True)
+    replay_id = recorder.start_game('REPLAY', {'players': ['Ann', 'Bob']})
+    for kind, offset, payload in ((TURN_START, 100, {'drawer': 'Ann'}), (STROKES, 200, stroke(1)),
+                                  (KEYFRAME, 300, stroke(1) + stroke(2)), (STROKES, 400, stroke(3)),
+                                  (GUESS, 500, {'user': 'Bob'}), (CLEAR, 600, {}), (STROKES, 700, stroke(4))):
+        recorder._put(replay_id, kind, offset, payload)
+    recorder.end_game('REPLAY', {'winner': 'Ann'})
+
+    reader = wait_for_end(os.path.join(str(tmp_path), replay_id + REPLAY_EXTENSION), 9)
+    try:
+        kinds = [kind for _, kind, _ in reader.events()]
+        assert kinds == ['game_start', 'turn_start', 'strokes', 'strokes', 'guess', 'clear', 'strokes', 'game_end']
+
+        seeked = list(reader.events(start_ms=450))
+        assert seeked[:3] == [(450, 'game_start', {'players': ['Ann', 'Bob']}),
+                              (450, 'turn_start', {'drawer': 'Ann'}),
+                              (450, 'canvas', stroke(1) + stroke(2) + stroke(3))]
+        assert seeked[3] == (500, 'guess', {'user': 'Bob'})
+        assert list(reader.events(start_ms=650))[2] == (650, 'canvas', b'')
+    finally:
+        reader.close()
+
+
+def test_writer_keeps_a_bounded_number_of_files_open(tmp_path):
+    recorder = ReplayRecorder(directory=str(tmp_path), enabled=True, max_open_files=2)
+    replay_ids = [recorder.start_game(f'ROOM{i}', {}) for i in range(5)]
+    for round_ in range(3):
+        for replay_id in replay_ids:
+            recorder._put(replay_id, STROKES, round_, stroke(round_))
+        time.sleep(0.02)
+    for i in range(5):
+        recorder.end_game(f'ROOM{i}')
+
+    for replay_id in replay_ids:
+        reader = wait_for_end(os.path.join(str(tmp_path), replay_id + REPLAY_EXTENSION), 5)
+        assert [kind for _, kind, _ in reader.events()] == ['game_start'] + ['strokes'] * 3 + ['game_end']
+        reader.close()
@@ -0,0 +1,25 @@
+from backend.rooms import Room, get_player_room, get_spectator_room, register_room, rooms
+
+
+def test_sid_and_username_indexes_follow_the_players():
+    room = Room('INDEX1', 'host', 'Host')
+    register_room(room)
+    try:
+        room.add_player('guest', 'Guest')
+        assert get_player_room('guest') is room
+        assert room.usernames == {'Host': 'host', 'Guest': 'guest'}
+
+        room.mark_disconnected('guest')
+        assert room.reattach_player('Guest', 'guest2') == 'guest'
+        assert get_player_room('guest') is None and get_player_room('guest2') is room
+        assert room.usernames['Guest'] == 'guest2'
+
+        room.remove_player('guest2')
+        assert get_player_room('guest2') is None and 'Guest' not in room.usernames
+
+        room.add_spectator('viewer')
+        assert get_spectator_room('viewer') is room and get_player_room('viewer') is None
+        room.remove_spectator('viewer')
+        assert get_spectator_room('viewer') is None
+    finally:
+        rooms.pop(room.room_code, None)
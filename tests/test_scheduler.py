@@ -0,0 +1,26 @@
+import threading
+import time
+
+from backend.scheduler import Scheduler
+
+
+def test_callbacks_fire_in_deadline_order_and_cancelled_ones_do_not():
+    scheduler = Scheduler()
+    fired = []
+    done = threading.Event()
+    scheduler.call_later(0.06, lambda: (fired.append('last'), done.set()))
+    scheduler.call_later(0.02, fired.append, 'first')
+    scheduler.call_later(0.04, fired.append, 'cancelled').cancel()
+    scheduler.call_later(0.03, fired.append, 'second')
+
+    assert done.wait(2)
+    assert fired == ['first', 'second', 'last']
+
+
+def test_a_failing_callback_does_not_stop_the_scheduler():
+    scheduler = Scheduler()
+    done = threading.Event()
+    scheduler.call_later(0, lambda: 1 / 0)
+    scheduler.call_at(time.monotonic() + 0.01, done.set)
+
+    assert done.wait(2)
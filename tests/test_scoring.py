@@ -0,0 +1,22 @@
+from backend.rooms import Player
+from backend.scoring import Leaderboard, get_leaderboard
+
+
+def test_leaderboard_matches_a_full_sort_and_reports_rank_changes():
+    players = {sid: Player(sid, name) for sid, name in (('a', 'Ann'), ('b', 'Bob'), ('c', 'Cid'))}
+    board = Leaderboard()
+    for player in players.values():
+        board.add(player)
+
+    changes = board.add_points(players['c'], 30)
+    assert [entry['rank'] for entry in changes.values()] == [1, 2, 3]
+    assert set(changes) == {'a', 'b', 'c'}
+
+    changes = board.add_points(players['b'], 10)
+    assert {sid: entry['rank'] for sid, entry in changes.items()} == {'b': 2, 'a': 3}
+    assert board.to_list() == get_leaderboard(players)
+    assert board.rank('c') == 1 and board.rank('a') == 3
+
+    board.remove(players['c'])
+    assert board.rank('c') is None and board.rank('b') == 1
+    assert board.add_points(players['a'], 5) == {'a': {'username': 'Ann', 'score': 5, 'sid': 'a', 'rank': 2}}
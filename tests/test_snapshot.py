@@ -0,0 +1,76 @@
+import pytest
+
+from backend.game_logic import GameState, game_states
+from backend.rooms import Room, register_room, rooms
+from backend.session import game_sessions
+from backend.snapshot import Snapshotter, read_snapshot
+from backend.wire import encode_strokes
+
+FRAME = encode_strokes([{'type': 'polyline', 'points': [0, 0, 10, 10, 20, 5], 'color': '#FF0000', 'size': 4}])
+
+
+@pytest.fixture(autouse=True)
+def empty_stores():
+    yield
+    rooms.clear()
+    game_states.clear()
+    game_sessions.active_sessions.clear()
+
+
+def start_room(code):
+    room = Room(code, 'a', 'Ann')
+    room.add_player('b', 'Bob')
+    room.game_started = True
+    register_room(room)
+    game_state = game_states[code] = GameState(code)
+    game_state.start_game(['a', 'b'])
+    game_state.start_turn()
+    game_state.canvas.record(binary=FRAME)
+    return room, game_state
+
+
+def test_rooms_survive_a_write_and_restore(tmp_path):
+    room, game_state = start_room('SNAP01')
+    room.leaderboard.add_points(room.players['b'], 120)
+    room.touch()
+    snapshotter = Snapshotter(path=str(tmp_path / 'rooms.snap'), interval=0)
+    assert snapshotter.write() == 1
+
+    rooms.clear()
+    game_states.clear()
+    restored, = snapshotter.restore()
+
+    assert restored.room_code == 'SNAP01' and restored.game_started
+    assert {sid: p.score for sid, p in restored.players.items()} == {'a': 0, 'b': 120}
+    assert set(restored.disconnected) == {'a', 'b'}
+    restored_game = game_states['SNAP01']
+    assert restored_game.current_word == game_state.current_word
+    assert restored_game.players_order == ['a', 'b']
+    assert restored_game.canvas.to_bytes() == FRAME
+
+
+def test_unchanged_rooms_are_reused_and_changes_are_picked_up(tmp_path):
+    room, _ = start_room('SNAP02')
+    snapshotter = Snapshotter(path=str(tmp_path / 'rooms.snap'), interval=0)
+    assert snapshotter.write() == 1
+    assert snapshotter.write() == 0
+
+    room.mark_disconnected('b')
+    assert snapshotter.write() == 1
+    room.touch()
+    assert snapshotter.write() == 1
+
+
+def test_corrupt_snapshots_are_refused(tmp_path):
+    start_room('SNAP03')
+    path = tmp_path / 'rooms.snap'
+    Snapshotter(path=str(path), interval=0).write()
+    data = bytearray(path.read_bytes())
+    data[10] ^= 0xFF
+    path.write_bytes(bytes(data))
+
+    with pytest.raises(ValueError):
+        read_snapshot(str(path))
+    rooms.clear()
+    game_states.clear()
+    assert Snapshotter(path=str(path), interval=0).restore() == []
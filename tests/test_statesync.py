@@ -0,0 +1,34 @@
+from backend.rooms import Room
+from backend.statesync import StateTracker
+
+
+def test_deltas_carry_only_changes_and_count_up():
+    room = Room('SYNC01', 'host', 'Host')
+    tracker = StateTracker()
+
+    first = tracker.delta(room)
+    assert first['seq'] == 1 and first['room']['host_sid'] == 'host'
+    assert [p['sid'] for p in first['players']['upsert']] == ['host']
+
+    assert tracker.delta(room) == {'seq': 2}
+
+    room.add_player('guest', 'Guest')
+    third = tracker.delta(room)
+    assert third['seq'] == 3
+    assert third['room'] == {'player_count': 2}
+    assert [p['sid'] for p in third['players']['upsert']] == ['guest']
+
+    room.remove_player('host')
+    fourth = tracker.delta(room)
+    assert fourth['players']['remove'] == ['host'] and fourth['room']['host_sid'] == 'guest'
+
+
+def test_full_state_does_not_advance_the_sequence():
+    room = Room('SYNC02', 'host', 'Host')
+    tracker = StateTracker()
+    tracker.delta(room)
+
+    full = tracker.full(room)
+    assert full['seq'] == 1 and full['game'] is None
+    assert [p['sid'] for p in full['players']] == ['host']
+    assert tracker.delta(room)['seq'] == 2
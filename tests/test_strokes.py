@@ -0,0 +1,37 @@
+from backend.strokes import StrokeBuffer, StrokeSimplifier
+from backend.wire import decode_strokes, encode_strokes
+
+
+def test_bad_coordinates_are_dropped_and_drain_survives():
+    buffer = StrokeBuffer(StrokeSimplifier())
+    buffer.add_segment('ROOM', 'sid', {'x1': 0, 'y1': 0, 'x2': 'a', 'y2': 5, 'color': '#000000', 'size': 4})
+    buffer.add_segment('ROOM', 'sid', {'x1': 0, 'y1': None, 'x2': 1, 'y2': 1, 'color': '#000000', 'size': 4})
+    buffer.add_segment('ROOM', 'sid', {'x1': 0, 'y1': 0, 'x2': 1, 'y2': 1, 'color': '#000000', 'size': 'big'})
+    buffer.add_segment('ROOM', 'sid', {'type': 'dot', 'x': float('nan'), 'y': 1, 'color': '#000000', 'size': 4})
+    buffer.add_segment('ROOM', 'sid', {'x1': '10', 'y1': 10, 'x2': 20, 'y2': 20, 'color': '#000000', 'size': '4'})
+
+    frames = buffer.drain() + buffer.drain()
+    strokes = [stroke for _, _, batch, _ in frames for stroke in batch]
+    assert strokes == [{'type': 'polyline', 'points': [10.0, 10.0, 20.0, 20.0], 'color': '#000000', 'size': 4.0}]
+
+
+def test_segments_are_merged_into_polylines():
+    buffer = StrokeBuffer()
+    buffer.add_segment('ROOM', 'sid', {'x1': 0, 'y1': 0, 'x2': 5, 'y2': 5, 'color': '#000000', 'size': 4})
+    buffer.add_segment('ROOM', 'sid', {'x1': 5, 'y1': 5, 'x2': 9, 'y2': 2, 'color': '#000000', 'size': 4})
+    (_, _, strokes, _), = buffer.drain()
+    assert strokes[0]['points'] == [0, 0, 5, 5, 9, 2]
+
+
+def test_malformed_binary_frames_are_rejected():
+    buffer = StrokeBuffer()
+    good = encode_strokes([{'type': 'polyline', 'points': [0, 0, 4, 4], 'color': '#000000', 'size': 2}])
+    assert not buffer.add_binary('ROOM', 'sid', good[:-1])
+    assert not buffer.add_binary('ROOM', 'sid', b'\x07\x00\x02\x01\x00\x00\x00\x00\x00')
+    assert not buffer.add_binary('ROOM', 'sid', b'')
+    assert buffer.add_binary('ROOM', 'sid', good)
+    assert buffer.add_binary('ROOM', 'sid', good)
+
+    (_, _, _, binary), = buffer.drain()
+    assert binary == good + good
+    assert len(decode_strokes(binary)) == 2
@@ -0,0 +1,81 @@
+import time
+
+from backend.config import LOBBY_RECONNECT_TTL, ROOM_IDLE_TTL
+from backend.game_logic import GameState
+from backend.rooms import Room
+from backend.session import GameSession
+from backend.sweeper import Sweeper
+
+
+def make_sweeper(rooms, game_states, player_expired=None):
+    closed = []
+    sweeper = Sweeper(rooms, game_states, GameSession(), lambda code, reason: closed.append((code, reason)),
+                      player_expired)
+    return sweeper, closed
+
+
+def test_lobby_seat_expires_after_ttl():
+    room = Room('SWEEP1', 'host', 'Host')
+    room.add_player('guest', 'Guest')
+    room.mark_disconnected('guest')
+    sweeper, closed = make_sweeper({room.room_code: room}, {})
+
+    assert sweeper.sweep(now=time.monotonic() + 1) == {}
+    assert sweeper.sweep(now=time.monotonic() + LOBBY_RECONNECT_TTL + 1) == {'player': 1}
+    assert list(room.players) == ['host'] and not room.disconnected
+    assert closed == []
+
+
+def test_idle_lobby_is_closed():
+    room = Room('SWEEP2', 'host', 'Host')
+    sweeper, closed = make_sweeper({room.room_code: room}, {})
+
+    sweeper.sweep(now=time.monotonic() + ROOM_IDLE_TTL + 1)
+    assert closed == [('SWEEP2', 'idle')]
+
+
+def test_expired_restored_players_leave_the_turn_rotation():
+    room = Room('SWEEP3', 'a', 'A')
+    for sid in 'bc':
+        room.add_player(sid, sid.upper())
+    room.game_started = True
+    game_state = GameState(room.room_code)
+    game_state.start_game(['a', 'b', 'c'])
+    game_state.start_turn()
+    room.mark_disconnected('b')
+
+    def player_expired(room, sid):
+        game_state.remove_player(sid)
+        room.remove_player(sid)
+
+    sweeper, _ = make_sweeper({room.room_code: room}, {room.room_code: game_state}, player_expired)
+    sweeper.sweep(now=time.monotonic() + LOBBY_RECONNECT_TTL + 1)
+
+    assert game_state.players_order == ['a', 'c']
+    game_state.end_turn()
+    game_state.start_turn()
+    assert game_state.drawer_sid == 'c'
+
+
+def test_rooms_over_the_cap_are_evicted_least_recently_active_first():
+    now = time.monotonic()
+    stores = {}
+    for i, age in enumerate((30, 10, 20)):
+        room = Room(f'CAP{i}', f'host{i}', 'Host')
+        room.last_active = now - age
+        stores[room.room_code] = room
+    sweeper, closed = make_sweeper(stores, {})
+    sweeper.max_rooms = 1
+
+    assert sweeper.sweep(now=now) == {'room_evicted': 2}
+    assert closed == [('CAP0', 'evicted'), ('CAP2', 'evicted')]
+
+
+def test_orphaned_game_states_and_sessions_are_dropped():
+    room = Room('ORPHAN', 'host', 'Host')
+    sweeper, _ = make_sweeper({room.room_code: room}, {'GONE': GameState('GONE')})
+    sweeper.sessions.create_session('host', 'ORPHAN', 'Host')
+    sweeper.sessions.create_session('ghost', 'GONE', 'Ghost')
+
+    assert sweeper.sweep(now=time.monotonic()) == {'game_state': 1, 'session': 1}
+    assert list(sweeper.sessions.active_sessions) == ['host']
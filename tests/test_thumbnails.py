@@ -0,0 +1,24 @@
+from concurrent.futures import Future
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from backend.thumbnails import PNG_SIGNATURE, ThumbnailRenderer, render_thumbnail  # noqa: E402
+from backend.wire import encode_strokes  # noqa: E402
+
+
+def test_finished_renders_are_delivered_on_the_calling_thread():
+    renderer = ThumbnailRenderer(workers=1)
+    frame = encode_strokes([{'type': 'polyline', 'points': [0, 0, 100, 100], 'color': '#000000', 'size': 4}])
+    rendered, failed = Future(), Future()
+    rendered.set_result(render_thumbnail(frame))
+    failed.set_exception(ValueError("bad frame"))
+    images = []
+    renderer._done.extend([(failed, 0, images.append), (rendered, 0, images.append)])
+
+    assert renderer.deliver() == 1
+    assert renderer.deliver() == 0
+    image, = images
+    assert image.startswith('data:image/png;base64,')
+    assert render_thumbnail(frame).startswith(PNG_SIGNATURE)
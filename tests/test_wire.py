@@ -0,0 +1,26 @@
+from backend.strokes import CanvasHistory
+from backend.wire import decode_strokes, encode_strokes
+
+
+def test_long_polylines_are_split_into_joined_strokes():
+    points = []
+    for i in range(70000):
+        points += [i % 2, i % 3]
+    strokes = decode_strokes(encode_strokes([{'type': 'polyline', 'points': points,
+                                              'color': '#FF0000', 'size': 6}]))
+
+    assert [len(stroke['points']) // 2 for stroke in strokes] == [65535, 4466]
+    assert strokes[1]['points'][:2] == strokes[0]['points'][-2:]
+    assert all(stroke['color'] == '#FF0000' and stroke['size'] == 6 for stroke in strokes)
+    joined = strokes[0]['points'] + strokes[1]['points'][2:]
+    assert joined == points
+
+
+def test_canvas_compaction_survives_long_polylines():
+    history = CanvasHistory()
+    frame = encode_strokes([{'type': 'polyline', 'points': [float(i % 400) for i in range(140000)],
+                             'color': '#000000', 'size': 2}])
+    for _ in range(3):
+        history.record(binary=frame)
+    history._compact()
+    assert decode_strokes(history.to_bytes())
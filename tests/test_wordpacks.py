@@ -0,0 +1,22 @@
+from backend import wordpacks
+from backend.wordpacks import compile_word_pack, get_word_pack, list_word_packs
+
+
+def test_packs_are_listed_and_opened(tmp_path, monkeypatch):
+    monkeypatch.setattr(wordpacks, 'WORD_PACK_DIR', str(tmp_path))
+    compile_word_pack({'fruit': ['apple', 'pear']}, str(tmp_path / 'fruit.wpk'))
+
+    assert list_word_packs() == ['fruit']
+    assert list(get_word_pack('fruit').categories['fruit']) == ['apple', 'pear']
+
+
+def test_bad_names_and_empty_files_are_not_packs(tmp_path, monkeypatch):
+    monkeypatch.setattr(wordpacks, 'WORD_PACK_DIR', str(tmp_path))
+    (tmp_path / 'empty.wpk').write_bytes(b'')
+    (tmp_path / 'short.wpk').write_bytes(b'WPK1')
+
+    assert get_word_pack(['fruit']) is None
+    assert get_word_pack({'name': 'fruit'}) is None
+    assert get_word_pack('../fruit') is None
+    assert get_word_pack('empty') is None
+    assert get_word_pack('short') is None
@@ -0,0 +1,26 @@
+from backend.words import GuessMatcher
+
+
+def test_plurals_are_accepted_both_ways():
+    assert GuessMatcher('grapes').match('grape') == GuessMatcher.CORRECT
+    assert GuessMatcher('box').match('boxes') == GuessMatcher.CORRECT
+    assert GuessMatcher('boxes').match('box') == GuessMatcher.CORRECT
+    assert GuessMatcher('bus').match('buses') == GuessMatcher.CORRECT
+    assert GuessMatcher('butterfly').match('butterflies') == GuessMatcher.CORRECT
+    assert GuessMatcher('monkey').match('monkeys') == GuessMatcher.CORRECT
+    assert GuessMatcher('ice cream').match('Ice-Creams') == GuessMatcher.CORRECT
+
+
+def test_es_is_only_stripped_after_sibilants():
+    assert GuessMatcher('grapes').match('grap') != GuessMatcher.CORRECT
+    assert GuessMatcher('noodles').match('noodl') != GuessMatcher.CORRECT
+    assert GuessMatcher('glass').match('glas') != GuessMatcher.CORRECT
+    assert GuessMatcher('monkey').match('monkies') != GuessMatcher.CORRECT
+
+
+def test_singular_targets_do_not_accept_truncations():
+    for target, guess in (('bus', 'bu'), ('tennis', 'tenni'), ('glass', 'glas'),
+                          ('cactus', 'cactu'), ('glasses', 'glasse')):
+        assert GuessMatcher(target).match(guess) != GuessMatcher.CORRECT, (target, guess)
+    assert GuessMatcher('glasses').match('glass') == GuessMatcher.CORRECT
+    assert GuessMatcher('tennis').match('Tennis') == GuessMatcher.CORRECT